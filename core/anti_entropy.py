@@ -0,0 +1,56 @@
+# anti_entropy.py
+import time
+from collections import defaultdict
+
+
+class DigestIndex:
+    """
+    Message digests grouped by topic and fixed windows of publish time. Every
+    bucket is summarised by its id count and the XOR of its digests (ids are
+    sha256, so the XOR is an order-independent set hash), which lets two nodes
+    find the buckets they disagree on without exchanging any ids. Keeping topics
+    apart lets a node reconcile only the topics it is interested in.
+    """
+    def __init__(self, window=10, retention=300):
+        self.window = window
+        self.retention = retention
+        self.buckets = defaultdict(set)  # (window start, topic) -> set of digests
+        self.hashes = {}  # (window start, topic) -> xor of digests as int
+
+    def bucket_of(self, timestamp):
+        return int(timestamp // self.window) * self.window
+
+    def cutoff(self):
+        return self.bucket_of(time.time() - self.retention)
+
+    def add(self, digest, timestamp, topic):
+        key = (self.bucket_of(timestamp), topic)
+        if key[0] < self.cutoff():
+            return
+        ids = self.buckets[key]
+        if digest in ids:
+            return
+        ids.add(digest)
+        self.hashes[key] = self.hashes.get(key, 0) ^ int.from_bytes(digest, "big")
+
+    def ids(self, start, topic):
+        return self.buckets.get((start, topic), set())
+
+    def expire(self):
+        cutoff = self.cutoff()
+        for key in [k for k in self.buckets if k[0] < cutoff]:
+            del self.buckets[key]
+            del self.hashes[key]
+
+    def summary(self, match=None):
+        """{(window start, topic): (count, 32-byte hash)} for live buckets whose topic passes match."""
+        self.expire()
+        return {key: (len(ids), self.hashes[key].to_bytes(32, "big"))
+                for key, ids in self.buckets.items() if match is None or match(key[1])}
+
+    def diff(self, their_summary, match=None):
+        """Buckets where their_summary and ours disagree, restricted to topics passing match."""
+        mine = self.summary(match)
+        cutoff = self.cutoff()
+        return sorted(key for key in set(mine) | set(their_summary)
+                      if key[0] >= cutoff and mine.get(key) != their_summary.get(key))
@@ -1,17 +1,75 @@
+import time
 from collections import defaultdict
+from core.topic_trie import TopicTrie, normalize_pattern
 
 class Broker:
-    def __init__(self):
-        self.subscriptions = defaultdict(set)  # topic -> set of subscribers
+    def __init__(self, view_ttl=30):
+        self.subscriptions = defaultdict(set)  # topic filter -> set of subscribers
+        self.trie = TopicTrie()  # same filters, indexed for matching concrete topics
+        self.view_ttl = view_ttl
+        self.cluster = {}  # node_id -> (version, expires_at, set of topic filters), learned from announcements
+        self.cluster_trie = TopicTrie()  # remote topic filter -> node ids
 
     def subscribe(self, topic, subscriber_id):
+        topic = normalize_pattern(topic)
         self.subscriptions[topic].add(subscriber_id)
+        self.trie.add(topic, subscriber_id)
 
     def unsubscribe(self, topic, subscriber_id):
+        topic = normalize_pattern(topic)
+        if topic not in self.subscriptions:
+            return
         self.subscriptions[topic].discard(subscriber_id)
+        self.trie.remove(topic, subscriber_id)
+        if not self.subscriptions[topic]:
+            del self.subscriptions[topic]
 
     def get_subscribers(self, topic):
-        return list(self.subscriptions[topic])
+        return list(self.trie.match(topic))
     
     def get_topic_map(self):
-        return {topic: sorted(list(nodes)) for topic, nodes in self.subscriptions.items()}
\ No newline at end of file
+        return {topic: sorted(list(nodes)) for topic, nodes in self.subscriptions.items()}
+
+    def apply_announcement(self, node_id, version, topics, ttl):
+        """Merge a remote node's subscription announcement; returns True if it changed our view."""
+        expires_at = time.time() + ttl
+        current = self.cluster.get(node_id)
+        if current and (current[0] > version or (current[0] == version and current[1] >= expires_at)):
+            return False
+        old_topics = current[2] if current else set()
+        new_topics = {normalize_pattern(topic) for topic in topics}  # older nodes may announce "*"
+        for topic in old_topics - new_topics:
+            self.cluster_trie.remove(topic, node_id)
+        for topic in new_topics - old_topics:
+            self.cluster_trie.add(topic, node_id)
+        self.cluster[node_id] = (version, expires_at, new_topics)
+        return True
+
+    def forget(self, node_id):
+        """Drop the view of a node that left the cluster."""
+        current = self.cluster.pop(node_id, None)
+        if current:
+            for topic in current[2]:
+                self.cluster_trie.remove(topic, node_id)
+
+    def announcements(self):
+        """Live remote announcements as (node_id, version, topics, remaining ttl)."""
+        now = time.time()
+        return [(node_id, version, topics, expires_at - now)
+                for node_id, (version, expires_at, topics) in self.cluster.items() if expires_at > now]
+
+    def known_nodes(self):
+        """Nodes whose subscriptions we know from a live announcement."""
+        now = time.time()
+        return {node_id for node_id, (_, expires_at, _) in self.cluster.items() if expires_at > now}
+
+    def interested_nodes(self, topic):
+        """Remote nodes with a filter matching topic (may include expired views, see known_nodes)."""
+        return self.cluster_trie.match(topic)
+
+    def get_cluster_map(self):
+        cluster_map = defaultdict(list)
+        for node_id, _, topics, _ in self.announcements():
+            for topic in topics:
+                cluster_map[topic].append(node_id)
+        return {topic: sorted(nodes) for topic, nodes in cluster_map.items()}
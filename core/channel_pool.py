@@ -0,0 +1,95 @@
+# channel_pool.py
+import time
+import asyncio
+import grpc.aio
+from core import gossip_pb2_grpc
+
+# Client side keepalive: detect dead HTTP/2 connections without waiting for a call to fail.
+KEEPALIVE_OPTIONS = [
+    ("grpc.keepalive_time_ms", 20000),
+    ("grpc.keepalive_timeout_ms", 5000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+
+# Seconds in-flight calls get to finish when a channel is dropped.
+CLOSE_GRACE = 1.0
+
+# Server side counterpart, otherwise the server answers our keepalive pings with GOAWAY.
+SERVER_KEEPALIVE_OPTIONS = [
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.min_ping_interval_without_data_ms", 10000),
+    ("grpc.http2.max_ping_strikes", 0),
+]
+
+
+class PeerChannel:
+    def __init__(self, peer_id, addr, options):
+        self.peer_id = peer_id
+        self.addr = addr
+        self.channel = grpc.aio.insecure_channel(addr, options=options)
+        self.stub = gossip_pb2_grpc.GossipServiceStub(self.channel)
+        self.last_used = time.monotonic()
+
+
+class ChannelPool:
+    """
+    One long-lived gRPC channel (and stub) per peer, shared by every call site.
+    Channels are created lazily and closed when idle for longer than idle_timeout
+    seconds. The first UNAVAILABLE of a failure streak drops the channel so the
+    next call dials again; in-flight calls (the GossipStream, fetches) get
+    CLOSE_GRACE seconds to finish. Later failures and timeouts only update the
+    peer's health and leave reconnecting to gRPC.
+    """
+    def __init__(self, resolve_addr, idle_timeout=300, options=None):
+        self.resolve_addr = resolve_addr
+        self.idle_timeout = idle_timeout
+        self.options = options if options is not None else KEEPALIVE_OPTIONS
+        self.channels = {}  # peer_id -> PeerChannel
+        self.healthy = {}  # peer_id -> bool
+        self.failures = {}  # peer_id -> consecutive failures
+
+    def stub(self, peer_id):
+        peer_channel = self.channels.get(peer_id)
+        if peer_channel is None:
+            peer_channel = PeerChannel(peer_id, self.resolve_addr(peer_id), self.options)
+            self.channels[peer_id] = peer_channel
+        peer_channel.last_used = time.monotonic()
+        return peer_channel.stub
+
+    def is_healthy(self, peer_id):
+        return self.healthy.get(peer_id, True)
+
+    def mark_ok(self, peer_id):
+        """Record a successful call; returns True if the peer was unhealthy before."""
+        recovered = not self.healthy.get(peer_id, True)
+        self.healthy[peer_id] = True
+        self.failures[peer_id] = 0
+        return recovered
+
+    def mark_failed(self, peer_id, unavailable=False):
+        """Record a failed call; returns True if the peer was healthy before."""
+        was_healthy = self.healthy.get(peer_id, True)
+        self.healthy[peer_id] = False
+        self.failures[peer_id] = self.failures.get(peer_id, 0) + 1
+        if unavailable and self.failures[peer_id] == 1:
+            # dial again now instead of waiting out the backoff, but only once per streak
+            asyncio.ensure_future(self.close(peer_id, grace=CLOSE_GRACE))
+        return was_healthy
+
+    async def close(self, peer_id, grace=None):
+        peer_channel = self.channels.pop(peer_id, None)
+        if peer_channel is not None:
+            await peer_channel.channel.close(grace)
+
+    async def close_all(self):
+        for peer_id in list(self.channels):
+            await self.close(peer_id)
+
+    async def evict_idle_loop(self, interval=60):
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for peer_id, peer_channel in list(self.channels.items()):
+                if now - peer_channel.last_used > self.idle_timeout:
+                    await self.close(peer_id)
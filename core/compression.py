@@ -0,0 +1,171 @@
+# compression.py
+import os
+import time
+import zlib
+from collections import Counter, defaultdict, deque
+
+try:
+    import zstandard
+except ImportError:  # optional, zlib is always available
+    zstandard = None
+
+# GossipMessage.codec values
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+CODECS = {"zlib": CODEC_ZLIB, "zstd": CODEC_ZSTD}
+
+
+class MissingDictionary(Exception):
+    def __init__(self, dict_id):
+        super().__init__(f"Unknown compression dictionary {dict_id:08x}")
+        self.dict_id = dict_id
+
+
+class Compressor:
+    """
+    Compresses message payloads before encryption. Every topic gets its own
+    dictionary trained from recent payloads (zstd's trainer, or for zlib simply
+    the most recent samples as a preset dictionary), so even short, repetitive
+    messages shrink. Dictionaries are content-addressed (crc32) and kept on disk;
+    a publisher only starts using a new one after it has been shared with its
+    peers (see GossipAgent.share_dictionary). Payloads under min_size are sent
+    as they are.
+    """
+    def __init__(self, codec="zlib", directory=None, level=6, min_size=256, dict_size=16 * 1024,
+                 train_samples=200, retrain_interval=600):
+        if codec not in CODECS:
+            raise ValueError(f"Compression codec must be one of {sorted(CODECS)}")
+        if codec == "zstd" and zstandard is None:
+            raise ValueError("zstd compression needs the zstandard package")
+        self.codec = CODECS[codec]
+        self.directory = directory
+        self.level = level
+        self.min_size = min_size
+        self.dict_size = dict_size
+        self.train_samples = train_samples
+        self.retrain_interval = retrain_interval
+        self.dictionaries = {}  # dict_id -> (topic, codec, bytes)
+        self.active = {}  # topic -> (dict_id, trained_at) used when publishing
+        self.samples = defaultdict(lambda: deque(maxlen=train_samples))
+        self.stats = Counter()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self.load()
+
+    # ---- dictionaries ----
+
+    def load(self):
+        for name in os.listdir(self.directory):
+            if not name.endswith(".dict"):
+                continue
+            with open(os.path.join(self.directory, name), "rb") as f:
+                data = f.read()
+            codec, topic_len = data[0], data[1]
+            topic = data[2:2 + topic_len].decode()
+            self.dictionaries[int(name[:-5], 16)] = (topic, codec, data[2 + topic_len:])
+
+    def add_dictionary(self, dict_id, topic, codec, data):
+        if dict_id in self.dictionaries:
+            return
+        if zlib.crc32(data) != dict_id:
+            raise ValueError(f"Dictionary {dict_id:08x} does not match its content")
+        self.dictionaries[dict_id] = (topic, codec, data)
+        if self.directory:
+            topic_bytes = topic.encode()[:255]
+            with open(os.path.join(self.directory, f"{dict_id:08x}.dict"), "wb") as f:
+                f.write(bytes([codec, len(topic_bytes)]) + topic_bytes + data)
+
+    def observe(self, topic, payload):
+        if len(payload) >= self.min_size // 4:
+            self.samples[topic].append(payload)
+
+    def due_for_training(self):
+        now = time.time()
+        return [topic for topic, samples in self.samples.items()
+                if len(samples) >= self.train_samples
+                and now - self.active.get(topic, (0, 0))[1] >= self.retrain_interval]
+
+    def train(self, topic, samples=None):
+        """Build a dictionary from the topic's samples; returns its id (not yet active)."""
+        samples = list(self.samples[topic]) if samples is None else samples
+        data = None
+        if self.codec == CODEC_ZSTD:
+            try:
+                data = zstandard.train_dictionary(self.dict_size, samples).as_bytes()
+            except zstandard.ZstdError:
+                pass  # too few or too uniform samples, fall back to raw content
+        if data is None:
+            # a preset dictionary works best with the most recent, most similar content at its end
+            data = b"".join(samples)[-min(self.dict_size, 32 * 1024):]
+        dict_id = zlib.crc32(data)
+        self.add_dictionary(dict_id, topic, self.codec, data)
+        self.stats["dictionaries_trained"] += 1
+        return dict_id
+
+    def activate(self, topic, dict_id):
+        self.active[topic] = (dict_id, time.time())
+
+    # ---- payloads ----
+
+    def compress(self, topic, payload):
+        """(codec, dict_id, data) for an encoded payload; codec is CODEC_NONE if it was not worth it."""
+        self.observe(topic, payload)
+        if len(payload) < self.min_size:
+            self.stats["skipped_small"] += 1
+            return CODEC_NONE, 0, payload
+        dict_id = self.active.get(topic, (0, 0))[0]
+        dictionary = self.dictionaries[dict_id][2] if dict_id else None
+        start = time.perf_counter()
+        data = self.run(self.codec, dictionary, payload, compress=True)
+        self.stats["compress_seconds"] += time.perf_counter() - start
+        if len(data) >= len(payload):
+            self.stats["skipped_incompressible"] += 1
+            return CODEC_NONE, 0, payload
+        self.stats["compressed"] += 1
+        self.stats["bytes_in"] += len(payload)
+        self.stats["bytes_out"] += len(data)
+        return self.codec, dict_id, data
+
+    def decompress(self, codec, dict_id, data):
+        if codec == CODEC_NONE:
+            return data
+        dictionary = None
+        if dict_id:
+            if dict_id not in self.dictionaries:
+                raise MissingDictionary(dict_id)
+            dictionary = self.dictionaries[dict_id][2]
+        start = time.perf_counter()
+        payload = self.run(codec, dictionary, data, compress=False)
+        self.stats["decompress_seconds"] += time.perf_counter() - start
+        self.stats["decompressed"] += 1
+        return payload
+
+    def run(self, codec, dictionary, data, compress):
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise ValueError("zstd payload but the zstandard package is not installed")
+            dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+            if compress:
+                return zstandard.ZstdCompressor(level=self.level, dict_data=dict_data).compress(data)
+            return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(data)
+        if codec == CODEC_ZLIB:
+            if compress:
+                c = zlib.compressobj(self.level, zdict=dictionary) if dictionary else zlib.compressobj(self.level)
+                return c.compress(data) + c.flush()
+            d = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+            return d.decompress(data) + d.flush()
+        raise ValueError(f"Unknown compression codec {codec}")
+
+    def missing(self, msgs):
+        """Dictionary ids referenced by msgs that this node does not have yet."""
+        return {msg.get("dict_id") for msg in msgs
+                if msg.get("dict_id") and msg["dict_id"] not in self.dictionaries}
+
+    def status(self):
+        stats = dict(self.stats)
+        if self.stats["bytes_in"]:
+            stats["ratio"] = round(self.stats["bytes_out"] / self.stats["bytes_in"], 3)
+        stats["dictionaries"] = len(self.dictionaries)
+        stats["active"] = {topic: f"{dict_id:08x}" for topic, (dict_id, _) in self.active.items()}
+        return stats
@@ -0,0 +1,113 @@
+# consumers.py
+import asyncio
+from collections import deque, Counter
+from core.topic_trie import TopicTrie, validate_pattern
+
+POLICIES = ("drop_oldest", "drop_newest", "disconnect")
+
+
+class Consumer:
+    """
+    One streaming client (WebSocket or SSE connection). Delivered messages go
+    into a bounded queue that the connection's own writer task drains in
+    batches, so a slow client only ever costs its own queue. When the queue is
+    full the policy decides: drop_oldest / drop_newest lose messages (the
+    client is told how many with a "lagged" event and can fill the gap via
+    /replay), disconnect closes the connection.
+    """
+    def __init__(self, filters, queue_size=1000, policy="drop_oldest", max_batch=100):
+        self.filters = filters
+        self.queue = deque()
+        self.queue_size = queue_size
+        self.policy = policy
+        self.max_batch = max_batch
+        self.ready = asyncio.Event()
+        self.closed = False
+        self.lagged = 0  # messages dropped since the last lagged notice
+
+    def offer(self, event):
+        """Queue an event without blocking; returns False if the consumer must be disconnected."""
+        if self.closed:
+            return False
+        if len(self.queue) >= self.queue_size:
+            if self.policy == "disconnect":
+                self.close()
+                return False
+            self.lagged += 1
+            if self.policy == "drop_newest":
+                return True
+            self.queue.popleft()
+        self.queue.append(event)
+        self.ready.set()
+        return True
+
+    def close(self):
+        self.closed = True
+        self.ready.set()
+
+    async def batches(self, idle=None):
+        """Yield lists of events until the consumer is closed; an empty list after idle quiet seconds."""
+        while not self.closed:
+            try:
+                await asyncio.wait_for(self.ready.wait(), idle)
+            except asyncio.TimeoutError:
+                yield []
+                continue
+            self.ready.clear()
+            while self.queue or self.lagged:
+                batch = []
+                if self.lagged:
+                    batch.append({"type": "lagged", "dropped": self.lagged})
+                    self.lagged = 0
+                while self.queue and len(batch) < self.max_batch:
+                    batch.append(self.queue.popleft())
+                yield batch
+                if self.closed:
+                    return
+
+
+class ConsumerHub:
+    """Streaming clients of a node, indexed by their topic filters."""
+    def __init__(self, queue_size=1000, policy="drop_oldest", max_batch=100):
+        if policy not in POLICIES:
+            raise ValueError(f"Consumer policy must be one of {POLICIES}")
+        self.queue_size = queue_size
+        self.policy = policy
+        self.max_batch = max_batch
+        self.consumers = set()
+        self.trie = TopicTrie()  # topic filter -> consumers
+        self.stats = Counter()
+
+    def add(self, filters):
+        for topic in filters:
+            validate_pattern(topic)
+        consumer = Consumer(filters, self.queue_size, self.policy, self.max_batch)
+        self.consumers.add(consumer)
+        for topic in filters:
+            self.trie.add(topic, consumer)
+        self.stats["connected"] += 1
+        return consumer
+
+    def remove(self, consumer):
+        if consumer not in self.consumers:
+            return
+        consumer.close()
+        self.consumers.discard(consumer)
+        for topic in consumer.filters:
+            self.trie.remove(topic, consumer)
+
+    def dispatch(self, topic, event):
+        if not self.consumers:
+            return
+        for consumer in self.trie.match(topic):
+            dropped_before = consumer.lagged
+            if not consumer.offer(event):
+                self.stats["disconnected_slow"] += 1
+                self.remove(consumer)
+            elif consumer.lagged > dropped_before:
+                self.stats["dropped"] += 1
+            else:
+                self.stats["queued"] += 1
+
+    def status(self):
+        return dict(self.stats, active=len(self.consumers), policy=self.policy, queue_size=self.queue_size)
@@ -0,0 +1,94 @@
+# dedup.py
+import time
+import hashlib
+from collections import OrderedDict, deque
+
+
+def msg_digest(msg_id):
+    """32-byte binary form of a message id (ids are sha256 hex digests)."""
+    if isinstance(msg_id, bytes):
+        return msg_id
+    if len(msg_id) == 64:
+        try:
+            return bytes.fromhex(msg_id)
+        except ValueError:
+            pass
+    return hashlib.sha256(msg_id.encode()).digest()
+
+
+class DedupCache:
+    """
+    Time-bucketed set of message digests. Ids are kept for at least ttl seconds:
+    the window is split into `buckets` slices and a whole slice is dropped once
+    it is older than ttl. Past capacity, every insert evicts the oldest ids first.
+    """
+    def __init__(self, ttl=600, capacity=1000000, buckets=10, on_evict=None):
+        self.ttl = ttl
+        self.capacity = capacity
+        self.bucket_span = ttl / buckets
+        self.on_evict = on_evict  # called with the list of evicted digests
+        self.buckets = deque()  # (start_time, OrderedDict of digests in insertion order), oldest first
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, msg_id):
+        digest = msg_digest(msg_id)
+        return any(digest in ids for _, ids in self.buckets)
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for _, ids in list(self.buckets):
+            for digest in ids:
+                yield digest.hex()
+
+    def add(self, msg_id):
+        self._rotate()
+        digest = msg_digest(msg_id)
+        if any(digest in ids for _, ids in self.buckets):
+            return
+        self._insert(digest)
+
+    def check_and_add(self, msg_id):
+        """Record msg_id; returns True the first time it is seen inside the window."""
+        self._rotate()
+        digest = msg_digest(msg_id)
+        if any(digest in ids for _, ids in self.buckets):
+            self.hits += 1
+            return False
+        self.misses += 1
+        self._insert(digest)
+        return True
+
+    def stats(self):
+        return {"size": self.size, "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def _insert(self, digest):
+        self.buckets[-1][1][digest] = None
+        self.size += 1
+        if self.size <= self.capacity:
+            return
+        evicted = []
+        while self.size > self.capacity:
+            _, ids = self.buckets[0]
+            evicted.append(ids.popitem(last=False)[0])
+            self.size -= 1
+            if not ids and len(self.buckets) > 1:
+                self.buckets.popleft()
+        self.evictions += len(evicted)
+        if self.on_evict:
+            self.on_evict(evicted)
+
+    def _rotate(self):
+        now = time.monotonic()
+        if not self.buckets or now - self.buckets[-1][0] >= self.bucket_span:
+            self.buckets.append((now, OrderedDict()))
+        while len(self.buckets) > 1 and now - self.buckets[0][0] - self.bucket_span >= self.ttl:
+            _, ids = self.buckets.popleft()
+            self.size -= len(ids)
+            self.evictions += len(ids)
+            if self.on_evict and ids:
+                self.on_evict(list(ids))
@@ -0,0 +1,101 @@
+# fanout.py
+import math
+import asyncio
+from core.topic_trie import TopicTrie
+from core.log_writer import log
+from core.metrics import GOSSIP_FANOUT
+
+
+class FanoutPolicy:
+    """
+    Picks how many peers a gossip broadcast goes to.
+
+    fanout="auto" follows the live membership: a push epidemic that sends each
+    message to ln(N) + c peers reaches everyone with probability about
+    exp(-exp(-c)) (Kermarrec, Massoulie, Ganesh 2003), where N counts this node
+    and the reachable route candidates for the topic. A bias on top of c is
+    tuned by adjust_loop from what actually happened since the last round:
+    messages anti-entropy had to fetch are ones push gossip missed, so a miss
+    ratio above target_miss raises the fanout; rounds without misses but with
+    duplicates to spare lower it again. Any other value is a fixed fanout.
+
+    overrides maps topic filters (wildcards allowed) to a fixed fanout; when
+    several match, the largest wins.
+    """
+    def __init__(self, agent, fanout=3, c=1.0, min_fanout=2, max_fanout=None, overrides=None,
+                 target_miss=0.01, step=0.5, max_bias=3.0):
+        self.agent = agent
+        self.adaptive = fanout == "auto"
+        self.fixed = None if self.adaptive else int(fanout)
+        self.c = c
+        self.min_fanout = min_fanout
+        self.max_fanout = max_fanout
+        self.target_miss = target_miss
+        self.step = step
+        self.max_bias = max_bias
+        self.bias = 0.0
+        self.miss_ratio = 0.0
+        self.duplicate_ratio = 0.0
+        self.last_counts = (0, 0, 0, 0)  # (first arrivals, duplicates, fetched, anti-entropy rounds) last time
+        self.overrides = TopicTrie()
+        for pattern, value in (overrides or {}).items():
+            self.overrides.add(pattern, (pattern, int(value)))
+        self.override_cache = {}  # topic -> override or None
+
+    def override(self, topic):
+        if topic not in self.override_cache:
+            matched = self.overrides.match(topic)
+            self.override_cache[topic] = max(value for _, value in matched) if matched else None
+        return self.override_cache[topic]
+
+    def target(self, cluster_size):
+        """Fanout for a cluster of cluster_size live nodes, before rounding."""
+        return math.log(max(cluster_size, 1)) + self.c + self.bias
+
+    def choose(self, topic, candidates):
+        fanout = self.override(topic)
+        if fanout is None and not self.adaptive:
+            fanout = self.fixed
+        if fanout is None:
+            # route candidates never include peers membership has declared dead
+            fanout = max(self.min_fanout, math.ceil(self.target(len(candidates) + 1)))
+            if self.max_fanout:
+                fanout = min(fanout, self.max_fanout)
+        fanout = min(fanout, len(candidates))
+        GOSSIP_FANOUT.observe(fanout)
+        return fanout
+
+    def adjust(self):
+        dedup = self.agent.seen_msgs
+        counts = (dedup.misses, dedup.hits, self.agent.stats["fetched"], self.agent.stats["anti_entropy_rounds"])
+        first, duplicates, fetched, rounds = (now - before for now, before in zip(counts, self.last_counts))
+        self.last_counts = counts
+        if not first or not rounds:
+            return  # without an anti-entropy round misses are invisible, keep the current bias
+        self.miss_ratio = fetched / first
+        self.duplicate_ratio = duplicates / first
+        if not self.adaptive:
+            return
+        if self.miss_ratio > self.target_miss:
+            self.bias = min(self.max_bias, self.bias + self.step)
+        elif self.duplicate_ratio > 1:
+            # every node saw each message more than twice: there is redundancy to give back
+            self.bias = max(-self.c, self.bias - self.step / 2)
+        log.debug(f"[{self.agent.node_id}] fanout miss={self.miss_ratio:.4f} "
+                  f"dup={self.duplicate_ratio:.2f} bias={self.bias:+.2f}")
+
+    async def adjust_loop(self, interval=10):
+        while True:
+            await asyncio.sleep(interval)
+            self.adjust()
+
+    def status(self):
+        return {
+            "mode": "auto" if self.adaptive else "fixed",
+            "fixed": self.fixed,
+            "c": self.c,
+            "bias": self.bias,
+            "miss_ratio": round(self.miss_ratio, 4),
+            "duplicate_ratio": round(self.duplicate_ratio, 3),
+            "overrides": {topic: value for topic, value in self.override_cache.items() if value is not None},
+        }
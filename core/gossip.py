@@ -1,20 +1,65 @@
 # gossip.py
+import time
 import random
 import asyncio
+import heapq
+import itertools
+from collections import Counter, defaultdict
 import grpc.aio
-from core import gossip_pb2, gossip_pb2_grpc
+from core import gossip_pb2
+from core.channel_pool import ChannelPool
+from core.dedup import DedupCache, msg_digest
+from core.anti_entropy import DigestIndex
+from core.message_store import MessageStore
+from core.topic_trie import TopicTrie
+from core.log_writer import log
+from core.metrics import PEER_SEND_SECONDS, PEER_ERRORS, PEER_SEND_TIMEOUTS, ANTI_ENTROPY_BYTES
+from core.peer_stream import PeerStream
+from core.plumtree import Plumtree
+from core.fanout import FanoutPolicy
+from core.membership import Membership
 
 
 class GossipAgent:
-    def __init__(self, node_id, peers, node=None, peer_addrs=None):
+    def __init__(self, node_id, peers, node=None, peer_addrs=None, use_stream=True,
+                 seen_ttl=600, seen_capacity=1000000, fetch_batch=500, fetch_concurrency=4,
+                 send_timeout=2, send_concurrency=64, store_dir=None, store_options=None, fanout=3, channels=None,
+                 broadcast="gossip", plumtree_options=None, fanout_options=None, membership_options=None):
         self.node_id = node_id
         self.peers = peers
         self.node = node  # pass node for callback
-        self.seen_msgs = self.load_seen_msgs_from_disk(f"{node_id}_seen_msgs.log")
-        self.msg_store = {}
-        self.peer_unavailable = {peer: False for peer in peers}
+        store_options = dict(store_options or {})
+        if store_options.get("retention_seconds") is None:
+            # the store's index lives in memory: keep messages as long as dedup remembers them unless told otherwise
+            store_options["retention_seconds"] = seen_ttl
+        self.msg_store = MessageStore(
+            store_dir or f"./data/{node_id}",
+            encode=lambda message: self.to_proto(message).SerializeToString(),
+            decode=lambda data: self.from_proto(gossip_pb2.GossipMessage.FromString(data)),
+            **store_options
+        )
+        self.seen_ttl = seen_ttl
+        self.seen_msgs = DedupCache(ttl=seen_ttl, capacity=seen_capacity)
+        # ids leave the digest index well before any node can forget them in its dedup cache
+        self.digests = DigestIndex(window=10, retention=seen_ttl / 2)
+        self.legacy_sync_peers = set()  # peers without SyncDigest, synced with SyncSeenMsgs
+        self.fetch_batch = fetch_batch
+        self.fetch_limit = asyncio.Semaphore(fetch_concurrency)
+        self.fetching = set()  # digests with a FetchMessages call in flight
+        self.stats = Counter()
+        self.load_from_store()
+        self.peer_unavailable = {peer: False for peer in peers}  # kept in step with membership (dead = True)
         self.peer_addrs = peer_addrs or {}
-        print(f"[{self.node_id}] GossipAgent peers={self.peers}")
+        self.channels = channels or ChannelPool(self.get_peer_addr)  # anything with ChannelPool's interface
+        self.membership = Membership(self, **(membership_options or {}))
+        self.fanout_policy = FanoutPolicy(self, fanout, **(fanout_options or {}))  # fanout may be "auto"
+        self.use_stream = use_stream
+        self.streams = {}  # peer_id -> PeerStream
+        self.send_timeout = send_timeout
+        self.send_limit = asyncio.Semaphore(send_concurrency)
+        # broadcast="plumtree" relays along an eager-push tree instead of to fanout random peers
+        self.plumtree = Plumtree(self, **(plumtree_options or {})) if broadcast == "plumtree" else None
+        log.info(f"[{self.node_id}] GossipAgent peers={self.peers}")
     
     def get_peer_addr(self, peer_id):
         if self.peer_addrs and peer_id in self.peer_addrs:
@@ -22,102 +67,445 @@ class GossipAgent:
             return f"{ip}:{port}"
         raise ValueError(f"No address for peer {peer_id} in peer_addrs!")
     
-    def load_seen_msgs_from_disk(self, path="seen_msgs.log"):
-        try:
-            with open(path, "r") as f:
-                return set(line.strip() for line in f)
-        except Exception:
-            return set()
+    def load_from_store(self):
+        """Rebuild the dedup window and digest index from the on-disk message store's index."""
+        cutoff = time.time() - self.seen_ttl
+        for digest, timestamp, _, topic in self.msg_store.entries():
+            if timestamp >= cutoff:
+                self.seen_msgs.add(digest)
+                self.digests.add(digest, timestamp, topic)
 
-    def save_seen_msg(self, msg_id, path="seen_msgs.log"):
-        try:
-            with open(path, "a") as f:
-                f.write(msg_id + "\n")
-        except Exception:
-            pass
+    def store(self, message):
+        self.msg_store.put(message)
+        self.digests.add(msg_digest(message['msg_id']), message['timestamp'], message['topic'])
 
-    async def broadcast(self, message, fanout=3):
+    async def broadcast(self, message, fanout=None, relay=False, from_peer=None):
+        # relays come from Node.receive, which has already recorded the message as seen
         msg_id = message['msg_id']
-        if msg_id in self.seen_msgs:
+        if not relay and msg_id in self.seen_msgs:
             # print(f"[{self.node_id}] broadcast(): msg_id {msg_id} already seen.")
             return
         # self.seen_msgs.add(msg_id)
         # self.save_seen_msg(msg_id, f"{self.node_id}_seen_msgs.log")
         # self.msg_store[msg_id] = message
-        selected = random.sample(self.peers, min(fanout, len(self.peers)))
-        for peer_id in selected:
-            await self.send(peer_id, message)
-        
-        if self.node:
+        if self.node and not relay:
+            # seen, stored and delivered here before any echo from a peer can arrive
             self.node.receive(message)
+        if self.plumtree:
+            if relay:
+                await self.plumtree.broadcast(message, from_peer)
+            else:
+                await self.plumtree.broadcast_batch([message])
+        else:
+            candidates = self.route_candidates(message['topic'])
+            fanout = fanout or self.fanout_policy.choose(message['topic'], candidates)
+            selected = random.sample(candidates, min(fanout, len(candidates)))
+            await self.fanout(selected, message)
 
-    async def send(self, peer_id, message):
-        peer_addr = self.get_peer_addr(peer_id)
-        # print(f"[{self.node_id}] send() called, peer={peer_id}, msg_id={message.get('msg_id')}, content={message.get('content')[:50]}")
-        # print(f"[{self.node_id}] Preparing to send to {peer_id} at {peer_addr}")
-        async with grpc.aio.insecure_channel(peer_addr) as channel:
-            stub = gossip_pb2_grpc.GossipServiceStub(channel)
-            grpc_message = gossip_pb2.GossipMessage(
-                topic=message['topic'],
-                content=message['content'],
-                sender=message['sender'],
-                timestamp=message['timestamp'],
-                msg_id=message['msg_id']
-            )
+    def add_peer(self, peer_id, addr=""):
+        """Membership saw peer_id join (or come back at a new "host:port"): route to it from now on."""
+        if addr:
+            host, port = addr.rsplit(":", 1)
+            if self.peer_addrs.get(peer_id) != (host, int(port)):
+                if peer_id in self.peer_addrs:
+                    asyncio.ensure_future(self.channels.close(peer_id))  # redial at the new address
+                self.peer_addrs[peer_id] = (host, int(port))
+        if peer_id not in self.peers:
+            # Node.peers is this same list, so the node sees the change too
+            self.peers.append(peer_id)
+            if self.plumtree:
+                self.plumtree.add_peer(peer_id)
+        self.peer_unavailable[peer_id] = False
+
+    def remove_peer(self, peer_id):
+        """Membership saw peer_id leave: drop it from routing, its stream and its channel."""
+        if peer_id in self.peers:
+            self.peers.remove(peer_id)
+        self.peer_unavailable.pop(peer_id, None)
+        self.legacy_sync_peers.discard(peer_id)
+        stream = self.streams.pop(peer_id, None)
+        if stream:
+            stream.close()
+        if self.plumtree:
+            self.plumtree.remove_peer(peer_id)
+        if self.node:
+            self.node.broker.forget(peer_id)
+        asyncio.ensure_future(self.channels.close(peer_id))
+        self.peer_addrs.pop(peer_id, None)
+
+    async def join(self, seeds):
+        """
+        Join through the first seed that answers. A seed is a peer id we already
+        have an address for, or a gRPC "host:port" that is dialled just for the Join.
+        """
+        dialled = [seed for seed in seeds if seed not in self.peer_addrs and seed not in self.peers]
+        for seed in dialled:
+            host, port = seed.rsplit(":", 1)
+            self.peer_addrs[seed] = (host, int(port))
+        try:
+            return await self.membership.join(seeds)
+        finally:
+            for seed in dialled:
+                self.peer_addrs.pop(seed, None)
+                await self.channels.close(seed)
+
+    def mark_peer_ok(self, peer_id):
+        self.channels.mark_ok(peer_id)
+
+    def mark_peer_error(self, peer_id, e):
+        # only the channel is affected; whether the peer is down is for membership to decide
+        PEER_ERRORS.inc(1, peer_id, e.code().name)
+        if e.code() in (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED):
+            # a timeout says nothing about the connection: keep the channel and the calls on it
+            self.channels.mark_failed(peer_id, unavailable=e.code() == grpc.StatusCode.UNAVAILABLE)
+        else:
+            log.warning(f"[{self.node_id}] gRPC error with {peer_id}: {e}")
+
+    @staticmethod
+    def to_proto(message):
+        return gossip_pb2.GossipMessage(
+            topic=message['topic'],
+            content=message.get('content') or "",
+            payload=message.get('payload') or b"",
+            codec=message.get('codec', 0),
+            dict_id=message.get('dict_id', 0),
+            relay=message.get('relay', ""),
+            seq=message.get('seq', 0),
+            epoch=message.get('epoch', 0),
+            sender=message['sender'],
+            timestamp=message['timestamp'],
+            msg_id=message['msg_id'],
+            lamport=message.get('lamport', 0)
+        )
+
+    @staticmethod
+    def from_proto(request):
+        return {
+            "topic": request.topic,
+            "content": request.content,
+            "payload": request.payload,
+            "codec": request.codec,
+            "dict_id": request.dict_id,
+            "relay": request.relay,
+            "seq": request.seq,
+            "epoch": request.epoch,
+            "sender": request.sender,
+            "timestamp": request.timestamp,
+            "msg_id": request.msg_id,
+            "lamport": request.lamport
+        }
+
+    async def broadcast_batch(self, messages, fanout=None):
+        """Publisher-side broadcast of many messages, grouped into one hand-off per peer."""
+        messages = [message for message in messages if message['msg_id'] not in self.seen_msgs]
+        if self.node:
+            for message in messages:
+                self.node.receive(message)
+        if self.plumtree:
+            await self.plumtree.broadcast_batch(messages)
+            return
+        by_peer = defaultdict(list)
+        for message in messages:
+            candidates = self.route_candidates(message['topic'])
+            chosen = fanout or self.fanout_policy.choose(message['topic'], candidates)
+            for peer_id in random.sample(candidates, min(chosen, len(candidates))):
+                by_peer[peer_id].append(message)
+        await asyncio.gather(*(self.send_many(peer_id, batch) for peer_id, batch in by_peer.items()))
+
+    def route_candidates(self, topic, exclude=()):
+        """Live peers that may deliver topic: known subscribers plus peers we have no subscription view of."""
+        peers = [peer_id for peer_id in self.peers if peer_id not in exclude and not self.membership.is_dead(peer_id)]
+        if not self.node:
+            return peers
+        interested = self.node.broker.interested_nodes(topic)
+        known = self.node.broker.known_nodes()
+        return [peer_id for peer_id in peers if peer_id in interested or peer_id not in known]
+
+    async def fanout(self, peer_ids, message):
+        """Send to all peer_ids concurrently; the slowest live peer bounds the latency."""
+        await asyncio.gather(*(self.send_bounded(peer_id, message) for peer_id in peer_ids))
+
+    async def fanout_batch(self, messages):
+        """Send every message to all of its route candidates, grouped into one hand-off per peer."""
+        by_peer = defaultdict(list)
+        for message in messages:
+            for peer_id in self.route_candidates(message['topic']):
+                by_peer[peer_id].append(message)
+        await asyncio.gather(*(self.send_many(peer_id, batch) for peer_id, batch in by_peer.items()))
+
+    async def send_many(self, peer_id, messages):
+        """Returns False if the hand-off did not finish within send_timeout."""
+        async with self.send_limit:
+            start = time.perf_counter()
             try:
-                await stub.SendMessage(grpc_message)
-                # response = await stub.SendMessage(grpc_message)
-                # if response.success:
-                #     print(f"[{self.node_id}] sent message to {peer_id}")
-                if self.peer_unavailable[peer_id]:
-                    print(f"[{self.node_id}] Peer {peer_id} back online.")
-                self.peer_unavailable[peer_id] = False
-            except grpc.aio.AioRpcError as e:
-                if e.code() == grpc.StatusCode.UNAVAILABLE:
-                    if not self.peer_unavailable[peer_id]:
-                        print(f"[{self.node_id}] Peer {peer_id} unavailable (probably stopped).")
-                        self.peer_unavailable[peer_id] = True
+                if self.use_stream:
+                    # queued in order, the stream coalesces them into frames
+                    await asyncio.wait_for(self.send_in_order(peer_id, messages), self.send_timeout)
                 else:
-                    print(f"[{self.node_id}] gRPC error with {peer_id}: {e}")
+                    await asyncio.wait_for(
+                        asyncio.gather(*(self.send(peer_id, message) for message in messages)), self.send_timeout)
+                PEER_SEND_SECONDS.observe(time.perf_counter() - start, peer_id)
+                return True
+            except asyncio.TimeoutError:
+                self.stats["send_timeouts"] += 1
+                PEER_SEND_TIMEOUTS.inc(1, peer_id)
+                return False
+
+    async def send_in_order(self, peer_id, messages):
+        for message in messages:
+            await self.send(peer_id, message)
+
+    async def send_bounded(self, peer_id, message):
+        async with self.send_limit:
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(self.send(peer_id, message), self.send_timeout)
+                PEER_SEND_SECONDS.observe(time.perf_counter() - start, peer_id)
+            except asyncio.TimeoutError:
+                # the peer's outbound queue is full or the call hung; anti-entropy repairs it later
+                self.stats["send_timeouts"] += 1
+                PEER_SEND_TIMEOUTS.inc(1, peer_id)
+
+    async def send(self, peer_id, message):
+        # print(f"[{self.node_id}] send() called, peer={peer_id}, msg_id={message.get('msg_id')}, content={message.get('content')[:50]}")
+        if self.use_stream:
+            stream = self.streams.get(peer_id)
+            if stream is None:
+                stream = self.streams[peer_id] = PeerStream(self, peer_id)
+            if stream.supported:
+                await stream.put(message)
+                return
+        await self.send_unary(peer_id, message)
+
+    async def send_unary(self, peer_id, message):
+        stub = self.channels.stub(peer_id)
+        try:
+            ack = await stub.SendMessage(self.to_proto(message), timeout=self.send_timeout)
+            self.membership.merge(ack.updates)
+            self.mark_peer_ok(peer_id)
+        except grpc.aio.AioRpcError as e:
+            self.mark_peer_error(peer_id, e)
     
-    async def push_seen_msgs(self, interval=5):
+    async def anti_entropy_loop(self, interval=5):
         while True:
-            tasks = [self.send_seen_msgs(peer_id) for peer_id in self.peers]
+            tasks = [self.sync_with_peer(peer_id) for peer_id in self.membership.alive()]
             await asyncio.gather(*tasks)
+            self.stats["anti_entropy_rounds"] += 1
             await asyncio.sleep(interval)
 
-    async def send_seen_msgs(self, peer_id):
-        peer_addr = self.get_peer_addr(peer_id)
-        async with grpc.aio.insecure_channel(peer_addr) as channel:
-            stub = gossip_pb2_grpc.GossipServiceStub(channel)
-            grpc_message = gossip_pb2.SeenMsgs(
-                sender=self.node_id,
-                msg_ids=list(self.seen_msgs)
-            )
+    async def sync_with_peer(self, peer_id):
+        if peer_id in self.legacy_sync_peers:
+            await self.send_seen_msgs(peer_id)
+        else:
+            await self.sync_digest(peer_id)
+
+    def local_interest(self):
+        """(topic filters, match function) for what this node delivers, or None when it wants everything."""
+        if self.node and self.node.subscriber:
+            return set(self.node.subscriber.topics), self.node.subscriber.matches
+        return None
+
+    async def sync_digest(self, peer_id):
+        """
+        Send our per-bucket digest summary for the topics we deliver; the peer
+        answers with its ids for the buckets that differ, and we pull exactly the
+        messages we are missing. The peer does the same towards us on its own round.
+        """
+        interest = self.local_interest()
+        topics, match = interest if interest else (set(), None)
+        if interest and not topics:
+            return
+        summary = self.digests.summary(match)
+        grpc_message = gossip_pb2.DigestSummary(
+            sender=self.node_id,
+            window=self.digests.window,
+            buckets=[gossip_pb2.DigestBucket(start=start, topic=topic, count=count, hash=digest_hash)
+                     for (start, topic), (count, digest_hash) in summary.items()],
+            topics=sorted(topics)
+        )
+        ANTI_ENTROPY_BYTES.inc(grpc_message.ByteSize(), "sent")
+        try:
+            diff = await self.channels.stub(peer_id).SyncDigest(grpc_message)
+            ANTI_ENTROPY_BYTES.inc(diff.ByteSize(), "received")
+            self.mark_peer_ok(peer_id)
+        except grpc.aio.AioRpcError as e:
+            if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+                log.info(f"[{self.node_id}] Peer {peer_id} has no SyncDigest, falling back to SyncSeenMsgs.")
+                self.legacy_sync_peers.add(peer_id)
+            else:
+                self.mark_peer_error(peer_id, e)
+            return
+        missing = []
+        for bucket in diff.buckets:
+            missing.extend(set(bucket.ids) - self.digests.ids(bucket.start, bucket.topic) - self.fetching)
+        if missing:
+            await self.fetch_missing(peer_id, missing)
+
+    def on_receive_digest(self, request):
+        if request.window != self.digests.window:
+            return None
+        wanted = TopicTrie()
+        for topic in request.topics:
+            wanted.add(topic, True)
+        theirs = {(bucket.start, bucket.topic): (bucket.count, bucket.hash) for bucket in request.buckets}
+        diff = gossip_pb2.DigestDiff(buckets=[
+            gossip_pb2.BucketIds(start=start, topic=topic, ids=list(self.digests.ids(start, topic)))
+            for start, topic in self.digests.diff(theirs, wanted.matches if request.topics else None)
+        ])
+        ANTI_ENTROPY_BYTES.inc(request.ByteSize(), "received")
+        ANTI_ENTROPY_BYTES.inc(diff.ByteSize(), "sent")
+        return diff
+
+    async def announce_loop(self, interval=10, fanout=3):
+        while True:
+            alive = self.membership.alive()
+            await self.announce(random.sample(alive, min(fanout, len(alive))))
+            await asyncio.sleep(interval)
+
+    async def announce(self, peer_ids):
+        """Gossip our own subscriptions plus every live announcement we know of."""
+        if not self.node:
+            return
+        broker = self.node.broker
+        node_id, version, topics = self.node.subscription_announcement()
+        announcements = [gossip_pb2.SubscriptionAnnouncement(
+            node_id=node_id, version=version, topics=sorted(topics), ttl=broker.view_ttl)]
+        for other_id, other_version, other_topics, remaining in broker.announcements():
+            announcements.append(gossip_pb2.SubscriptionAnnouncement(
+                node_id=other_id, version=other_version, topics=sorted(other_topics), ttl=remaining))
+        request = gossip_pb2.SubscriptionDigest(sender=self.node_id, announcements=announcements)
+        await asyncio.gather(*(self.send_announcement(peer_id, request) for peer_id in peer_ids))
+
+    async def send_announcement(self, peer_id, request):
+        try:
+            await self.channels.stub(peer_id).AnnounceSubscriptions(request, timeout=self.send_timeout)
+            self.mark_peer_ok(peer_id)
+        except grpc.aio.AioRpcError as e:
+            # older peers stay unknown, which routing treats as interested
+            if e.code() != grpc.StatusCode.UNIMPLEMENTED:
+                self.mark_peer_error(peer_id, e)
+
+    def on_receive_announcements(self, request):
+        if not self.node:
+            return
+        for announcement in request.announcements:
+            if announcement.node_id != self.node_id:
+                self.node.broker.apply_announcement(announcement.node_id, announcement.version,
+                                                    announcement.topics, announcement.ttl)
+
+    async def fetch_missing(self, peer_id, digests):
+        """Pull the given message digests from peer_id in batches, a few batches at a time."""
+        self.fetching.update(digests)
+        batches = [digests[i:i + self.fetch_batch] for i in range(0, len(digests), self.fetch_batch)]
+        try:
+            await asyncio.gather(*(self.fetch_batch_from(peer_id, batch) for batch in batches))
+        finally:
+            self.fetching.difference_update(digests)
+
+    async def fetch_batch_from(self, peer_id, digests):
+        async with self.fetch_limit:
+            request = gossip_pb2.FetchRequest(sender=self.node_id, ids=digests)
             try:
-                await stub.SyncSeenMsgs(grpc_message)
-                if self.peer_unavailable[peer_id]:
-                    print(f"[{self.node_id}] Peer {peer_id} back online.")
-                self.peer_unavailable[peer_id] = False
+                ANTI_ENTROPY_BYTES.inc(request.ByteSize(), "sent")
+                async for grpc_message in self.channels.stub(peer_id).FetchMessages(request):
+                    self.stats["fetched"] += 1
+                    ANTI_ENTROPY_BYTES.inc(grpc_message.ByteSize(), "received")
+                    if self.node:
+                        self.node.receive(self.from_proto(grpc_message))
+                self.mark_peer_ok(peer_id)
             except grpc.aio.AioRpcError as e:
-                if e.code() == grpc.StatusCode.UNAVAILABLE:
-                    if not self.peer_unavailable[peer_id]:
-                        print(f"[{self.node_id}] Peer {peer_id} unavailable (probably stopped).")
-                        self.peer_unavailable[peer_id] = True
-                else:
-                    print(f"[{self.node_id}] gRPC error with {peer_id}: {e}")
+                self.mark_peer_error(peer_id, e)
+
+    async def fetch_sequence(self, peer_id, topic, epoch, start, end):
+        """Pull sequenced messages start..end of topic from the leader that numbered them."""
+        request = gossip_pb2.SequenceRequest(sender=self.node_id, topic=topic, epoch=epoch, start=start, end=end)
+        try:
+            async for grpc_message in self.channels.stub(peer_id).FetchSequence(request, timeout=self.send_timeout):
+                self.stats["sequence_repaired"] += 1
+                if self.node:
+                    self.node.receive(self.from_proto(grpc_message))
+            self.mark_peer_ok(peer_id)
+        except grpc.aio.AioRpcError as e:
+            self.mark_peer_error(peer_id, e)
+
+    def iter_stored(self, digests):
+        for digest in digests:
+            message = self.msg_store.get(digest.hex())
+            if message is None:
+                # evicted or never stored here; the requester will find it elsewhere
+                self.stats["fetch_misses"] += 1
+                continue
+            grpc_message = self.to_proto(message)
+            ANTI_ENTROPY_BYTES.inc(grpc_message.ByteSize(), "sent")
+            yield grpc_message
+
+    def replay(self, topic, since=0, by="timestamp", limit=None):
+        """Stored messages on topics matching the (possibly wildcard) filter, ordered by `by`."""
+        matcher = TopicTrie()
+        matcher.add(topic, True)
+        streams = [self.msg_store.replay(name, since, by)
+                   for name in self.msg_store.topics() if matcher.matches(name)]
+        merged = heapq.merge(*streams, key=lambda message: message[by])
+        return itertools.islice(merged, limit)
+
+    async def send_seen_msgs(self, peer_id):
+        stub = self.channels.stub(peer_id)
+        grpc_message = gossip_pb2.SeenMsgs(
+            sender=self.node_id,
+            msg_ids=list(self.seen_msgs)
+        )
+        try:
+            await stub.SyncSeenMsgs(grpc_message)
+            self.mark_peer_ok(peer_id)
+        except grpc.aio.AioRpcError as e:
+            self.mark_peer_error(peer_id, e)
 
     async def on_receive_seen_msgs(self, peer_id, their_msg_ids):
         their_set = set(their_msg_ids)
-        missing = self.seen_msgs - their_set
+        missing = [msg_id for msg_id in self.seen_msgs if msg_id not in their_set]
+        # legacy peers cannot FetchMessages, so they still get pushed what they lack
         for msg_id in missing:
             if msg_id in self.msg_store:
                 await self.send(peer_id, self.msg_store[msg_id])
             else:
-                print(f"[{self.node_id}] Warning: asked to resend msg_id={msg_id} but not found in msg_store")
+                self.stats["fetch_misses"] += 1
     
-    async def ping(self, peer_id):
-        peer_addr = self.get_peer_addr(peer_id)
-        async with grpc.aio.insecure_channel(peer_addr) as channel:
-            stub = gossip_pb2_grpc.GossipServiceStub(channel)
-            await stub.Ping(gossip_pb2.PingRequest())
\ No newline at end of file
+    async def share_dictionary(self, dict_id):
+        """Push a compression dictionary to every peer before we start publishing with it."""
+        topic, codec, data = self.node.compressor.dictionaries[dict_id]
+        request = gossip_pb2.Dictionary(dict_id=dict_id, topic=topic, codec=codec, data=data, sender=self.node_id)
+
+        async def push(peer_id):
+            try:
+                await self.channels.stub(peer_id).ShareDictionary(request, timeout=self.send_timeout)
+                self.mark_peer_ok(peer_id)
+                return True
+            except grpc.aio.AioRpcError as e:
+                self.mark_peer_error(peer_id, e)
+                return False
+
+        shared = await asyncio.gather(*(push(peer_id) for peer_id in self.peers))
+        return sum(shared)
+
+    def on_receive_dictionary(self, request):
+        self.node.compressor.add_dictionary(request.dict_id, request.topic, request.codec, request.data)
+
+    async def fetch_dictionary(self, dict_id, prefer=None):
+        """Get a dictionary we missed (e.g. while down), asking `prefer` (usually the publisher) first."""
+        peers = sorted(self.peers, key=lambda peer_id: peer_id != prefer)
+        for peer_id in peers:
+            try:
+                response = await self.channels.stub(peer_id).GetDictionary(
+                    gossip_pb2.DictionaryRequest(dict_id=dict_id), timeout=self.send_timeout)
+            except grpc.aio.AioRpcError as e:
+                if e.code() != grpc.StatusCode.NOT_FOUND:
+                    self.mark_peer_error(peer_id, e)
+                continue
+            try:
+                self.on_receive_dictionary(response)
+            except ValueError as e:
+                log.warning(f"[{self.node_id}] Bad compression dictionary from {peer_id}: {e}")
+                continue  # corrupt copy, another peer may have a good one
+            return True
+        return False
+
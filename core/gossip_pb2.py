@@ -24,21 +24,63 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0cgossip.proto\"s\n\rGossipMessage\x12\r\n\x05topic\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\x12\x0e\n\x06sender\x18\x03 \x01(\t\x12\x11\n\ttimestamp\x18\x04 \x01(\x01\x12\x0e\n\x06msg_id\x18\x05 \x01(\t\x12\x0f\n\x07lamport\x18\x06 \x01(\x03\"+\n\x08SeenMsgs\x12\x0e\n\x06sender\x18\x01 \x01(\t\x12\x0f\n\x07msg_ids\x18\x02 \x03(\t\"\r\n\x0bPingRequest\"\x16\n\x03\x41\x63k\x12\x0f\n\x07success\x18\x01 \x01(\x08\x32q\n\rGossipService\x12#\n\x0bSendMessage\x12\x0e.GossipMessage\x1a\x04.Ack\x12\x1f\n\x0cSyncSeenMsgs\x12\t.SeenMsgs\x1a\x04.Ack\x12\x1a\n\x04Ping\x12\x0c.PingRequest\x1a\x04.Ackb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0cgossip.proto\"\xcf\x01\n\rGossipMessage\x12\r\n\x05topic\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\x12\x0e\n\x06sender\x18\x03 \x01(\t\x12\x11\n\ttimestamp\x18\x04 \x01(\x01\x12\x0e\n\x06msg_id\x18\x05 \x01(\t\x12\x0f\n\x07lamport\x18\x06 \x01(\x03\x12\x0f\n\x07payload\x18\x07 \x01(\x0c\x12\r\n\x05\x63odec\x18\x08 \x01(\r\x12\x0f\n\x07\x64ict_id\x18\t \x01(\r\x12\r\n\x05relay\x18\n \x01(\t\x12\x0b\n\x03seq\x18\x0b \x01(\x04\x12\r\n\x05\x65poch\x18\x0c \x01(\x04\"e\n\x07Payload\x12\x0e\n\x06sender\x18\x01 \x01(\t\x12\x0e\n\x04text\x18\x02 \x01(\tH\x00\x12\x0e\n\x04json\x18\x05 \x01(\tH\x00\x12\x11\n\ttimestamp\x18\x03 \x01(\x01\x12\x0f\n\x07lamport\x18\x04 \x01(\x03\x42\x06\n\x04\x62ody\"O\n\x0bGossipBatch\x12 \n\x08messages\x18\x01 \x03(\x0b\x32\x0e.GossipMessage\x12\x1e\n\x07updates\x18\x02 \x03(\x0b\x32\r.MemberUpdate\"+\n\x08SeenMsgs\x12\x0e\n\x06sender\x18\x01 \x01(\t\x12\x0f\n\x07msg_ids\x18\x02 \x03(\t\"I\n\x0c\x44igestBucket\x12\r\n\x05start\x18\x01 \x01(\x03\x12\r\n\x05\x63ount\x18\x02 \x01(\r\x12\x0c\n\x04hash\x18\x03 \x01(\x0c\x12\r\n\x05topic\x18\x04 \x01(\t\"_\n\rDigestSummary\x12\x0e\n\x06sender\x18\x01 \x01(\t\x12\x0e\n\x06window\x18\x02 \x01(\x03\x12\x1e\n\x07\x62uckets\x18\x03 \x03(\x0b\x32\r.DigestBucket\x12\x0e\n\x06topics\x18\x04 \x03(\t\"6\n\tBucketIds\x12\r\n\x05start\x18\x01 \x01(\x03\x12\x0b\n\x03ids\x18\x02 \x03(\x0c\x12\r\n\x05topic\x18\x03 \x01(\t\")\n\nDigestDiff\x12\x1b\n\x07\x62uckets\x18\x01 \x03(\x0b\x32\n.BucketIds\"+\n\x0c\x46\x65tchRequest\x12\x0e\n\x06sender\x18\x01 \x01(\t\x12\x0b\n\x03ids\x18\x02 \x03(\x0c\"Y\n\x18SubscriptionAnnouncement\x12\x0f\n\x07node_id\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\x03\x12\x0e\n\x06topics\x18\x03 \x03(\t\x12\x0b\n\x03ttl\x18\x04 \x01(\x01\"V\n\x12SubscriptionDigest\x12\x0e\n\x06sender\x18\x01 \x01(\t\x12\x30\n\rannouncements\x18\x02 \x03(\x0b\x32\x19.SubscriptionAnnouncement\"H\n\rReplayRequest\x12\r\n\x05topic\x18\x01 \x01(\t\x12\r\n\x05since\x18\x02 \x01(\x01\x12\n\n\x02\x62y\x18\x03 \x01(\t\x12\r\n\x05limit\x18\x04 \x01(\x03\"Y\n\nDictionary\x12\x0f\n\x07\x64ict_id\x18\x01 \x01(\r\x12\r\n\x05topic\x18\x02 \x01(\t\x12\r\n\x05\x63odec\x18\x03 \x01(\r\x12\x0c\n\x04\x64\x61ta\x18\x04 \x01(\x0c\x12\x0e\n\x06sender\x18\x05 \x01(\t\"$\n\x11\x44ictionaryRequest\x12\x0f\n\x07\x64ict_id\x18\x01 \x01(\r\")\n\nIHaveBatch\x12\x0e\n\x06sender\x18\x01 \x01(\t\x12\x0b\n\x03ids\x18\x02 \x03(\x0c\",\n\x0cPruneRequest\x12\x0e\n\x06sender\x18\x01 \x01(\t\x12\x0c\n\x04root\x18\x02 \x01(\t\"[\n\x0fSequenceRequest\x12\x0e\n\x06sender\x18\x01 \x01(\t\x12\r\n\x05topic\x18\x02 \x01(\t\x12\r\n\x05\x65poch\x18\x03 \x01(\x04\x12\r\n\x05start\x18\x04 \x01(\x04\x12\x0b\n\x03\x65nd\x18\x05 \x01(\x04\"Q\n\x0cMemberUpdate\x12\x0f\n\x07node_id\x18\x01 \x01(\t\x12\r\n\x05state\x18\x02 \x01(\r\x12\x13\n\x0bincarnation\x18\x03 \x01(\x04\x12\x0c\n\x04\x61\x64\x64r\x18\x04 \x01(\t\"=\n\x0bPingRequest\x12\x0e\n\x06sender\x18\x01 \x01(\t\x12\x1e\n\x07updates\x18\x02 \x03(\x0b\x32\r.MemberUpdate\"P\n\x0ePingReqRequest\x12\x0e\n\x06sender\x18\x01 \x01(\t\x12\x0e\n\x06target\x18\x02 \x01(\t\x12\x1e\n\x07updates\x18\x03 \x03(\x0b\x32\r.MemberUpdate\"@\n\x0bJoinRequest\x12\x0e\n\x06sender\x18\x01 \x01(\t\x12\x0c\n\x04\x61\x64\x64r\x18\x02 \x01(\t\x12\x13\n\x0bincarnation\x18\x03 \x01(\x04\"A\n\x0cJoinResponse\x12\x1e\n\x07members\x18\x01 \x03(\x0b\x32\r.MemberUpdate\x12\x11\n\tleader_id\x18\x02 \x01(\t\"<\n\nMemberList\x12\x0e\n\x06sender\x18\x01 \x01(\t\x12\x1e\n\x07members\x18\x02 \x03(\x0b\x32\r.MemberUpdate\"3\n\x0cLeaveRequest\x12\x0e\n\x06sender\x18\x01 \x01(\t\x12\x13\n\x0bincarnation\x18\x02 \x01(\x04\"6\n\x03\x41\x63k\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x1e\n\x07updates\x18\x02 \x03(\x0b\x32\r.MemberUpdate2\xd5\x05\n\rGossipService\x12#\n\x0bSendMessage\x12\x0e.GossipMessage\x1a\x04.Ack\x12\x1f\n\x0cSyncSeenMsgs\x12\t.SeenMsgs\x1a\x04.Ack\x12\x1a\n\x04Ping\x12\x0c.PingRequest\x1a\x04.Ack\x12 \n\x07PingReq\x12\x0f.PingReqRequest\x1a\x04.Ack\x12#\n\x04Join\x12\x0c.JoinRequest\x1a\r.JoinResponse\x12\x1c\n\x05Leave\x12\r.LeaveRequest\x1a\x04.Ack\x12&\n\x0cGossipStream\x12\x0c.GossipBatch\x1a\x04.Ack(\x01\x30\x01\x12)\n\nSyncDigest\x12\x0e.DigestSummary\x1a\x0b.DigestDiff\x12\x30\n\rFetchMessages\x12\r.FetchRequest\x1a\x0e.GossipMessage0\x01\x12\x32\n\x15\x41nnounceSubscriptions\x12\x13.SubscriptionDigest\x1a\x04.Ack\x12*\n\x06Replay\x12\x0e.ReplayRequest\x1a\x0e.GossipMessage0\x01\x12$\n\x0fShareDictionary\x12\x0b.Dictionary\x1a\x04.Ack\x12\x30\n\rGetDictionary\x12\x12.DictionaryRequest\x1a\x0b.Dictionary\x12\x1a\n\x05IHave\x12\x0b.IHaveBatch\x1a\x04.Ack\x12(\n\x05Graft\x12\r.FetchRequest\x1a\x0e.GossipMessage0\x01\x12\x1c\n\x05Prune\x12\r.PruneRequest\x1a\x04.Ack\x12\x33\n\rFetchSequence\x12\x10.SequenceRequest\x1a\x0e.GossipMessage0\x01\x12\'\n\x0bSyncMembers\x12\x0b.MemberList\x1a\x0b.MemberListb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'gossip_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
-  _globals['_GOSSIPMESSAGE']._serialized_start=16
-  _globals['_GOSSIPMESSAGE']._serialized_end=131
-  _globals['_SEENMSGS']._serialized_start=133
-  _globals['_SEENMSGS']._serialized_end=176
-  _globals['_PINGREQUEST']._serialized_start=178
-  _globals['_PINGREQUEST']._serialized_end=191
-  _globals['_ACK']._serialized_start=193
-  _globals['_ACK']._serialized_end=215
-  _globals['_GOSSIPSERVICE']._serialized_start=217
-  _globals['_GOSSIPSERVICE']._serialized_end=330
+  _globals['_GOSSIPMESSAGE']._serialized_start=17
+  _globals['_GOSSIPMESSAGE']._serialized_end=224
+  _globals['_PAYLOAD']._serialized_start=226
+  _globals['_PAYLOAD']._serialized_end=327
+  _globals['_GOSSIPBATCH']._serialized_start=329
+  _globals['_GOSSIPBATCH']._serialized_end=408
+  _globals['_SEENMSGS']._serialized_start=410
+  _globals['_SEENMSGS']._serialized_end=453
+  _globals['_DIGESTBUCKET']._serialized_start=455
+  _globals['_DIGESTBUCKET']._serialized_end=528
+  _globals['_DIGESTSUMMARY']._serialized_start=530
+  _globals['_DIGESTSUMMARY']._serialized_end=625
+  _globals['_BUCKETIDS']._serialized_start=627
+  _globals['_BUCKETIDS']._serialized_end=681
+  _globals['_DIGESTDIFF']._serialized_start=683
+  _globals['_DIGESTDIFF']._serialized_end=724
+  _globals['_FETCHREQUEST']._serialized_start=726
+  _globals['_FETCHREQUEST']._serialized_end=769
+  _globals['_SUBSCRIPTIONANNOUNCEMENT']._serialized_start=771
+  _globals['_SUBSCRIPTIONANNOUNCEMENT']._serialized_end=860
+  _globals['_SUBSCRIPTIONDIGEST']._serialized_start=862
+  _globals['_SUBSCRIPTIONDIGEST']._serialized_end=948
+  _globals['_REPLAYREQUEST']._serialized_start=950
+  _globals['_REPLAYREQUEST']._serialized_end=1022
+  _globals['_DICTIONARY']._serialized_start=1024
+  _globals['_DICTIONARY']._serialized_end=1113
+  _globals['_DICTIONARYREQUEST']._serialized_start=1115
+  _globals['_DICTIONARYREQUEST']._serialized_end=1151
+  _globals['_IHAVEBATCH']._serialized_start=1153
+  _globals['_IHAVEBATCH']._serialized_end=1194
+  _globals['_PRUNEREQUEST']._serialized_start=1196
+  _globals['_PRUNEREQUEST']._serialized_end=1240
+  _globals['_SEQUENCEREQUEST']._serialized_start=1242
+  _globals['_SEQUENCEREQUEST']._serialized_end=1333
+  _globals['_MEMBERUPDATE']._serialized_start=1335
+  _globals['_MEMBERUPDATE']._serialized_end=1416
+  _globals['_PINGREQUEST']._serialized_start=1418
+  _globals['_PINGREQUEST']._serialized_end=1479
+  _globals['_PINGREQREQUEST']._serialized_start=1481
+  _globals['_PINGREQREQUEST']._serialized_end=1561
+  _globals['_JOINREQUEST']._serialized_start=1563
+  _globals['_JOINREQUEST']._serialized_end=1627
+  _globals['_JOINRESPONSE']._serialized_start=1629
+  _globals['_JOINRESPONSE']._serialized_end=1694
+  _globals['_MEMBERLIST']._serialized_start=1696
+  _globals['_MEMBERLIST']._serialized_end=1756
+  _globals['_LEAVEREQUEST']._serialized_start=1758
+  _globals['_LEAVEREQUEST']._serialized_end=1809
+  _globals['_ACK']._serialized_start=1811
+  _globals['_ACK']._serialized_end=1865
+  _globals['_GOSSIPSERVICE']._serialized_start=1868
+  _globals['_GOSSIPSERVICE']._serialized_end=2593
 # @@protoc_insertion_point(module_scope)
@@ -49,6 +49,81 @@ class GossipServiceStub(object):
                 request_serializer=gossip__pb2.PingRequest.SerializeToString,
                 response_deserializer=gossip__pb2.Ack.FromString,
                 _registered_method=True)
+        self.PingReq = channel.unary_unary(
+                '/GossipService/PingReq',
+                request_serializer=gossip__pb2.PingReqRequest.SerializeToString,
+                response_deserializer=gossip__pb2.Ack.FromString,
+                _registered_method=True)
+        self.Join = channel.unary_unary(
+                '/GossipService/Join',
+                request_serializer=gossip__pb2.JoinRequest.SerializeToString,
+                response_deserializer=gossip__pb2.JoinResponse.FromString,
+                _registered_method=True)
+        self.Leave = channel.unary_unary(
+                '/GossipService/Leave',
+                request_serializer=gossip__pb2.LeaveRequest.SerializeToString,
+                response_deserializer=gossip__pb2.Ack.FromString,
+                _registered_method=True)
+        self.GossipStream = channel.stream_stream(
+                '/GossipService/GossipStream',
+                request_serializer=gossip__pb2.GossipBatch.SerializeToString,
+                response_deserializer=gossip__pb2.Ack.FromString,
+                _registered_method=True)
+        self.SyncDigest = channel.unary_unary(
+                '/GossipService/SyncDigest',
+                request_serializer=gossip__pb2.DigestSummary.SerializeToString,
+                response_deserializer=gossip__pb2.DigestDiff.FromString,
+                _registered_method=True)
+        self.FetchMessages = channel.unary_stream(
+                '/GossipService/FetchMessages',
+                request_serializer=gossip__pb2.FetchRequest.SerializeToString,
+                response_deserializer=gossip__pb2.GossipMessage.FromString,
+                _registered_method=True)
+        self.AnnounceSubscriptions = channel.unary_unary(
+                '/GossipService/AnnounceSubscriptions',
+                request_serializer=gossip__pb2.SubscriptionDigest.SerializeToString,
+                response_deserializer=gossip__pb2.Ack.FromString,
+                _registered_method=True)
+        self.Replay = channel.unary_stream(
+                '/GossipService/Replay',
+                request_serializer=gossip__pb2.ReplayRequest.SerializeToString,
+                response_deserializer=gossip__pb2.GossipMessage.FromString,
+                _registered_method=True)
+        self.ShareDictionary = channel.unary_unary(
+                '/GossipService/ShareDictionary',
+                request_serializer=gossip__pb2.Dictionary.SerializeToString,
+                response_deserializer=gossip__pb2.Ack.FromString,
+                _registered_method=True)
+        self.GetDictionary = channel.unary_unary(
+                '/GossipService/GetDictionary',
+                request_serializer=gossip__pb2.DictionaryRequest.SerializeToString,
+                response_deserializer=gossip__pb2.Dictionary.FromString,
+                _registered_method=True)
+        self.IHave = channel.unary_unary(
+                '/GossipService/IHave',
+                request_serializer=gossip__pb2.IHaveBatch.SerializeToString,
+                response_deserializer=gossip__pb2.Ack.FromString,
+                _registered_method=True)
+        self.Graft = channel.unary_stream(
+                '/GossipService/Graft',
+                request_serializer=gossip__pb2.FetchRequest.SerializeToString,
+                response_deserializer=gossip__pb2.GossipMessage.FromString,
+                _registered_method=True)
+        self.Prune = channel.unary_unary(
+                '/GossipService/Prune',
+                request_serializer=gossip__pb2.PruneRequest.SerializeToString,
+                response_deserializer=gossip__pb2.Ack.FromString,
+                _registered_method=True)
+        self.FetchSequence = channel.unary_stream(
+                '/GossipService/FetchSequence',
+                request_serializer=gossip__pb2.SequenceRequest.SerializeToString,
+                response_deserializer=gossip__pb2.GossipMessage.FromString,
+                _registered_method=True)
+        self.SyncMembers = channel.unary_unary(
+                '/GossipService/SyncMembers',
+                request_serializer=gossip__pb2.MemberList.SerializeToString,
+                response_deserializer=gossip__pb2.MemberList.FromString,
+                _registered_method=True)
 
 
 class GossipServiceServicer(object):
@@ -72,6 +147,96 @@ class GossipServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def PingReq(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Join(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Leave(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GossipStream(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SyncDigest(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def FetchMessages(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def AnnounceSubscriptions(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Replay(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ShareDictionary(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetDictionary(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def IHave(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Graft(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Prune(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def FetchSequence(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SyncMembers(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_GossipServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -90,6 +255,81 @@ def add_GossipServiceServicer_to_server(servicer, server):
                     request_deserializer=gossip__pb2.PingRequest.FromString,
                     response_serializer=gossip__pb2.Ack.SerializeToString,
             ),
+            'PingReq': grpc.unary_unary_rpc_method_handler(
+                    servicer.PingReq,
+                    request_deserializer=gossip__pb2.PingReqRequest.FromString,
+                    response_serializer=gossip__pb2.Ack.SerializeToString,
+            ),
+            'Join': grpc.unary_unary_rpc_method_handler(
+                    servicer.Join,
+                    request_deserializer=gossip__pb2.JoinRequest.FromString,
+                    response_serializer=gossip__pb2.JoinResponse.SerializeToString,
+            ),
+            'Leave': grpc.unary_unary_rpc_method_handler(
+                    servicer.Leave,
+                    request_deserializer=gossip__pb2.LeaveRequest.FromString,
+                    response_serializer=gossip__pb2.Ack.SerializeToString,
+            ),
+            'GossipStream': grpc.stream_stream_rpc_method_handler(
+                    servicer.GossipStream,
+                    request_deserializer=gossip__pb2.GossipBatch.FromString,
+                    response_serializer=gossip__pb2.Ack.SerializeToString,
+            ),
+            'SyncDigest': grpc.unary_unary_rpc_method_handler(
+                    servicer.SyncDigest,
+                    request_deserializer=gossip__pb2.DigestSummary.FromString,
+                    response_serializer=gossip__pb2.DigestDiff.SerializeToString,
+            ),
+            'FetchMessages': grpc.unary_stream_rpc_method_handler(
+                    servicer.FetchMessages,
+                    request_deserializer=gossip__pb2.FetchRequest.FromString,
+                    response_serializer=gossip__pb2.GossipMessage.SerializeToString,
+            ),
+            'AnnounceSubscriptions': grpc.unary_unary_rpc_method_handler(
+                    servicer.AnnounceSubscriptions,
+                    request_deserializer=gossip__pb2.SubscriptionDigest.FromString,
+                    response_serializer=gossip__pb2.Ack.SerializeToString,
+            ),
+            'Replay': grpc.unary_stream_rpc_method_handler(
+                    servicer.Replay,
+                    request_deserializer=gossip__pb2.ReplayRequest.FromString,
+                    response_serializer=gossip__pb2.GossipMessage.SerializeToString,
+            ),
+            'ShareDictionary': grpc.unary_unary_rpc_method_handler(
+                    servicer.ShareDictionary,
+                    request_deserializer=gossip__pb2.Dictionary.FromString,
+                    response_serializer=gossip__pb2.Ack.SerializeToString,
+            ),
+            'GetDictionary': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetDictionary,
+                    request_deserializer=gossip__pb2.DictionaryRequest.FromString,
+                    response_serializer=gossip__pb2.Dictionary.SerializeToString,
+            ),
+            'IHave': grpc.unary_unary_rpc_method_handler(
+                    servicer.IHave,
+                    request_deserializer=gossip__pb2.IHaveBatch.FromString,
+                    response_serializer=gossip__pb2.Ack.SerializeToString,
+            ),
+            'Graft': grpc.unary_stream_rpc_method_handler(
+                    servicer.Graft,
+                    request_deserializer=gossip__pb2.FetchRequest.FromString,
+                    response_serializer=gossip__pb2.GossipMessage.SerializeToString,
+            ),
+            'Prune': grpc.unary_unary_rpc_method_handler(
+                    servicer.Prune,
+                    request_deserializer=gossip__pb2.PruneRequest.FromString,
+                    response_serializer=gossip__pb2.Ack.SerializeToString,
+            ),
+            'FetchSequence': grpc.unary_stream_rpc_method_handler(
+                    servicer.FetchSequence,
+                    request_deserializer=gossip__pb2.SequenceRequest.FromString,
+                    response_serializer=gossip__pb2.GossipMessage.SerializeToString,
+            ),
+            'SyncMembers': grpc.unary_unary_rpc_method_handler(
+                    servicer.SyncMembers,
+                    request_deserializer=gossip__pb2.MemberList.FromString,
+                    response_serializer=gossip__pb2.MemberList.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'GossipService', rpc_method_handlers)
@@ -181,3 +421,408 @@ class GossipService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def PingReq(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/GossipService/PingReq',
+            gossip__pb2.PingReqRequest.SerializeToString,
+            gossip__pb2.Ack.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def Join(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/GossipService/Join',
+            gossip__pb2.JoinRequest.SerializeToString,
+            gossip__pb2.JoinResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def Leave(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/GossipService/Leave',
+            gossip__pb2.LeaveRequest.SerializeToString,
+            gossip__pb2.Ack.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GossipStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/GossipService/GossipStream',
+            gossip__pb2.GossipBatch.SerializeToString,
+            gossip__pb2.Ack.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SyncDigest(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/GossipService/SyncDigest',
+            gossip__pb2.DigestSummary.SerializeToString,
+            gossip__pb2.DigestDiff.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def FetchMessages(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/GossipService/FetchMessages',
+            gossip__pb2.FetchRequest.SerializeToString,
+            gossip__pb2.GossipMessage.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def AnnounceSubscriptions(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/GossipService/AnnounceSubscriptions',
+            gossip__pb2.SubscriptionDigest.SerializeToString,
+            gossip__pb2.Ack.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def Replay(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/GossipService/Replay',
+            gossip__pb2.ReplayRequest.SerializeToString,
+            gossip__pb2.GossipMessage.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ShareDictionary(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/GossipService/ShareDictionary',
+            gossip__pb2.Dictionary.SerializeToString,
+            gossip__pb2.Ack.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetDictionary(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/GossipService/GetDictionary',
+            gossip__pb2.DictionaryRequest.SerializeToString,
+            gossip__pb2.Dictionary.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def IHave(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/GossipService/IHave',
+            gossip__pb2.IHaveBatch.SerializeToString,
+            gossip__pb2.Ack.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def Graft(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/GossipService/Graft',
+            gossip__pb2.FetchRequest.SerializeToString,
+            gossip__pb2.GossipMessage.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def Prune(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/GossipService/Prune',
+            gossip__pb2.PruneRequest.SerializeToString,
+            gossip__pb2.Ack.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def FetchSequence(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/GossipService/FetchSequence',
+            gossip__pb2.SequenceRequest.SerializeToString,
+            gossip__pb2.GossipMessage.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SyncMembers(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/GossipService/SyncMembers',
+            gossip__pb2.MemberList.SerializeToString,
+            gossip__pb2.MemberList.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -3,6 +3,9 @@ import grpc
 import gossip_pb2
 import gossip_pb2_grpc
 from concurrent import futures
+from core.channel_pool import SERVER_KEEPALIVE_OPTIONS
+from core.topic_trie import validate_pattern
+from core.log_writer import log
 
 class GossipServiceServicer(gossip_pb2_grpc.GossipServiceServicer):
     def __init__(self, node):
@@ -10,16 +13,16 @@ class GossipServiceServicer(gossip_pb2_grpc.GossipServiceServicer):
     
     async def SendMessage(self, request, context):
         # print(f"[{self.node.node_id}] SendMessage handler triggered!") 
-        msg = {
-            "topic": request.topic,
-            "content": request.content,
-            "sender": request.sender,
-            "timestamp": request.timestamp,
-            "msg_id": request.msg_id
-        }
-        # print(f"[{self.node.node_id}] received: {msg}")
-        self.node.receive(msg)
-        return gossip_pb2.Ack(success=True)
+        self.node.receive(self.node.gossip.from_proto(request))
+        return gossip_pb2.Ack(success=True, updates=self.node.gossip.membership.piggyback())
+
+    async def GossipStream(self, request_iterator, context):
+        membership = self.node.gossip.membership
+        async for batch in request_iterator:
+            membership.merge(batch.updates)
+            for request in batch.messages:
+                self.node.receive(self.node.gossip.from_proto(request))
+            yield gossip_pb2.Ack(success=True, updates=membership.piggyback())
 
     async def SyncSeenMsgs(self, request, context):
             peer_id = request.sender
@@ -27,17 +30,96 @@ class GossipServiceServicer(gossip_pb2_grpc.GossipServiceServicer):
             await self.node.gossip.on_receive_seen_msgs(peer_id, their_msg_ids)
             return gossip_pb2.Ack(success=True)
     
-    async def Ping(self, request, context):
+    async def SyncDigest(self, request, context):
+        diff = self.node.gossip.on_receive_digest(request)
+        if diff is None:
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, "digest window mismatch")
+        return diff
+
+    async def FetchMessages(self, request, context):
+        for grpc_message in self.node.gossip.iter_stored(request.ids):
+            yield grpc_message
+
+    async def AnnounceSubscriptions(self, request, context):
+        self.node.gossip.on_receive_announcements(request)
+        return gossip_pb2.Ack(success=True)
+
+    async def Replay(self, request, context):
+        by = request.by or "timestamp"
+        if by not in ("timestamp", "lamport"):
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "by must be 'timestamp' or 'lamport'")
+        try:
+            validate_pattern(request.topic)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        for message in self.node.gossip.replay(request.topic, request.since, by, request.limit or None):
+            yield self.node.gossip.to_proto(message)
+
+    async def ShareDictionary(self, request, context):
+        try:
+            self.node.gossip.on_receive_dictionary(request)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        return gossip_pb2.Ack(success=True)
+
+    async def GetDictionary(self, request, context):
+        entry = self.node.compressor.dictionaries.get(request.dict_id)
+        if entry is None:
+            await context.abort(grpc.StatusCode.NOT_FOUND, f"no dictionary {request.dict_id:08x}")
+        topic, codec, data = entry
+        return gossip_pb2.Dictionary(dict_id=request.dict_id, topic=topic, codec=codec, data=data,
+                                     sender=self.node.node_id)
+
+    # plumtree control messages; a node in plain gossip mode ignores them but still serves grafts
+    async def IHave(self, request, context):
+        if self.node.gossip.plumtree:
+            self.node.gossip.plumtree.on_ihave(request.sender, request.ids)
         return gossip_pb2.Ack(success=True)
 
+    async def Graft(self, request, context):
+        plumtree = self.node.gossip.plumtree
+        stored = plumtree.on_graft(request.sender, request.ids) if plumtree else self.node.gossip.iter_stored(request.ids)
+        for grpc_message in stored:
+            yield grpc_message
+
+    async def Prune(self, request, context):
+        if self.node.gossip.plumtree:
+            self.node.gossip.plumtree.on_prune(request.sender, request.root)
+        return gossip_pb2.Ack(success=True)
+
+    async def FetchSequence(self, request, context):
+        for message in self.node.sequencer.recent_range(request.topic, request.epoch, request.start, request.end):
+            yield self.node.gossip.to_proto(message)
+
+    async def Ping(self, request, context):
+        return self.node.gossip.membership.on_ping(request)
+
+    async def PingReq(self, request, context):
+        return await self.node.gossip.membership.on_ping_req(request)
+
+    async def Join(self, request, context):
+        response = self.node.gossip.membership.on_join(request)
+        response.leader_id = self.node.leader_id
+        return response
+
+    async def Leave(self, request, context):
+        return self.node.gossip.membership.on_leave(request)
+
+    async def SyncMembers(self, request, context):
+        return self.node.gossip.membership.on_sync(request)
+
 async def serve(node, port):
-    server = grpc.aio.server()
+    server = grpc.aio.server(options=SERVER_KEEPALIVE_OPTIONS)
     gossip_pb2_grpc.add_GossipServiceServicer_to_server(GossipServiceServicer(node), server)
     server.add_insecure_port(f"[::]:{port}")
     # print(f"[{node.node_id}] gRPC server starting on [::]:{port}")
     await server.start()
     # print(f"[{node.node_id}] gRPC server started!")
-    print(f"gRPC aio server for {node.node_id} started on port {port}")
-    await server.wait_for_termination()
+    log.info(f"gRPC aio server for {node.node_id} started on port {port}")
+    try:
+        await server.wait_for_termination()
+    finally:
+        # cancelled at shutdown: stop while the event loop is still running
+        await server.stop(1)
     # asyncio.create_task(server.start())
     # return server
\ No newline at end of file
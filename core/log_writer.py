@@ -0,0 +1,139 @@
+# log_writer.py
+import os
+import sys
+import queue
+import atexit
+import threading
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+
+
+class LogWriter:
+    """
+    Takes console output and append-only log files off the event loop. Callers
+    only enqueue lines; a background thread drains the queue in batches, writes
+    each file once per batch, flushes, and rotates files that outgrow max_bytes.
+    Console lines are filtered by level; file lines (sender.log, node_latency.log,
+    ...) are data for the analysis scripts and are always written.
+    """
+    def __init__(self, level="INFO", flush_interval=0.2, max_batch=2000, max_bytes=50 * 1024 * 1024, backup_count=3):
+        self.level = LEVELS[level]
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.queue = queue.SimpleQueue()
+        self.files = {}  # path -> open file object
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def configure(self, level=None, max_bytes=None, backup_count=None, flush_interval=None):
+        if level is not None:
+            self.level = LEVELS[level.upper()]
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        if backup_count is not None:
+            self.backup_count = backup_count
+        if flush_interval is not None:
+            self.flush_interval = flush_interval
+
+    def log(self, level, text):
+        if LEVELS[level] >= self.level:
+            self.put((None, text + "\n"))
+
+    def debug(self, text):
+        self.log("DEBUG", text)
+
+    def info(self, text):
+        self.log("INFO", text)
+
+    def warning(self, text):
+        self.log("WARNING", text)
+
+    def error(self, text):
+        self.log("ERROR", text)
+
+    def write(self, path, text):
+        """Append text (including its newline) to the file at path."""
+        self.put((path, text))
+
+    def put(self, item):
+        if self.thread is None:
+            self.start()
+        self.queue.put(item)
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="log-writer", daemon=True)
+                self.thread.start()
+                atexit.register(self.flush)
+
+    def flush(self, timeout=5):
+        """Block until everything queued so far has been written."""
+        if self.thread is None:
+            return
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait(timeout)
+
+    def run(self):
+        while True:
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            self.write_batch(batch)
+
+    def write_batch(self, batch):
+        by_path = {}
+        waiters = []
+        for item in batch:
+            if isinstance(item, threading.Event):
+                waiters.append(item)
+                continue
+            path, text = item
+            by_path.setdefault(path, []).append(text)
+        for path, lines in by_path.items():
+            try:
+                if path is None:
+                    sys.stdout.write("".join(lines))
+                    sys.stdout.flush()
+                else:
+                    f = self.open(path)
+                    f.write("".join(lines))
+                    f.flush()
+                    if self.max_bytes and f.tell() >= self.max_bytes:
+                        self.rotate(path)
+            except Exception as e:
+                sys.stderr.write(f"log writer failed on {path or 'stdout'}: {e}\n")
+        for done in waiters:
+            done.set()
+
+    def open(self, path):
+        f = self.files.get(path)
+        if f is None:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            f = self.files[path] = open(path, "a")
+        return f
+
+    def rotate(self, path):
+        self.files.pop(path).close()
+        for i in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f"{path}.{i}"):
+                os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(path, f"{path}.1")
+        else:
+            os.remove(path)
+
+
+# shared by every module in the process
+log = LogWriter()
@@ -0,0 +1,344 @@
+# membership.py
+import math
+import random
+import asyncio
+from collections import Counter
+import grpc.aio
+from core import gossip_pb2
+from core.log_writer import log
+
+ALIVE, SUSPECT, DEAD, LEFT = 0, 1, 2, 3
+STATE_NAMES = {ALIVE: "alive", SUSPECT: "suspect", DEAD: "dead", LEFT: "left"}
+
+
+def format_addr(addr):
+    """(host, port) -> "host:port", "" when unknown."""
+    return f"{addr[0]}:{addr[1]}" if addr else ""
+
+
+class Member:
+    __slots__ = ("state", "incarnation", "addr")
+
+    def __init__(self, state=ALIVE, incarnation=0, addr=""):
+        self.state = state
+        self.incarnation = incarnation
+        self.addr = addr
+
+
+class Membership:
+    """
+    SWIM failure detector (Das, Gupta, Motivala: "SWIM", DSN 2002) over the
+    static peer list. Every probe_interval one member, taken in shuffled
+    round-robin order, is pinged directly; if it does not answer within
+    probe_timeout, `indirect` other members are asked to ping it (PingReq). No
+    answer by the end of the period makes it SUSPECT, and a suspect that does not
+    refute within suspicion_mult * log10(N) periods becomes DEAD. A node refutes
+    a suspicion about itself by bumping its incarnation.
+
+    Changes are not broadcast separately: each one rides on the next
+    ~retransmit_mult * log(N) pings, acks and GossipStream frames, and every
+    ping carries the sender's own record, so whoever it pings knows it. Every
+    few periods a dead member is pinged as well, so a node that comes back (or
+    a healed partition) learns about its own death, refutes it and rejoins.
+    Piggybacking is best effort; every sync_every periods the whole member list
+    is swapped with one random live member (push-pull), so a node restarted from
+    peers.json still converges on members it missed.
+
+    The member list is not fixed: a new node Joins through a seed, which adds
+    it and answers with every member it knows, and the seed's ALIVE record for
+    it spreads like any other update, carrying its address. A node that Leaves
+    is marked LEFT; unlike DEAD it is never probed again and is dropped from the
+    agent's peers, routes, streams and channels. LEFT records are kept as
+    tombstones so stale rumours cannot bring the node back; rejoining takes a
+    higher incarnation, which the leaver gets by refuting its tombstone.
+    Unknown nodes count as LEFT.
+    """
+    def __init__(self, agent, probe_interval=1.0, probe_timeout=0.4, indirect=3, suspicion_mult=4,
+                 retransmit_mult=3, max_piggyback=8, dead_probe_every=10, sync_every=10):
+        self.agent = agent
+        self.node_id = agent.node_id
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.indirect = indirect
+        self.suspicion_mult = suspicion_mult
+        self.retransmit_mult = retransmit_mult
+        self.max_piggyback = max_piggyback
+        self.dead_probe_every = dead_probe_every
+        self.sync_every = sync_every
+        self.incarnation = 0
+        self.leaving = False
+        self.addr = format_addr(agent.peer_addrs.get(self.node_id))
+        self.members = {peer_id: Member(addr=format_addr(agent.peer_addrs.get(peer_id))) for peer_id in agent.peers}
+        self.updates = {}  # node_id -> times piggybacked so far, newest state is read from members
+        self.suspect_timers = {}  # node_id -> TimerHandle
+        self.probe_order = []
+        self.periods = 0
+        self.listeners = []  # called with (node_id, state) on every state change
+        self.deaths = Counter()  # node_id -> times declared dead
+
+    def alive(self):
+        """Members not declared dead or gone (suspects still count, they may refute)."""
+        return [node_id for node_id, member in self.members.items() if member.state in (ALIVE, SUSPECT)]
+
+    def is_dead(self, node_id):
+        member = self.members.get(node_id)
+        return member is not None and member.state == DEAD
+
+    # dissemination
+
+    def retransmit_limit(self):
+        return self.retransmit_mult * math.ceil(math.log(len(self.agent.peers) + 2))
+
+    def piggyback(self):
+        """Updates to attach to an outgoing message, least sent first."""
+        if not self.updates:
+            return []
+        chosen = sorted(self.updates, key=self.updates.get)[:self.max_piggyback]
+        limit = self.retransmit_limit()
+        updates = []
+        for node_id in chosen:
+            self.updates[node_id] += 1
+            if self.updates[node_id] >= limit:
+                del self.updates[node_id]
+            updates.append(self.record(node_id))
+        return updates
+
+    def record(self, node_id):
+        if node_id == self.node_id:
+            state = LEFT if self.leaving else ALIVE
+            return gossip_pb2.MemberUpdate(node_id=node_id, state=state, incarnation=self.incarnation, addr=self.addr)
+        member = self.members[node_id]
+        return gossip_pb2.MemberUpdate(node_id=node_id, state=member.state, incarnation=member.incarnation,
+                                       addr=member.addr)
+
+    def snapshot(self):
+        """Every member we know, ourselves included, for a joining node or a push-pull."""
+        return [self.record(self.node_id)] + [self.record(node_id) for node_id in self.members]
+
+    def merge(self, updates):
+        for update in updates:
+            self.apply(update.node_id, update.state, update.incarnation, update.addr)
+
+    def apply(self, node_id, state, incarnation, addr=""):
+        if node_id == self.node_id:
+            if state != ALIVE and incarnation >= self.incarnation and not self.leaving:
+                self.incarnation = incarnation + 1
+                self.updates[self.node_id] = 0
+                log.info(f"[{self.node_id}] Refuting {STATE_NAMES[state]} rumour, incarnation {self.incarnation}")
+            return
+        member = self.members.get(node_id)
+        if member is None:
+            if state == DEAD:
+                return  # nothing to learn about a node we never knew
+            if state == LEFT:
+                self.members[node_id] = Member(LEFT, incarnation, addr)  # tombstone only
+                return
+            member = self.members[node_id] = Member(LEFT, -1, addr)  # a new node, any incarnation is news
+        if state == ALIVE:
+            accept = incarnation > member.incarnation
+        elif state == SUSPECT:
+            accept = (incarnation > member.incarnation
+                      or (incarnation == member.incarnation and member.state == ALIVE))
+        else:
+            accept = incarnation >= member.incarnation and member.state not in (state, LEFT)
+        if accept:
+            self.set_state(node_id, state, incarnation, addr)
+
+    def set_state(self, node_id, state, incarnation, addr=""):
+        member = self.members[node_id]
+        previous = member.state
+        moved = addr and addr != member.addr
+        member.state, member.incarnation = state, incarnation
+        if addr:
+            member.addr = addr
+        self.updates[node_id] = 0
+        timer = self.suspect_timers.pop(node_id, None)
+        if timer:
+            timer.cancel()
+        if state == SUSPECT:
+            timeout = self.suspicion_mult * max(1.0, math.log10(len(self.agent.peers) + 1)) * self.probe_interval
+            self.suspect_timers[node_id] = asyncio.get_running_loop().call_later(
+                timeout, self.suspicion_expired, node_id, incarnation)
+        if state != LEFT and (previous == LEFT or moved):
+            self.agent.add_peer(node_id, member.addr)
+        if state == previous:
+            return
+        if state == LEFT:
+            log.info(f"[{self.node_id}] Peer {node_id} left (incarnation {incarnation}).")
+            self.agent.remove_peer(node_id)
+        elif previous == LEFT:
+            log.info(f"[{self.node_id}] Peer {node_id} joined at {member.addr or '?'} (incarnation {incarnation}).")
+        elif state == DEAD:
+            self.deaths[node_id] += 1
+            log.warning(f"[{self.node_id}] Peer {node_id} is dead (incarnation {incarnation}).")
+        elif previous == DEAD:
+            log.info(f"[{self.node_id}] Peer {node_id} is back (incarnation {incarnation}).")
+        else:
+            log.info(f"[{self.node_id}] Peer {node_id} is {STATE_NAMES[state]} (incarnation {incarnation}).")
+        if state != LEFT:
+            self.agent.peer_unavailable[node_id] = state == DEAD
+        for listener in self.listeners:
+            listener(node_id, state)
+
+    def suspicion_expired(self, node_id, incarnation):
+        self.suspect_timers.pop(node_id, None)
+        member = self.members[node_id]
+        if member.state == SUSPECT and member.incarnation == incarnation:
+            self.set_state(node_id, DEAD, incarnation)
+
+    # probing
+
+    def next_target(self):
+        self.periods += 1
+        dead = [node_id for node_id, member in self.members.items() if member.state == DEAD]
+        if dead and self.periods % self.dead_probe_every == 0:
+            return random.choice(dead)
+        if not self.probe_order:
+            self.probe_order = self.alive()
+            random.shuffle(self.probe_order)
+        while self.probe_order:
+            node_id = self.probe_order.pop()
+            if self.members[node_id].state in (ALIVE, SUSPECT):
+                return node_id
+        return None
+
+    async def probe_loop(self):
+        loop = asyncio.get_running_loop()
+        while not self.leaving:
+            start = loop.time()
+            target = self.next_target()
+            if target:
+                await self.probe(target)
+            if self.periods % self.sync_every == 0:
+                asyncio.ensure_future(self.push_pull())
+            await asyncio.sleep(max(0.0, self.probe_interval - (loop.time() - start)))
+
+    async def probe(self, target):
+        if await self.ping(target, self.probe_timeout):
+            return True
+        if self.members[target].state not in (ALIVE, SUSPECT):
+            return False
+        helpers = [node_id for node_id in self.alive() if node_id != target]
+        helpers = random.sample(helpers, min(self.indirect, len(helpers)))
+        remaining = max(self.probe_timeout, self.probe_interval - self.probe_timeout)
+        results = await asyncio.gather(*(self.ping_req(helper, target, remaining) for helper in helpers))
+        if any(results):
+            return True
+        member = self.members[target]
+        if member.state == ALIVE:
+            self.set_state(target, SUSPECT, member.incarnation)
+        return False
+
+    def outgoing(self, peer_id):
+        """Piggybacked updates plus our own record, and what we think of peer_id unless it is alive."""
+        updates = [update for update in self.piggyback() if update.node_id != self.node_id]
+        updates.append(self.record(self.node_id))
+        member = self.members.get(peer_id)
+        if member and member.state != ALIVE and all(update.node_id != peer_id for update in updates):
+            # always tell a suspect or dead member what we think of it, so it can refute
+            updates.append(gossip_pb2.MemberUpdate(node_id=peer_id, state=member.state, incarnation=member.incarnation))
+        return updates
+
+    async def ping(self, target, timeout):
+        request = gossip_pb2.PingRequest(sender=self.node_id, updates=self.outgoing(target))
+        try:
+            ack = await self.agent.channels.stub(target).Ping(request, timeout=timeout)
+        except grpc.aio.AioRpcError:
+            return False
+        self.agent.channels.mark_ok(target)
+        self.merge(ack.updates)
+        return True
+
+    async def ping_req(self, helper, target, timeout):
+        request = gossip_pb2.PingReqRequest(sender=self.node_id, target=target, updates=self.outgoing(helper))
+        try:
+            ack = await self.agent.channels.stub(helper).PingReq(request, timeout=timeout)
+        except grpc.aio.AioRpcError:
+            return False
+        self.merge(ack.updates)
+        return ack.success
+
+    async def push_pull(self, timeout=2.0):
+        alive = self.alive()
+        if not alive or self.leaving:
+            return False
+        peer_id = random.choice(alive)
+        request = gossip_pb2.MemberList(sender=self.node_id, members=self.snapshot())
+        try:
+            response = await self.agent.channels.stub(peer_id).SyncMembers(request, timeout=timeout)
+        except grpc.aio.AioRpcError:
+            return False  # probing decides whether the peer is down
+        self.merge(response.members)
+        return True
+
+    # joining and leaving
+
+    async def join(self, seeds, timeout=2.0):
+        """Ask each seed in turn to add us; returns the first JoinResponse, or None if no seed answered."""
+        for seed in seeds:
+            for _ in range(2):
+                incarnation = self.incarnation
+                request = gossip_pb2.JoinRequest(sender=self.node_id, addr=self.addr, incarnation=incarnation)
+                try:
+                    response = await self.agent.channels.stub(seed).Join(request, timeout=timeout)
+                except grpc.aio.AioRpcError as e:
+                    log.warning(f"[{self.node_id}] Seed {seed} did not answer Join: {e.code().name}")
+                    break
+                self.merge(response.members)
+                if self.incarnation == incarnation:
+                    log.info(f"[{self.node_id}] Joined through {seed}, {len(self.alive())} live members")
+                    return response
+                # the seed remembered us as dead or gone; ask again with the incarnation that refutes it
+        return None
+
+    async def leave(self, timeout=1.0):
+        """Announce that we are leaving to a few members; returns how many acknowledged it."""
+        self.leaving = True
+        self.updates[self.node_id] = 0
+        alive = self.alive()
+        targets = random.sample(alive, min(self.indirect + 1, len(alive)))
+        request = gossip_pb2.LeaveRequest(sender=self.node_id, incarnation=self.incarnation)
+
+        async def notify(peer_id):
+            try:
+                await self.agent.channels.stub(peer_id).Leave(request, timeout=timeout)
+                return True
+            except (grpc.aio.AioRpcError, asyncio.CancelledError):
+                return False  # a peer shutting down at the same time cancels the call
+
+        acked = sum(await asyncio.gather(*(notify(peer_id) for peer_id in targets)))
+        log.info(f"[{self.node_id}] Left the cluster ({acked}/{len(targets)} members notified)")
+        return acked
+
+    # server side
+
+    def on_join(self, request):
+        self.apply(request.sender, ALIVE, request.incarnation, request.addr)
+        return gossip_pb2.JoinResponse(members=self.snapshot())
+
+    def on_leave(self, request):
+        self.apply(request.sender, LEFT, request.incarnation)
+        return gossip_pb2.Ack(success=True, updates=self.piggyback())
+
+    def on_ping(self, request):
+        self.merge(request.updates)
+        return gossip_pb2.Ack(success=True, updates=self.outgoing(request.sender))
+
+    async def on_ping_req(self, request):
+        self.merge(request.updates)
+        ok = await self.ping(request.target, self.probe_timeout)
+        return gossip_pb2.Ack(success=ok, updates=self.outgoing(request.sender))
+
+    def on_sync(self, request):
+        self.merge(request.members)
+        return gossip_pb2.MemberList(sender=self.node_id, members=self.snapshot())
+
+    def status(self):
+        return {
+            "incarnation": self.incarnation,
+            "addr": self.addr,
+            "leaving": self.leaving,
+            "members": {node_id: {"state": STATE_NAMES[member.state], "incarnation": member.incarnation,
+                                  "addr": member.addr}
+                        for node_id, member in sorted(self.members.items())},
+        }
@@ -0,0 +1,199 @@
+# memory_transport.py
+import random
+import asyncio
+from collections import Counter
+import grpc
+import grpc.aio
+from core import gossip_pb2
+
+# request type of every GossipService call, used to copy requests through their wire form
+REQUESTS = {
+    "SendMessage": gossip_pb2.GossipMessage,
+    "SyncSeenMsgs": gossip_pb2.SeenMsgs,
+    "Ping": gossip_pb2.PingRequest,
+    "PingReq": gossip_pb2.PingReqRequest,
+    "Join": gossip_pb2.JoinRequest,
+    "Leave": gossip_pb2.LeaveRequest,
+    "SyncMembers": gossip_pb2.MemberList,
+    "SyncDigest": gossip_pb2.DigestSummary,
+    "AnnounceSubscriptions": gossip_pb2.SubscriptionDigest,
+    "ShareDictionary": gossip_pb2.Dictionary,
+    "GetDictionary": gossip_pb2.DictionaryRequest,
+    "FetchMessages": gossip_pb2.FetchRequest,
+    "Replay": gossip_pb2.ReplayRequest,
+    "GossipStream": gossip_pb2.GossipBatch,
+    "IHave": gossip_pb2.IHaveBatch,
+    "Graft": gossip_pb2.FetchRequest,
+    "Prune": gossip_pb2.PruneRequest,
+    "FetchSequence": gossip_pb2.SequenceRequest,
+}
+STREAMING_RESPONSES = {"FetchMessages", "Replay", "Graft", "FetchSequence"}
+
+
+def rpc_error(code, details):
+    return grpc.aio.AioRpcError(code, grpc.aio.Metadata(), grpc.aio.Metadata(), details)
+
+
+class MemoryContext:
+    """The part of grpc.aio.ServicerContext the servicer uses."""
+    async def abort(self, code, details=""):
+        raise rpc_error(code, details)
+
+
+class MemoryNetwork:
+    """
+    In-process stand-in for the gRPC network between simulated nodes. Calls go
+    straight to the target's GossipServiceServicer, with requests copied through
+    their serialized form, after a one-way latency of latency +- jitter seconds.
+    A call fails with UNAVAILABLE if the link drops it (probability loss), if the
+    two nodes are in different partitions, or if the target is down. Every
+    message hand-off is recorded so the simulator can compute hops and duplicates.
+    """
+    def __init__(self, latency=0.005, jitter=0.002, loss=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.servicers = {}  # node_id -> GossipServiceServicer
+        self.down = set()
+        self.partition_of = {}  # node_id -> partition number, empty when healed
+        self.stats = Counter()
+        self.hops = {}  # (node_id, msg_id) -> hops from the publisher on first arrival
+        self.handoffs = Counter()  # msg_id -> messages carried, duplicates included
+
+    def attach(self, node_id, servicer):
+        self.servicers[node_id] = servicer
+
+    def pool(self, node_id):
+        return MemoryChannelPool(self, node_id)
+
+    def partition(self, groups):
+        """Split the cluster: nodes in different groups cannot reach each other."""
+        self.partition_of = {node_id: i for i, group in enumerate(groups) for node_id in group}
+
+    def heal(self):
+        self.partition_of = {}
+
+    def reachable(self, src, dst):
+        if dst in self.down or src in self.down:
+            return False
+        return self.partition_of.get(src) == self.partition_of.get(dst)
+
+    def delay(self):
+        return max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+
+    async def hop(self, src, dst, method):
+        """One-way trip; raises UNAVAILABLE if the call does not get through."""
+        self.stats[f"calls_{method}"] += 1
+        await asyncio.sleep(self.delay())
+        if not self.reachable(src, dst) or (self.loss and self.rng.random() < self.loss):
+            self.stats["dropped"] += 1
+            raise rpc_error(grpc.StatusCode.UNAVAILABLE, f"{src} -> {dst} unreachable")
+
+    def carried(self, src, dst, message):
+        self.stats["messages"] += 1
+        self.handoffs[message.msg_id] += 1
+        key = (dst, message.msg_id)
+        if key not in self.hops:
+            self.hops[key] = self.hops.get((src, message.msg_id), 0) + 1
+
+    def copy(self, method, request):
+        data = request.SerializeToString()
+        self.stats["bytes"] += len(data)
+        return REQUESTS[method].FromString(data)
+
+
+class MemoryStub:
+    def __init__(self, network, src, dst):
+        self.network = network
+        self.src = src
+        self.dst = dst
+
+    def __getattr__(self, method):
+        if method not in REQUESTS:
+            raise AttributeError(method)
+        if method == "GossipStream":
+            return self.stream_call
+        if method in STREAMING_RESPONSES:
+            return lambda request, timeout=None: self.streaming_call(method, request)
+        return lambda request, timeout=None: self.unary_call(method, request, timeout)
+
+    def servicer(self):
+        servicer = self.network.servicers.get(self.dst)
+        if servicer is None:
+            raise rpc_error(grpc.StatusCode.UNAVAILABLE, f"no node {self.dst}")
+        return servicer
+
+    async def unary_call(self, method, request, timeout):
+        async def call():
+            await self.network.hop(self.src, self.dst, method)
+            request_copy = self.network.copy(method, request)
+            if method == "SendMessage":
+                self.network.carried(self.src, self.dst, request_copy)
+            response = await getattr(self.servicer(), method)(request_copy, MemoryContext())
+            await asyncio.sleep(self.network.delay())
+            return response
+        try:
+            return await asyncio.wait_for(call(), timeout)
+        except asyncio.TimeoutError:
+            raise rpc_error(grpc.StatusCode.DEADLINE_EXCEEDED, f"{method} to {self.dst} timed out")
+
+    async def streaming_call(self, method, request):
+        await self.network.hop(self.src, self.dst, method)
+        async for response in getattr(self.servicer(), method)(self.network.copy(method, request), MemoryContext()):
+            if not self.network.reachable(self.src, self.dst):
+                raise rpc_error(grpc.StatusCode.UNAVAILABLE, f"{self.src} -> {self.dst} unreachable")
+            if method == "Graft":
+                # grafted messages travel back along the repaired tree link
+                self.network.carried(self.dst, self.src, response)
+            yield response
+
+    async def stream_call(self, request_iterator):
+        # frames travel one by one; a dropped frame breaks the stream like a reset connection
+        async def frames():
+            async for batch in request_iterator:
+                await self.network.hop(self.src, self.dst, "GossipStream")
+                batch_copy = self.network.copy("GossipStream", batch)
+                for message in batch_copy.messages:
+                    self.network.carried(self.src, self.dst, message)
+                yield batch_copy
+
+        async for ack in self.servicer().GossipStream(frames(), MemoryContext()):
+            yield ack
+
+
+class MemoryChannelPool:
+    """Drop-in for ChannelPool that hands out MemoryStubs."""
+    def __init__(self, network, node_id):
+        self.network = network
+        self.node_id = node_id
+        self.stubs = {}
+        self.healthy = {}
+
+    def stub(self, peer_id):
+        stub = self.stubs.get(peer_id)
+        if stub is None:
+            stub = self.stubs[peer_id] = MemoryStub(self.network, self.node_id, peer_id)
+        return stub
+
+    def is_healthy(self, peer_id):
+        return self.healthy.get(peer_id, True)
+
+    def mark_ok(self, peer_id):
+        recovered = not self.healthy.get(peer_id, True)
+        self.healthy[peer_id] = True
+        return recovered
+
+    def mark_failed(self, peer_id, unavailable=False):
+        was_healthy = self.healthy.get(peer_id, True)
+        self.healthy[peer_id] = False
+        return was_healthy
+
+    async def close(self, peer_id, grace=None):
+        self.stubs.pop(peer_id, None)
+
+    async def close_all(self):
+        pass
+
+    async def evict_idle_loop(self, interval=60):
+        pass
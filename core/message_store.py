@@ -0,0 +1,320 @@
+# message_store.py
+import os
+import sys
+import mmap
+import asyncio
+import time
+import struct
+import zlib
+import bisect
+from collections import defaultdict
+from core.dedup import msg_digest
+
+# segment record: payload length, crc32 of payload, then the serialized message
+RECORD_HEADER = struct.Struct("<II")
+# index entry: digest, record offset in its segment, record length, publish timestamp,
+# lamport, topic length, then the utf-8 topic
+INDEX_ENTRY = struct.Struct("<32sQIdqH")
+
+
+def fsync_and_close(fds):
+    for fd in fds:
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class Segment:
+    def __init__(self, directory, base):
+        self.base = base
+        self.seg_path = os.path.join(directory, f"{base:020d}.seg")
+        self.idx_path = os.path.join(directory, f"{base:020d}.idx")
+        self.size = 0
+        self.max_timestamp = 0.0
+        self.digests = []
+        self.map = None  # mmap of a sealed segment, created on first read
+
+    def read(self, offset, length):
+        if self.map is None:
+            with open(self.seg_path, "rb") as f:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.map[offset:offset + length]
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+
+class MessageStore:
+    """
+    Append-only message log split into numbered segment files, each with a
+    compact binary index of (digest, offset, length, timestamp, lamport, topic).
+    Only the index lives in memory; payloads are read back through mmap. Sealed
+    segments are deleted whole once they fall out of the age/size retention.
+    A per-topic index keeps each topic's digests sorted by timestamp and by
+    lamport, so replaying a topic from a point reads only the matching records.
+
+    fsync policy: "always" syncs every append before put returns, "batch" syncs
+    every fsync_batch appends or from sync_loop every fsync_interval seconds on
+    a worker thread, "never" leaves it to the OS.
+    """
+    def __init__(self, directory, encode, decode, segment_bytes=64 * 1024 * 1024, fsync="batch",
+                 fsync_batch=1000, fsync_interval=1.0, retention_seconds=None, retention_bytes=None):
+        self.directory = directory
+        self.encode = encode  # message dict -> bytes
+        self.decode = decode  # bytes -> message dict
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.retention_seconds = retention_seconds
+        self.retention_bytes = retention_bytes
+        self.index = {}  # digest -> (segment base, offset, length, timestamp, lamport, topic)
+        self.segments = {}  # base -> Segment, in creation order
+        self.by_timestamp = defaultdict(list)  # topic -> sorted [(timestamp, digest)]
+        self.by_lamport = defaultdict(list)  # topic -> sorted [(lamport, digest)]
+        self.active = None
+        self.seg_file = None
+        self.idx_file = None
+        self.read_fd = None  # separate read handle on the active segment
+        self.unsynced = 0
+        self.syncing = None  # fsync running in the default executor
+        os.makedirs(directory, exist_ok=True)
+        self.load()
+
+    # ---- startup ----
+
+    def load(self):
+        bases = sorted(int(name[:-4]) for name in os.listdir(self.directory) if name.endswith(".idx"))
+        for base in bases:
+            segment = Segment(self.directory, base)
+            self.load_index(segment)
+            self.segments[base] = segment
+        for entries in list(self.by_timestamp.values()) + list(self.by_lamport.values()):
+            entries.sort()
+        if bases and self.segments[bases[-1]].size < self.segment_bytes:
+            self.open_active(self.segments[bases[-1]])
+        else:
+            self.roll(bases[-1] + 1 if bases else 0)
+
+    def load_index(self, segment):
+        with open(segment.idx_path, "rb") as f:
+            data = f.read()
+        pos = 0
+        while pos + INDEX_ENTRY.size <= len(data):
+            digest, offset, length, timestamp, lamport, topic_len = INDEX_ENTRY.unpack_from(data, pos)
+            end = pos + INDEX_ENTRY.size + topic_len
+            if end > len(data):
+                break
+            topic = sys.intern(data[pos + INDEX_ENTRY.size:end].decode())
+            self.index[digest] = (segment.base, offset, length, timestamp, lamport, topic)
+            self.by_timestamp[topic].append((timestamp, digest))
+            self.by_lamport[topic].append((lamport, digest))
+            segment.digests.append(digest)
+            segment.max_timestamp = max(segment.max_timestamp, timestamp)
+            pos = end
+        if pos != len(data):
+            # torn entry from a crash: drop it, its record is simply unreachable
+            with open(segment.idx_path, "r+b") as f:
+                f.truncate(pos)
+        segment.size = os.path.getsize(segment.seg_path) if os.path.exists(segment.seg_path) else 0
+
+    def open_active(self, segment):
+        self.active = segment
+        self.seg_file = open(segment.seg_path, "ab")
+        self.idx_file = open(segment.idx_path, "ab")
+        self.read_fd = os.open(segment.seg_path, os.O_RDONLY)
+        segment.size = self.seg_file.tell()
+
+    def roll(self, base):
+        if self.active is not None:
+            self.sync_soon(force=True)
+            self.seg_file.close()
+            self.idx_file.close()
+            os.close(self.read_fd)
+        segment = Segment(self.directory, base)
+        self.segments[base] = segment
+        self.open_active(segment)
+
+    # ---- dict-like access by msg_id (hex) or digest ----
+
+    def __contains__(self, msg_id):
+        return msg_digest(msg_id) in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, msg_id):
+        message = self.get(msg_id)
+        if message is None:
+            raise KeyError(msg_id)
+        return message
+
+    def __setitem__(self, msg_id, message):
+        self.put(message)
+
+    def get(self, msg_id, default=None):
+        entry = self.index.get(msg_digest(msg_id))
+        if entry is None:
+            return default
+        data = self.read_record(entry[0], entry[1], entry[2])
+        return default if data is None else self.decode(data)
+
+    def put(self, message):
+        digest = msg_digest(message['msg_id'])
+        if digest in self.index:
+            return
+        payload = self.encode(message)
+        if self.active.size + RECORD_HEADER.size + len(payload) > self.segment_bytes and self.active.size:
+            self.roll(self.active.base + 1)
+            self.enforce_retention()
+        offset = self.active.size
+        record = RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        self.seg_file.write(record)
+        self.active.size += len(record)
+
+        topic = message['topic'].encode()
+        timestamp = message['timestamp']
+        lamport = message.get('lamport', 0)
+        self.idx_file.write(INDEX_ENTRY.pack(digest, offset, len(record), timestamp, lamport, len(topic)) + topic)
+        self.index[digest] = (self.active.base, offset, len(record), timestamp, lamport, message['topic'])
+        # messages mostly arrive in order, so these inserts land at or near the end
+        bisect.insort(self.by_timestamp[message['topic']], (timestamp, digest))
+        bisect.insort(self.by_lamport[message['topic']], (lamport, digest))
+        self.active.digests.append(digest)
+        self.active.max_timestamp = max(self.active.max_timestamp, timestamp)
+
+        self.unsynced += 1
+        if self.fsync == "always":
+            self.sync()
+        elif self.fsync == "batch" and self.unsynced >= self.fsync_batch:
+            self.sync_soon()
+
+    def read_record(self, base, offset, length):
+        segment = self.segments.get(base)
+        if segment is None:
+            return None
+        if segment is self.active:
+            # the active segment is still growing, read it through the (flushed) file
+            self.seg_file.flush()
+            record = os.pread(self.read_fd, length, offset)
+        else:
+            record = segment.read(offset, length)
+        if len(record) < RECORD_HEADER.size:
+            return None
+        size, crc = RECORD_HEADER.unpack_from(record)
+        payload = record[RECORD_HEADER.size:RECORD_HEADER.size + size]
+        if len(payload) != size or zlib.crc32(payload) != crc:
+            return None
+        return payload
+
+    def entries(self):
+        """(digest, timestamp, lamport, topic) for every stored message, oldest segment first."""
+        for segment in list(self.segments.values()):
+            for digest in segment.digests:
+                entry = self.index.get(digest)
+                if entry is not None:
+                    yield digest, entry[3], entry[4], entry[5]
+
+    def size_bytes(self):
+        return sum(segment.size for segment in self.segments.values())
+
+    def topics(self):
+        return list(self.by_timestamp)
+
+    def replay(self, topic, since=0, by="timestamp", limit=None):
+        """Stored messages of one topic with timestamp (or lamport) >= since, oldest first."""
+        entries = (self.by_lamport if by == "lamport" else self.by_timestamp).get(topic, [])
+        start = bisect.bisect_left(entries, (since, b""))
+        count = 0
+        for _, digest in entries[start:]:
+            if limit is not None and count >= limit:
+                return
+            entry = self.index.get(digest)
+            if entry is None:
+                continue
+            data = self.read_record(entry[0], entry[1], entry[2])
+            if data is None:
+                continue
+            count += 1
+            yield self.decode(data)
+
+    # ---- durability and retention ----
+
+    def sync(self):
+        if self.seg_file is None:
+            return
+        self.seg_file.flush()
+        self.idx_file.flush()
+        if self.fsync != "never":
+            os.fsync(self.seg_file.fileno())
+            os.fsync(self.idx_file.fileno())
+        self.unsynced = 0
+
+    def sync_soon(self, force=False):
+        """Flush now and fsync on a worker thread, so the event loop never waits on the disk."""
+        if not force and self.syncing is not None and not self.syncing.done():
+            return  # still unsynced afterwards, the next append or sync_loop tick picks these up
+        self.seg_file.flush()
+        self.idx_file.flush()
+        self.unsynced = 0
+        if self.fsync != "never":
+            # duplicated descriptors stay valid if the segment rolls and closes its files meanwhile
+            fds = [os.dup(f.fileno()) for f in (self.seg_file, self.idx_file)]
+            self.syncing = asyncio.get_running_loop().run_in_executor(None, fsync_and_close, fds)
+
+    async def sync_loop(self):
+        while True:
+            await asyncio.sleep(self.fsync_interval)
+            if self.unsynced:
+                self.sync_soon()
+            self.enforce_retention()
+
+    def enforce_retention(self):
+        cutoff = time.time() - self.retention_seconds if self.retention_seconds else None
+        if cutoff is not None and self.active.digests and self.index[self.active.digests[0]][3] < cutoff:
+            # a slow topic may never fill a segment: seal it by age so it can expire like the rest
+            self.roll(self.active.base + 1)
+        sealed = [segment for segment in self.segments.values() if segment is not self.active]
+        total = sum(segment.size for segment in self.segments.values())
+        for segment in sealed:
+            expired = cutoff is not None and segment.max_timestamp < cutoff
+            oversized = self.retention_bytes is not None and total > self.retention_bytes
+            if not (expired or oversized):
+                break
+            total -= segment.size
+            self.drop_segment(segment)
+
+    def drop_segment(self, segment):
+        dropped = set()
+        topics = set()
+        for digest in segment.digests:
+            entry = self.index.get(digest)
+            if entry is not None and entry[0] == segment.base:
+                del self.index[digest]
+                dropped.add(digest)
+                topics.add(entry[5])
+        for topic in topics:
+            for entries in (self.by_timestamp, self.by_lamport):
+                kept = [e for e in entries[topic] if e[1] not in dropped]
+                if kept:
+                    entries[topic] = kept
+                else:
+                    del entries[topic]
+        segment.close()
+        del self.segments[segment.base]
+        for path in (segment.seg_path, segment.idx_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        self.sync()
+        self.seg_file.close()
+        self.idx_file.close()
+        os.close(self.read_fd)
+        for segment in self.segments.values():
+            segment.close()
@@ -0,0 +1,147 @@
+# metrics.py
+# Prometheus text-format metrics without the client library. Updates are plain
+# dict/list operations on the event loop thread (no locks, no label validation),
+# cheap enough to leave on for every message; rendering happens only on /metrics.
+import bisect
+import asyncio
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FANOUT_BUCKETS = (1, 2, 3, 4, 5, 6, 7, 8, 10, 12, 16, 20)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+FAST_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1)
+
+
+def format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{str(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class CounterMetric:
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.values = {}  # label values tuple -> float
+
+    def inc(self, amount=1, *label_values):
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self):
+        for label_values, value in self.values.items():
+            yield self.name, format_labels(self.labels, label_values), value
+
+
+class GaugeMetric:
+    """
+    Read from a callback at scrape time: fn() -> number, or {label values tuple: number}.
+    kind="counter" exposes an existing monotonic counter (e.g. a stats Counter) as one.
+    """
+    def __init__(self, name, help_text, fn, labels=(), kind="gauge"):
+        self.kind = kind
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+        self.labels = labels
+
+    def samples(self):
+        value = self.fn()
+        if isinstance(value, dict):
+            for label_values, v in value.items():
+                yield self.name, format_labels(self.labels, label_values), v
+        else:
+            yield self.name, "", value
+
+
+class HistogramMetric:
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS, labels=()):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.labels = labels
+        self.series = {}  # label values tuple -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value, *label_values):
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [0] * (len(self.buckets) + 2)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self):
+        for label_values, series in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                labels = format_labels(self.labels + ("le",), label_values + (bound,))
+                yield f"{self.name}_bucket", labels, cumulative
+            labels = format_labels(self.labels, label_values)
+            yield f"{self.name}_sum", labels, series[-1]
+            yield f"{self.name}_count", labels, cumulative
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric):
+        # gauges are re-registered by every Node built in the process (e.g. the simulator); last one wins
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self.register(CounterMetric(name, help_text, labels))
+
+    def gauge(self, name, help_text, fn, labels=(), kind="gauge"):
+        return self.register(GaugeMetric(name, help_text, fn, labels, kind))
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS, labels=()):
+        return self.register(HistogramMetric(name, help_text, buckets, labels))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# shared by every module in the process
+metrics = Registry()
+
+PUBLISH_SECONDS = metrics.histogram(
+    "pubsub_publish_seconds", "Time for Node.publish/publish_batch to hand messages to the transport")
+RECEIVE_TO_DELIVER_SECONDS = metrics.histogram(
+    "pubsub_receive_to_deliver_seconds", "Time from Node.receive accepting a message to its delivery")
+DECRYPT_SECONDS = metrics.histogram(
+    "pubsub_decrypt_seconds", "Decrypt time per message, averaged over each delivery batch", FAST_BUCKETS)
+PEER_SEND_SECONDS = metrics.histogram(
+    "pubsub_peer_send_seconds", "Time to hand a message (or batch) to a peer", labels=("peer",))
+PEER_ERRORS = metrics.counter(
+    "pubsub_peer_errors_total", "Failed gRPC calls to a peer by status code", labels=("peer", "code"))
+PEER_SEND_TIMEOUTS = metrics.counter(
+    "pubsub_peer_send_timeouts_total", "Sends abandoned after send_timeout", labels=("peer",))
+ANTI_ENTROPY_BYTES = metrics.counter(
+    "pubsub_anti_entropy_bytes_total", "Serialized anti-entropy traffic", labels=("direction",))
+GOSSIP_FANOUT = metrics.histogram(
+    "pubsub_gossip_fanout", "Peers chosen for each gossip broadcast", FANOUT_BUCKETS)
+SEQUENCER_BATCH = metrics.histogram(
+    "pubsub_sequencer_batch_size", "Messages numbered and distributed together by the leader", BATCH_BUCKETS)
+LOOP_LAG_SECONDS = metrics.histogram(
+    "pubsub_event_loop_lag_seconds", "How late the event loop woke up a sleeping task")
+
+
+async def loop_lag_monitor(interval=0.5):
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        LOOP_LAG_SECONDS.observe(max(0.0, loop.time() - start - interval))
+
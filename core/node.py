@@ -4,46 +4,127 @@ import asyncio
 import json
 import time
 import hashlib
-from aiohttp import web
+import itertools
+from collections import Counter, deque
+from aiohttp import web, WSCloseCode
 from core.broker import Broker
 from core.gossip import GossipAgent
 from core.publisher import Publisher
 from core.subscriber import Subscriber
-from security.crypto_utils import encrypt_message, decrypt_message
+from core.consumers import ConsumerHub
+from core.envelope import seal, seal_many, open_sealed, open_many, has_body
+from core.compression import Compressor
+from core.membership import STATE_NAMES
+from core.sequencer import Sequencer
+from security.crypto_utils import CryptoEngine
+from core.topic_trie import is_wildcard, validate_pattern
+from core.log_writer import log
+from core.metrics import metrics, PUBLISH_SECONDS, RECEIVE_TO_DELIVER_SECONDS, DECRYPT_SECONDS
+
+# seconds of silence before an SSE stream gets a keepalive comment, which also detects gone clients
+SSE_KEEPALIVE = 15
 
 class Node:
-    def __init__(self, node_id, all_peers, broker: Broker, peer_addrs=None, is_publisher=False, is_subscriber=False, mode="gossip"):
+    def __init__(self, node_id, all_peers, broker: Broker, peer_addrs=None, is_publisher=False, is_subscriber=False, mode="gossip", transport="stream",
+                 seen_ttl=600, seen_capacity=1000000, store_dir=None, store_options=None, consumer_options=None,
+                 wire_format="binary", crypto_options=None, compression=None, compression_options=None,
+                 fanout=3, fanout_options=None, channels=None, broadcast="gossip", plumtree_options=None,
+                 membership_options=None, sequencer_options=None):
         self.node_id = node_id
         self.broker = broker
         self.is_publisher = is_publisher
         self.is_subscriber = is_subscriber
         self.peers = [peer for peer in all_peers if peer != self.node_id]
-        self.gossip = GossipAgent(node_id, self.peers, self, peer_addrs=peer_addrs)
+        self.gossip = GossipAgent(node_id, self.peers, self, peer_addrs=peer_addrs, use_stream=(transport == "stream"),
+                                  seen_ttl=seen_ttl, seen_capacity=seen_capacity,
+                                  store_dir=store_dir, store_options=store_options,
+                                  fanout=fanout, fanout_options=fanout_options, channels=channels,
+                                  broadcast=broadcast, plumtree_options=plumtree_options,
+                                  membership_options=membership_options)
         self.publisher = Publisher(node_id, broker, self.gossip) if is_publisher else None
         self.subscriber = Subscriber(node_id, self.gossip) if is_subscriber else None
+        self.consumers = ConsumerHub(**(consumer_options or {}))
         self.lamport = 0
         self.mode = mode
+        self.wire_format = wire_format  # envelope used for what this node publishes; both are always accepted
+        self.crypto = CryptoEngine(**(crypto_options or {}))
+        # every node can decompress; only nodes configured with a codec compress what they publish
+        self.compressor = Compressor(codec=compression or "zlib",
+                                     directory=os.path.join(store_dir, "dictionaries") if store_dir else None,
+                                     **(compression_options or {}))
+        self.publish_compressor = self.compressor if compression else None
+        self.pending_delivery = deque()  # (msg, lamport, received at) waiting for delivery_loop to decrypt them
+        self.delivery_ready = asyncio.Event()
+        self.stats = Counter()
+        self.sequencer = Sequencer(self, **(sequencer_options or {}))  # total order in leader mode
+        self.subs_version = time.time_ns()  # bumped on every change, orders our subscription announcements
         self.leader_id = self.calc_leader()
+        self.gossip.membership.listeners.append(self.on_membership_change)
         self.load_subscriptions()
+        self.register_metrics()
 
         log_path = "./output/node_latency.log"
         
         os.makedirs(os.path.dirname(log_path), exist_ok=True)
-        print(f"[{self.node_id}] Leader is {self.leader_id}")
+        log.info(f"[{self.node_id}] Leader is {self.leader_id}")
     
+    def register_metrics(self):
+        """Gauges read from live state when /metrics is scraped, so they cost nothing in between."""
+        metrics.gauge("pubsub_receive_total", "Node.receive outcomes (duplicates dropped, decrypted, ...)",
+                      lambda: {(key,): value for key, value in self.stats.items()}, labels=("outcome",), kind="counter")
+        metrics.gauge("pubsub_sequencer_total", "Leader mode ordering counters (sequenced, gaps, skipped, late)",
+                      lambda: {(key,): value for key, value in self.sequencer.stats.items()}, labels=("kind",),
+                      kind="counter")
+        metrics.gauge("pubsub_repair_total", "Anti-entropy and send counters of the gossip agent",
+                      lambda: {(key,): value for key, value in self.gossip.stats.items()}, labels=("kind",),
+                      kind="counter")
+        metrics.gauge("pubsub_seen_ids", "Message ids in the dedup window", lambda: len(self.gossip.seen_msgs))
+        metrics.gauge("pubsub_store_messages", "Messages in the message store", lambda: len(self.gossip.msg_store))
+        metrics.gauge("pubsub_store_bytes", "Size of the message store segments",
+                      lambda: self.gossip.msg_store.size_bytes())
+        metrics.gauge("pubsub_members", "Peers by membership state",
+                      lambda: {(name,): sum(1 for member in self.gossip.membership.members.values() if member.state == state)
+                               for state, name in STATE_NAMES.items()},
+                      labels=("state",))
+        metrics.gauge("pubsub_peer_unavailable", "1 while membership considers a peer dead",
+                      lambda: {(peer,): int(down) for peer, down in self.gossip.peer_unavailable.items()},
+                      labels=("peer",))
+        metrics.gauge("pubsub_peer_deaths_total", "Times membership declared a peer dead, for outages between scrapes",
+                      lambda: {(peer,): count for peer, count in self.gossip.membership.deaths.items()},
+                      labels=("peer",), kind="counter")
+        metrics.gauge("pubsub_pending_delivery", "Messages waiting to be decrypted and delivered",
+                      lambda: len(self.pending_delivery))
+        metrics.gauge("pubsub_fanout_bias", "Adjustment added to ln(N) + c by adaptive fanout",
+                      lambda: self.gossip.fanout_policy.bias)
+        metrics.gauge("pubsub_fanout_miss_ratio", "Messages fetched by anti-entropy per first arrival, last round",
+                      lambda: self.gossip.fanout_policy.miss_ratio)
+        metrics.gauge("pubsub_fanout_duplicate_ratio", "Duplicate arrivals per first arrival, last round",
+                      lambda: self.gossip.fanout_policy.duplicate_ratio)
+        metrics.gauge("pubsub_sequencer_pending", "Messages waiting for the leader to number them",
+                      lambda: len(self.sequencer.pending))
+        metrics.gauge("pubsub_sequence_buffered", "Sequenced messages held back until a gap before them is filled",
+                      lambda: self.sequencer.buffered())
+        metrics.gauge("pubsub_stream_consumers", "Connected /ws and /events clients",
+                      lambda: len(self.consumers.consumers))
+
     def calc_leader(self, alive_peers=None):
         if alive_peers is None:
             alive_peers = self.peers
         return min([self.node_id] + alive_peers)
 
     def load_subscriptions(self):
+        if self.subscriber is None:
+            return  # not a subscriber: a leftover subs file has nothing to restore into
         try:
             with open(f"./subscription/subs_{self.node_id}.json", "r") as f:
                 topics = json.load(f)
-            for topic in topics:
-                self.subscriber.subscribe(topic, self.broker)
         except Exception:
-            pass
+            return
+        for topic in topics:
+            try:
+                self.subscriber.subscribe(topic, self.broker)
+            except ValueError as e:
+                log.warning(f"[{self.node_id}] Skipping saved subscription: {e}")
 
     def save_subscriptions(self):
         os.makedirs("./subscription", exist_ok=True)
@@ -59,44 +140,105 @@ class Node:
         else:
             self.lamport += 1
     
-    async def check_leader_loop(self, interval=5):
-        while True:
-            await asyncio.sleep(interval)
-            if not await self.is_leader_alive():
-                alive_peers = []
-                for peer in self.peers:
-                    if await self.is_peer_alive(peer):
-                        alive_peers.append(peer)
-                new_leader = self.calc_leader(alive_peers)
-                if new_leader != self.leader_id:
-                    print(f"[{self.node_id}] Leader changed from {self.leader_id} to {new_leader}")
-                    self.leader_id = new_leader
-    
-    async def is_leader_alive(self):
-        if self.node_id == self.leader_id:
-            return True
-        try:
-            await self.gossip.ping(self.leader_id)
-            return True
-        except Exception:
-            return False
+    def on_membership_change(self, node_id, state):
+        """Elect a new leader once membership declares the current one dead or gone; otherwise leadership sticks."""
+        if self.is_leader() or self.leader_id in self.gossip.membership.alive():
+            return
+        new_leader = self.calc_leader(self.gossip.membership.alive())
+        if new_leader != self.leader_id:
+            log.info(f"[{self.node_id}] Leader changed from {self.leader_id} to {new_leader}")
+            self.leader_id = new_leader
 
-    async def is_peer_alive(self, peer_id):
-        try:
-            await self.gossip.ping(peer_id)
-            return True
-        except Exception:
+    async def join(self, seeds):
+        """Join a running cluster through seeds (peer ids or gRPC "host:port"); returns False if none answered."""
+        response = await self.gossip.join(seeds)
+        if response is None:
             return False
+        if response.leader_id:
+            self.leader_id = response.leader_id
+        log.info(f"[{self.node_id}] Joined with peers {sorted(self.peers)}, leader is {self.leader_id}")
+        asyncio.create_task(self.gossip.announce(self.peers))
+        return True
+
+    async def leave(self):
+        """Leave the cluster for good: members stop probing and routing to us."""
+        await self.gossip.membership.leave()
 
     async def publish(self, topic, message):
         if not self.is_publisher:
             raise Exception(f"[{self.node_id}] is not a publisher.")
         
+        start = time.perf_counter()
         # Lamport clock tick
         self.update_lamport()
 
+        msg, msg_payload = self.new_message(topic, message)
+        seal(msg, msg_payload, self.crypto, self.wire_format, self.publish_compressor)
+
+        self.log_published([(msg, message)])
+
+        if self.mode == "gossip":
+            await self.gossip.broadcast(msg)
+        elif self.mode == "leader":
+            if self.is_leader():
+                log.debug(f"[{self.node_id}] I am the leader, sequencing the message for all peers.")
+                self.receive(msg)
+            else:
+                log.debug(f"[{self.node_id}] Not leader, sending message to leader [{self.leader_id}] for distribution.")
+                await self.gossip.send_bounded(self.leader_id, msg)
+        else:
+            raise ValueError("Unknown pub-sub mode")
+        PUBLISH_SECONDS.observe(time.perf_counter() - start)
+
+    async def publish_batch(self, items):
+        """
+        Publish a list of {"topic", "message"} dicts in one pass: ids and Lamport
+        stamps are assigned together, payloads encrypted together and the whole
+        batch handed to the transport at once. Returns one result per item.
+        """
+        if not self.is_publisher:
+            raise Exception(f"[{self.node_id}] is not a publisher.")
+
+        start = time.perf_counter()
+        results = []
+        accepted = []  # (msg, msg_payload, message, result)
+        for item in items:
+            if not isinstance(item, dict) or not isinstance(item.get("topic"), str) or "message" not in item:
+                results.append({"status": "error", "error": "item needs 'topic' and 'message'"})
+                continue
+            if not item["topic"] or is_wildcard(item["topic"]):
+                results.append({"status": "error", "error": "invalid topic"})
+                continue
+            self.update_lamport()
+            msg, msg_payload = self.new_message(item["topic"], item["message"])
+            result = {"status": "published", "msg_id": msg["msg_id"], "lamport": msg["lamport"]}
+            results.append(result)
+            accepted.append((msg, msg_payload, item["message"], result))
+
+        if not accepted:
+            return results
+        msgs = await seal_many([(msg, msg_payload) for msg, msg_payload, _, _ in accepted],
+                               self.crypto, self.wire_format, self.publish_compressor)
+
+        self.log_published([(msg, message) for msg, _, message, _ in accepted])
+
+        if self.mode == "gossip":
+            await self.gossip.broadcast_batch(msgs)
+        elif self.mode == "leader":
+            if self.is_leader():
+                for msg in msgs:
+                    self.receive(msg)
+            else:
+                await self.gossip.send_many(self.leader_id, msgs)
+        else:
+            raise ValueError("Unknown pub-sub mode")
+        PUBLISH_SECONDS.observe(time.perf_counter() - start)
+        return results
+
+    def new_message(self, topic, message):
+        """Envelope (without content) and plaintext payload for a message stamped with the current Lamport time."""
         timestamp = time.time()
-        raw_id = f"{self.node_id}-{timestamp}-{message}"
+        raw_id = f"{self.node_id}-{timestamp}-{self.lamport}-{message}"
         msg_id = hashlib.sha256(raw_id.encode()).hexdigest()
         msg_payload = {
             "sender": self.node_id,
@@ -104,45 +246,28 @@ class Node:
             "timestamp": timestamp,
             "lamport": self.lamport
         }
-
-        encrypted_payload = encrypt_message(json.dumps(msg_payload))
-        encrypted_msg = json.dumps(encrypted_payload)
         msg = {
             "topic": topic,
-            "content": encrypted_msg,
+            "content": None,
             "sender": self.node_id,
             "timestamp": timestamp,
             "msg_id": msg_id,
             "lamport": self.lamport
         }
+        return msg, msg_payload
 
-        sender_log_path = "./output/sender.log"
-        os.makedirs(os.path.dirname(sender_log_path), exist_ok=True)
-
-        with open("./output/sender.log", "a") as f:
-            now = time.strftime("%Y-%m-%d %H:%M:%S")
-            f.write(f"[{now}] [{self.node_id}] Publishing | Topic: {topic} | Message: {message} | Lamport: {self.lamport} | msg_id: {msg_id}\n")
-        print(f"[{now}] [{self.node_id}] Publishing | Topic: {topic} | Message: {message} | Lamport: {self.lamport}\n")
-
-        if self.mode == "gossip":
-            await self.gossip.broadcast(msg)
-        elif self.mode == "leader":
-            if self.is_leader():
-                print(f"[{self.node_id}] I am the leader, distributing message to all peers.")
-                for peer in self.peers:
-                    await self.gossip.send(peer, msg)
-                self.receive(msg) 
-            else:
-                print(f"[{self.node_id}] Not leader, sending message to leader [{self.leader_id}] for distribution.")
-                await self.gossip.send(self.leader_id, msg)
-        else:
-            raise ValueError("Unknown pub-sub mode")
+    def log_published(self, published):
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+        for msg, message in published:
+            log.write("./output/sender.log", f"[{now}] [{self.node_id}] Publishing | Topic: {msg['topic']} | Message: {message} | Lamport: {msg['lamport']} | msg_id: {msg['msg_id']}\n")
+            log.info(f"[{now}] [{self.node_id}] Publishing | Topic: {msg['topic']} | Message: {message} | Lamport: {msg['lamport']}\n")
 
     def subscribe(self, topic):
         if not self.is_subscriber:
             raise Exception(f"[{self.node_id}] is not a subscriber.")
         self.subscriber.subscribe(topic, self.broker)
         self.save_subscriptions()
+        self.subscriptions_changed()
     
     def get_subscribe(self):
         return list(self.subscriber.topics)
@@ -151,46 +276,155 @@ class Node:
         if self.is_subscriber:
             self.subscriber.unsubscribe(topic, self.broker)
             self.save_subscriptions()
+            self.subscriptions_changed()
+
+    def subscriptions_changed(self):
+        self.subs_version = time.time_ns()
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return  # not serving yet; the periodic announce_loop picks it up
+        asyncio.create_task(self.gossip.announce(self.peers))
+
+    def subscription_announcement(self):
+        topics = self.subscriber.topics if self.subscriber else set()
+        return self.node_id, self.subs_version, topics
 
     def receive(self, msg):
         if not self.is_subscriber:
             return
-        try:
-            encrypted_payload = json.loads(msg['content'])
-            decrypted_payload = decrypt_message(encrypted_payload)
-            msg_payload = json.loads(decrypted_payload)
-
-            msg_id = msg.get("msg_id")
-
-            if msg_id in self.gossip.seen_msgs:
-                return
-
-            self.gossip.seen_msgs.add(msg_id)
-            self.gossip.save_seen_msg(msg_id, f"{self.node_id}_seen_msgs.log")
-            self.gossip.msg_store[msg_id] = msg
-            # if msg_id not in self.gossip.seen_msgs:
-
-            received_lamport = msg.get("lamport", 0)
-            self.update_lamport(received_lamport)
-            current_lamport = self.lamport
-
-            msg_payload["msg_id"] = msg.get("msg_id")
-            msg_payload["sender"] = msg.get("sender")
-            msg_payload["timestamp"] = msg.get("timestamp")
-            msg_payload["lamport"] = current_lamport
-            # print("receiving message ...")
-            self.subscriber.receive({"topic": msg["topic"], "content": msg_payload})
-
-            if self.mode == "leader" and self.is_leader() and msg["sender"] != self.node_id:
-                print(f"[{self.node_id}] (Leader) Received message from [{msg['sender']}], forwarding to other peers.")
-                for peer in self.peers:
-                    if peer != msg["sender"]:
-                        asyncio.create_task(self.gossip.send(peer, msg))
-            elif self.mode == "gossip":
-                asyncio.create_task(self.gossip.broadcast(msg))
+        # stage 1: envelope check and dedup, no crypto yet
+        relay = msg.pop("relay", "")  # the hop that pushed this copy, never stored
+        msg_id = msg.get("msg_id")
+        if not msg_id or not msg.get("topic") or not has_body(msg):
+            self.stats["malformed_dropped"] += 1
+            return
+        if not self.gossip.seen_msgs.check_and_add(msg_id):
+            self.stats["decrypt_skipped_duplicate"] += 1
+            if self.gossip.plumtree:
+                self.gossip.plumtree.on_duplicate(msg, relay)
+            if msg.get("seq"):
+                self.sequencer.passed(msg)
+            if msg_id not in self.gossip.msg_store:
+                # seen before a restart: keep it so anti-entropy stops offering it to us
+                self.gossip.store(msg)
+            return
+
+        received_lamport = msg.get("lamport", 0)
+        self.update_lamport(received_lamport)
+
+        # stage 2: forwarding only needs the envelope
+        if self.mode == "leader" and self.is_leader() and not msg.get("seq"):
+            # numbered, stored, sent to every follower (the publisher too) and delivered by the sequencer
+            log.debug(f"[{self.node_id}] (Leader) Sequencing message from [{msg['sender']}].")
+            self.sequencer.submit(msg)
+            return
+        self.gossip.store(msg)
+        if self.mode == "gossip" and msg["sender"] != self.node_id:
+            # our own messages were already fanned out by the publishing broadcast
+            asyncio.create_task(self.gossip.broadcast(msg, relay=True, from_peer=relay))
+        elif msg.get("seq"):
+            self.sequencer.deliver(msg)  # calls queue_delivery in seq order
+            return
+        self.queue_delivery(msg)
+
+    def queue_delivery(self, msg):
+        # stage 3: decrypt only what this node actually delivers
+        if not self.subscriber.matches(msg["topic"]):
+            self.stats["decrypt_skipped_unsubscribed"] += 1
+            return
+        # decrypted in batches by delivery_loop, off the event loop thread
+        self.pending_delivery.append((msg, self.lamport, time.perf_counter()))
+        self.delivery_ready.set()
+
+    async def delivery_loop(self, max_batch=256):
+        while True:
+            await self.delivery_ready.wait()
+            self.delivery_ready.clear()
+            while self.pending_delivery:
+                batch = [self.pending_delivery.popleft() for _ in range(min(max_batch, len(self.pending_delivery)))]
+                await self.fetch_dictionaries([msg for msg, _, _ in batch])
+                start = time.perf_counter()
+                payloads = await open_many([msg for msg, _, _ in batch], self.crypto, self.compressor)
+                DECRYPT_SECONDS.observe((time.perf_counter() - start) / len(batch))
+                for (msg, lamport, received_at), msg_payload in zip(batch, payloads):
+                    if msg_payload is None:
+                        self.stats["decrypt_failed"] += 1
+                        log.warning(f"[{self.node_id}] Failed to decrypt message {msg['msg_id']}")
+                        continue
+                    self.stats["decrypted"] += 1
+                    try:
+                        self.deliver(msg, lamport, msg_payload)
+                    except Exception as e:
+                        # one bad message must not end the loop, every later delivery depends on it
+                        self.stats["deliver_failed"] += 1
+                        log.error(f"[{self.node_id}] Failed to deliver message {msg['msg_id']}: {e!r}")
+                        continue
+                    RECEIVE_TO_DELIVER_SECONDS.observe(time.perf_counter() - received_at)
+
+    async def fetch_dictionaries(self, msgs):
+        for dict_id in self.compressor.missing(msgs):
+            sender = next(msg["sender"] for msg in msgs if msg.get("dict_id") == dict_id)
+            try:
+                found = await self.gossip.fetch_dictionary(dict_id, prefer=sender)
+            except Exception as e:
+                self.gossip.stats["dictionary_fetch_failed"] += 1
+                log.error(f"[{self.node_id}] Fetching compression dictionary {dict_id:08x} failed: {e!r}")
+                continue
+            if not found:
+                log.warning(f"[{self.node_id}] Compression dictionary {dict_id:08x} not available from any peer")
+
+    async def dictionary_loop(self, interval=30):
+        """Train per-topic compression dictionaries, share them, then start using them."""
+        if self.publish_compressor is None:
+            return
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            for topic in self.compressor.due_for_training():
+                samples = list(self.compressor.samples[topic])  # snapshot, the deque keeps growing
+                dict_id = await loop.run_in_executor(None, self.compressor.train, topic, samples)
+                shared = await self.gossip.share_dictionary(dict_id)
+                self.compressor.activate(topic, dict_id)
+                log.info(f"[{self.node_id}] Compression dictionary {dict_id:08x} for '{topic}' shared with {shared} peers")
 
+    def decrypt(self, msg):
+        # for reads of stored messages (replay): delivery_loop keeps the receive counters on its own
+        try:
+            return open_sealed(msg, self.crypto, self.compressor)
         except Exception as e:
-            print(f"[{self.node_id}] Failed to decrypt message: {e}")
+            log.warning(f"[{self.node_id}] Failed to decrypt stored message {msg['msg_id']}: {e}")
+            return None
+
+    def deliver(self, msg, lamport, msg_payload):
+        msg_payload["msg_id"] = msg.get("msg_id")
+        msg_payload["sender"] = msg.get("sender")
+        msg_payload["timestamp"] = msg.get("timestamp")
+        msg_payload["lamport"] = lamport
+        # print("receiving message ...")
+        self.subscriber.receive({"topic": msg["topic"], "content": msg_payload})
+        self.consumers.dispatch(msg["topic"], self.client_event(msg, msg_payload))
+
+    def client_event(self, msg, msg_payload):
+        """What streaming consumers and /replay hand to applications."""
+        return {
+            "topic": msg["topic"],
+            "message": msg_payload.get("message"),
+            "msg_id": msg["msg_id"],
+            "sender": msg["sender"],
+            "timestamp": msg["timestamp"],
+            "lamport": msg["lamport"],
+        }
+
+    def replay(self, topic, since=0, by="timestamp", limit=None):
+        """Decrypted stored messages on topic (a filter, wildcards allowed) from `since` onwards."""
+        validate_pattern(topic)
+        if by not in ("timestamp", "lamport"):
+            raise ValueError("by must be 'timestamp' or 'lamport'")
+        for msg in self.gossip.replay(topic, since, by, limit):
+            msg_payload = self.decrypt(msg)
+            if msg_payload is not None:
+                yield self.client_event(msg, msg_payload)
 
 # ---- HTTP ----
 
@@ -200,16 +434,40 @@ def create_app(node: Node):
     @routes.post('/publish')
     async def publish_api(request):
         data = await request.json()
-        topic = data['topic']
-        message = data['message']
-        await node.publish(topic, message)
+        topic = data.get('topic')
+        if not isinstance(topic, str) or not topic or "message" not in data:
+            return web.Response(text="Expected a non-empty string 'topic' and a 'message'", status=400)
+        if is_wildcard(topic):
+            return web.Response(text="Cannot publish to a wildcard topic", status=400)
+        await node.publish(topic, data['message'])
         return web.Response(text="Message published!")
 
+    @routes.post('/publish_batch')
+    async def publish_batch_api(request):
+        # JSON array (or {"messages": [...]}) of {topic, message}, or one object per line as NDJSON
+        body = await request.text()
+        try:
+            if request.content_type == "application/x-ndjson":
+                items = [json.loads(line) for line in body.splitlines() if line.strip()]
+            else:
+                items = json.loads(body)
+                if isinstance(items, dict):
+                    items = items.get("messages")
+        except json.JSONDecodeError as e:
+            return web.Response(text=f"Invalid JSON: {e}", status=400)
+        if not isinstance(items, list):
+            return web.Response(text="Expected a list of {topic, message} objects", status=400)
+        results = await node.publish_batch(items)
+        return web.json_response({"results": results})
+
     @routes.post('/subscribe')
     async def subscribe_api(request):
         data = await request.json()
         topic = data['topic']
-        node.subscribe(topic)
+        try:
+            node.subscribe(topic)
+        except ValueError as e:
+            return web.Response(text=str(e), status=400)
         return web.Response(text=f"Subscribed to {topic}")
 
     @routes.post('/unsubscribe')
@@ -219,17 +477,101 @@ def create_app(node: Node):
         node.unsubscribe(topic)
         return web.Response(text=f"Unsubscribed from {topic}")
 
+    @routes.get('/replay')
+    async def replay_api(request):
+        # streams newline-delimited JSON, oldest first
+        topic = request.query.get("topic")
+        by = request.query.get("by", "timestamp")
+        try:
+            since = float(request.query.get("since", 0))
+            limit = int(request.query["limit"]) if "limit" in request.query else None
+            messages = node.replay(topic, since, by, limit)
+            first = next(messages, None)
+        except ValueError as e:
+            return web.Response(text=str(e), status=400)
+        response = web.StreamResponse()
+        response.content_type = "application/x-ndjson"
+        await response.prepare(request)
+        if first is not None:
+            for msg in itertools.chain((first,), messages):
+                await response.write((json.dumps(msg) + "\n").encode())
+        await response.write_eof()
+        return response
+
+    @routes.get('/ws')
+    async def websocket_api(request):
+        # pushes JSON arrays of delivered messages matching ?topic=.. (repeatable, default "#")
+        try:
+            consumer = node.consumers.add(request.query.getall("topic", ["#"]))
+        except ValueError as e:
+            return web.Response(text=str(e), status=400)
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+
+        async def pump():
+            async for batch in consumer.batches():
+                await ws.send_str(json.dumps(batch))
+            # closed by the hub: the client fell too far behind
+            await ws.close(code=WSCloseCode.TRY_AGAIN_LATER, message=b"slow consumer")
+
+        pump_task = asyncio.create_task(pump())
+        try:
+            async for _ in ws:
+                pass  # clients do not send anything; this just waits for the close
+        finally:
+            node.consumers.remove(consumer)
+            pump_task.cancel()
+        return ws
+
+    @routes.get('/events')
+    async def events_api(request):
+        # Server-Sent Events: one "data:" JSON array per batch, a comment line when the topic is quiet
+        try:
+            consumer = node.consumers.add(request.query.getall("topic", ["#"]))
+        except ValueError as e:
+            return web.Response(text=str(e), status=400)
+        response = web.StreamResponse(headers={"Cache-Control": "no-cache"})
+        response.content_type = "text/event-stream"
+        await response.prepare(request)
+        try:
+            async for batch in consumer.batches(idle=SSE_KEEPALIVE):
+                if not batch:
+                    # a gone client is only noticed on a write, so quiet topics still write
+                    await response.write(b": ping\n\n")
+                    continue
+                await response.write(f"data: {json.dumps(batch)}\n\n".encode())
+        except ConnectionResetError:
+            pass
+        finally:
+            node.consumers.remove(consumer)
+        return response
+
+    @routes.get('/metrics')
+    async def metrics_api(request):
+        return web.Response(text=metrics.render(),
+                            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
     @routes.get('/status')
     async def status_api(request):
-        print("Topic -> Nodes")
+        log.debug("Topic -> Nodes")
         nodes = node.node_id
         subscriptions = node.get_subscribe()
         for topic in subscriptions:
-            print(f"{topic}: {nodes}")
+            log.debug(f"{topic}: {nodes}")
         return web.json_response({
             "node_id": node.node_id,
             "subscriptions": node.get_subscribe(),
             "leader_id": node.leader_id, 
+            "dedup": node.gossip.seen_msgs.stats(),
+            "repair": dict(node.gossip.stats),
+            "receive": dict(node.stats),
+            "cluster_subscriptions": node.broker.get_cluster_map(),
+            "consumers": node.consumers.status(),
+            "compression": node.compressor.status(),
+            "membership": node.gossip.membership.status(),
+            "fanout": node.gossip.fanout_policy.status(),
+            "plumtree": node.gossip.plumtree.status() if node.gossip.plumtree else None,
+            "sequencer": node.sequencer.status(),
         })
     
     @routes.post('/switch_mode')
@@ -239,7 +581,7 @@ def create_app(node: Node):
         if mode not in ("gossip", "leader"):
             return web.Response(text="Mode must be 'gossip' or 'leader'", status=400)
         node.mode = mode
-        print(f"[{node.node_id}] PubSub mode switched to {mode}")
+        log.info(f"[{node.node_id}] PubSub mode switched to {mode}")
         return web.Response(text=f"Mode switched to {mode}")
 
     app = web.Application()
@@ -252,4 +594,4 @@ async def start_http_server(node, port=8000):
     await runner.setup()
     site = web.TCPSite(runner, "0.0.0.0", port)
     await site.start()
-    print(f"[{node.node_id}] HTTP API server started on port {port}")
+    log.info(f"[{node.node_id}] HTTP API server started on port {port}")
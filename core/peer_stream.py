@@ -0,0 +1,93 @@
+# peer_stream.py
+import asyncio
+from collections import deque
+import grpc.aio
+from core import gossip_pb2
+from core.log_writer import log
+
+
+class PeerStream:
+    """
+    One long-lived GossipStream call to a peer. Messages are queued and coalesced
+    into GossipBatch frames of up to max_batch messages, waiting at most max_delay
+    seconds for a frame to fill. The peer acks every frame; frames still unacked
+    when the stream breaks are resent over the unary SendMessage path. While the
+    peer's channel is unhealthy, each reopen after a failed stream waits a delay
+    that doubles from min_backoff up to max_backoff (messages keep queueing), so
+    a dead or restarting peer is not redialled in a tight loop.
+    """
+    def __init__(self, agent, peer_id, max_batch=256, max_delay=0.002, max_queue=10000,
+                 min_backoff=0.1, max_backoff=5.0):
+        self.agent = agent
+        self.peer_id = peer_id
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.supported = True  # False once the peer answers UNIMPLEMENTED (older node)
+        self.closed = False
+        self.task = None
+        self.building = []
+        self.unacked = deque()
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.backoff = 0.0  # wait before reopening, 0 once a stream is acked again
+
+    async def put(self, message):
+        if self.closed:
+            return
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(self.run())
+        await self.queue.put(message)
+
+    async def frames(self):
+        while True:
+            self.building = [await self.queue.get()]
+            if self.queue.empty() and self.max_delay:
+                await asyncio.sleep(self.max_delay)
+            while len(self.building) < self.max_batch and not self.queue.empty():
+                self.building.append(self.queue.get_nowait())
+            batch, self.building = self.building, []
+            self.unacked.append(batch)
+            yield gossip_pb2.GossipBatch(messages=[self.agent.to_proto(m) for m in batch],
+                                         updates=self.agent.membership.piggyback())
+
+    async def run(self):
+        if self.backoff and not self.agent.channels.is_healthy(self.peer_id):
+            await asyncio.sleep(self.backoff)
+        call = self.agent.channels.stub(self.peer_id).GossipStream(self.frames())
+        try:
+            async for ack in call:
+                if self.unacked:
+                    self.unacked.popleft()
+                self.agent.membership.merge(ack.updates)
+                self.agent.mark_peer_ok(self.peer_id)
+                self.backoff = 0.0
+        except grpc.aio.AioRpcError as e:
+            if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+                log.info(f"[{self.agent.node_id}] Peer {self.peer_id} has no GossipStream, using unary sends.")
+                self.supported = False
+            else:
+                self.agent.mark_peer_error(self.peer_id, e)
+                self.backoff = min(self.max_backoff, max(self.min_backoff, self.backoff * 2))
+        finally:
+            await self.fallback()
+
+    def close(self):
+        """The peer left the cluster: stop streaming and drop whatever is still queued."""
+        self.closed = True
+        if self.task:
+            self.task.cancel()
+
+    async def fallback(self):
+        if self.closed:
+            return
+        leftovers = [m for batch in self.unacked for m in batch] + self.building
+        self.unacked.clear()
+        self.building = []
+        if not self.supported:
+            while not self.queue.empty():
+                leftovers.append(self.queue.get_nowait())
+        for message in leftovers:
+            await self.agent.send_unary(self.peer_id, message)
+        if self.supported and not self.queue.empty():
+            self.task = asyncio.ensure_future(self.run())
@@ -0,0 +1,245 @@
+# plumtree.py
+import random
+import asyncio
+from collections import defaultdict
+import grpc.aio
+from core import gossip_pb2
+from core.dedup import msg_digest
+from core.log_writer import log
+
+
+class Plumtree:
+    """
+    Epidemic broadcast trees (Leitao, Pereira, Rodrigues: "Epidemic Broadcast Trees",
+    SRDS 2007) for gossip mode, one tree per publisher (root). For each root a
+    node splits its neighbours in two sets: eager peers get the full message
+    pushed, lazy peers only get batched IHAVE digests. Links start eager; when a
+    pushed copy turns out to be a duplicate the receiver PRUNEs that link to lazy
+    for that root, so the eager links settle into a spanning tree and a message
+    costs about N-1 payload transmissions. Separate trees keep concurrent
+    publishers from pruning each other's links, but each one only settles
+    after its own root has sent a few messages: with many publishers and few
+    messages each, most trees are still unpruned and cost more than plain
+    gossip. trees="shared" keeps a single tree for all roots instead, as in the
+    paper: it settles on everyone's traffic and needs fewer hand-offs, but
+    paths are longer and more messages wait for a graft, so latency is higher.
+
+    If an IHAVE arrives for a message that no eager link delivered within
+    graft_timeout, the tree is broken (a peer died or is slow): the node GRAFTs
+    the announcer, which makes that link eager again and returns the message.
+    Peers whose sends fail or time out are demoted to lazy the same way.
+
+    Neighbours are `degree` random peers, made symmetric by join_loop(), plus
+    every peer that grafts or pushes to us. The trees carry every topic, so
+    interest routing does not apply in this mode.
+    """
+    def __init__(self, agent, degree=4, graft_timeout=0.5, graft_retry=0.25, ihave_delay=0.05, ihave_batch=1024,
+                 trees="per_root"):
+        if trees not in ("per_root", "shared"):
+            raise ValueError("trees must be 'per_root' or 'shared'")
+        self.agent = agent
+        self.shared = trees == "shared"
+        self.graft_timeout = graft_timeout
+        self.graft_retry = graft_retry
+        self.ihave_delay = ihave_delay
+        self.ihave_batch = ihave_batch
+        self.degree = degree
+        self.starting = set(random.sample(agent.peers, min(degree, len(agent.peers))))
+        self.neighbours = set(self.starting)
+        self.joined = set()  # starting neighbours that have accepted our join graft
+        self.trees = {}  # root (or "*" when shared) -> (eager peers, lazy peers)
+        self.outbox = defaultdict(list)  # peer_id -> digests waiting to be announced
+        self.flush_handle = None
+        self.announcers = {}  # digest -> peers that announced it, in arrival order
+        self.timers = {}  # digest -> graft timer
+        self.stats = agent.stats
+
+    def tree(self, root):
+        if self.shared:
+            root = "*"
+        tree = self.trees.get(root)
+        if tree is None:
+            tree = self.trees[root] = (set(self.neighbours), set())
+        return tree
+
+    def add_neighbour(self, peer_id):
+        if peer_id not in self.neighbours:
+            self.neighbours.add(peer_id)
+            for eager, lazy in self.trees.values():
+                eager.add(peer_id)
+
+    def add_peer(self, peer_id):
+        """A node joined; take it as a starting neighbour while we have fewer than degree (join_loop grafts it)."""
+        if len(self.starting) < self.degree:
+            self.starting.add(peer_id)
+            self.add_neighbour(peer_id)
+
+    def remove_peer(self, peer_id):
+        """A node left: drop it from every tree, including its own."""
+        for peers in (self.starting, self.joined, self.neighbours):
+            peers.discard(peer_id)
+        self.trees.pop(peer_id, None)
+        for eager, lazy in self.trees.values():
+            eager.discard(peer_id)
+            lazy.discard(peer_id)
+        self.outbox.pop(peer_id, None)
+        for announcers in self.announcers.values():
+            if peer_id in announcers:
+                announcers.remove(peer_id)
+
+    def make_eager(self, root, peer_id):
+        self.add_neighbour(peer_id)
+        eager, lazy = self.tree(root)
+        lazy.discard(peer_id)
+        eager.add(peer_id)
+
+    def make_lazy(self, root, peer_id):
+        eager, lazy = self.tree(root)
+        eager.discard(peer_id)
+        lazy.add(peer_id)
+
+    async def broadcast(self, message, from_peer=None):
+        """Push a first-seen message down its root's tree and announce it on the other links."""
+        root = message['sender']
+        if root == self.agent.node_id:
+            return  # our own message, already pushed by broadcast_batch
+        digest = msg_digest(message['msg_id'])
+        self.received(digest)
+        if from_peer:
+            self.make_eager(root, from_peer)
+        eager, lazy = self.tree(root)
+        self.announce([digest], lazy - {from_peer})
+        await self.push(root, eager - {from_peer, root}, [message])
+
+    async def broadcast_batch(self, messages):
+        """Publisher side: messages from this node, which is the root of their tree."""
+        root = self.agent.node_id
+        digests = [msg_digest(message['msg_id']) for message in messages]
+        for digest in digests:
+            self.received(digest)
+        eager, lazy = self.tree(root)
+        self.announce(digests, lazy)
+        await self.push(root, set(eager), messages)
+
+    async def push(self, root, peer_ids, messages):
+        relayed = [dict(message, relay=self.agent.node_id) for message in messages]
+        peer_ids = list(peer_ids)
+        results = await asyncio.gather(*(self.agent.send_many(peer_id, relayed) for peer_id in peer_ids))
+        for peer_id, delivered in zip(peer_ids, results):
+            if not delivered or not self.agent.channels.is_healthy(peer_id):
+                # the receivers behind a slow or dead link graft around it after graft_timeout
+                self.stats["plumtree_demoted"] += 1
+                self.make_lazy(root, peer_id)
+
+    def received(self, digest):
+        timer = self.timers.pop(digest, None)
+        if timer:
+            timer.cancel()
+        self.announcers.pop(digest, None)
+
+    def on_duplicate(self, message, from_peer):
+        """A pushed copy we already had: the link is redundant for this root, make it lazy on both ends."""
+        root = message['sender']
+        if not from_peer or from_peer not in self.tree(root)[0]:
+            return
+        self.stats["plumtree_pruned"] += 1
+        self.make_lazy(root, from_peer)
+        asyncio.ensure_future(self.prune(from_peer, root))
+
+    async def prune(self, peer_id, root):
+        request = gossip_pb2.PruneRequest(sender=self.agent.node_id, root=root)
+        try:
+            await self.agent.channels.stub(peer_id).Prune(request, timeout=self.agent.send_timeout)
+        except grpc.aio.AioRpcError as e:
+            self.agent.mark_peer_error(peer_id, e)
+
+    def on_prune(self, peer_id, root):
+        self.add_neighbour(peer_id)
+        self.make_lazy(root, peer_id)
+
+    def announce(self, digests, peer_ids):
+        for peer_id in peer_ids:
+            self.outbox[peer_id].extend(digests)
+        if self.outbox and self.flush_handle is None:
+            self.flush_handle = asyncio.get_running_loop().call_later(self.ihave_delay, self.flush)
+
+    def flush(self):
+        self.flush_handle = None
+        outbox, self.outbox = self.outbox, defaultdict(list)
+        for peer_id, digests in outbox.items():
+            for i in range(0, len(digests), self.ihave_batch):
+                asyncio.ensure_future(self.send_ihave(peer_id, digests[i:i + self.ihave_batch]))
+
+    async def send_ihave(self, peer_id, digests):
+        request = gossip_pb2.IHaveBatch(sender=self.agent.node_id, ids=digests)
+        try:
+            await self.agent.channels.stub(peer_id).IHave(request, timeout=self.agent.send_timeout)
+            self.stats["plumtree_ihave_sent"] += len(digests)
+        except grpc.aio.AioRpcError as e:
+            self.agent.mark_peer_error(peer_id, e)
+
+    def on_ihave(self, peer_id, digests):
+        loop = asyncio.get_running_loop()
+        self.add_neighbour(peer_id)
+        for digest in digests:
+            if digest in self.agent.seen_msgs:
+                continue
+            self.announcers.setdefault(digest, []).append(peer_id)
+            if digest not in self.timers:
+                self.timers[digest] = loop.call_later(self.graft_timeout, self.on_timeout, digest)
+
+    def on_timeout(self, digest):
+        """No eager link delivered an announced message in time: graft the next announcer."""
+        self.timers.pop(digest, None)
+        announcers = self.announcers.get(digest)
+        if not announcers or digest in self.agent.seen_msgs:
+            self.announcers.pop(digest, None)
+            return
+        peer_id = announcers.pop(0)
+        self.timers[digest] = asyncio.get_running_loop().call_later(self.graft_retry, self.on_timeout, digest)
+        asyncio.ensure_future(self.graft(peer_id, [digest]))
+
+    async def graft(self, peer_id, digests):
+        """Pull the given messages from peer_id and make it an eager link for their roots."""
+        if digests:
+            self.stats["plumtree_grafts"] += 1
+        request = gossip_pb2.FetchRequest(sender=self.agent.node_id, ids=digests)
+        try:
+            async for grpc_message in self.agent.channels.stub(peer_id).Graft(request):
+                self.stats["plumtree_grafted_messages"] += 1
+                message = self.agent.from_proto(grpc_message)
+                self.make_eager(message['sender'], peer_id)
+                if self.agent.node:
+                    # received as if pushed by peer_id, so we do not push it straight back
+                    message['relay'] = peer_id
+                    self.agent.node.receive(message)
+            self.add_neighbour(peer_id)
+            self.agent.mark_peer_ok(peer_id)
+            return True
+        except grpc.aio.AioRpcError as e:
+            self.agent.mark_peer_error(peer_id, e)
+            return False
+
+    def on_graft(self, peer_id, digests):
+        self.add_neighbour(peer_id)
+        for grpc_message in self.agent.iter_stored(digests):
+            self.make_eager(grpc_message.sender, peer_id)
+            yield grpc_message
+
+    async def join_loop(self, interval=5):
+        """Graft our starting neighbours until they have accepted, including ones added as nodes join."""
+        while True:
+            pending = sorted(self.starting - self.joined)
+            if pending:
+                results = await asyncio.gather(*(self.graft(peer_id, []) for peer_id in pending))
+                self.joined.update(peer_id for peer_id, ok in zip(pending, results) if ok)
+                log.debug(f"[{self.agent.node_id}] plumtree joined {len(self.joined)}/{len(self.starting)} neighbours")
+            await asyncio.sleep(interval)
+
+    def status(self):
+        return {
+            "neighbours": sorted(self.neighbours),
+            "trees": {root: {"eager": sorted(eager), "lazy": sorted(lazy)}
+                      for root, (eager, lazy) in self.trees.items()},
+            "missing": len(self.announcers),
+        }
@@ -0,0 +1,193 @@
+# sequencer.py
+import time
+import asyncio
+import itertools
+from collections import Counter, defaultdict, deque
+from core.log_writer import log
+from core.metrics import SEQUENCER_BATCH
+
+
+class TopicOrder:
+    __slots__ = ("epoch", "next", "buffer", "repair")
+
+    def __init__(self, epoch, next_seq):
+        self.epoch = epoch
+        self.next = next_seq
+        self.buffer = {}  # seq -> message that arrived ahead of next
+        self.repair = None  # gap repair task
+
+
+class Sequencer:
+    """
+    Total order per topic for leader mode. The leader numbers every message it
+    accepts with (epoch, seq): seq counts up from 1 per topic, epoch is fixed
+    for as long as this node stays leader and is higher than any epoch it has
+    seen, so a new leader never reuses positions. Messages queue up for
+    batch_delay seconds (or until max_batch) and each batch is appended to a
+    per-follower outbox. One sender task per follower drains its outbox in
+    order, taking everything queued since its last hand-off, so a slow
+    follower only delays itself and numbering never waits on the network.
+
+    Every node, the leader included, delivers sequenced messages in seq order,
+    starting from seq 1 of each epoch. Messages that arrive ahead of a gap
+    wait; after gap_timeout the missing range is fetched from the leader's
+    recent window (FetchSequence), retried with doubling delays up to
+    repair_attempts times, and only then skipped so the topic does not stall.
+    A node that joins mid-epoch repairs its way up from seq 1 the same way.
+    A skipped message that turns up later is delivered late rather than dropped.
+    """
+    def __init__(self, node, batch_delay=0.002, max_batch=256, window=4096, gap_timeout=0.2, repair_attempts=5):
+        self.node = node
+        self.batch_delay = batch_delay
+        self.max_batch = max_batch
+        self.gap_timeout = gap_timeout
+        self.repair_attempts = repair_attempts
+        self.pending = deque()  # unsequenced messages accepted by the leader
+        self.ready = asyncio.Event()
+        self.epoch = 0
+        self.max_epoch = 0  # highest epoch seen on any sequenced message
+        self.counters = defaultdict(int)  # topic -> last seq assigned in this epoch
+        self.recent = defaultdict(lambda: deque(maxlen=window))  # topic -> last sequenced messages, for repair
+        self.outbox = defaultdict(list)  # peer_id -> sequenced messages not yet handed to its sender
+        self.senders = {}  # peer_id -> task draining its outbox
+        self.topics = {}  # topic -> TopicOrder, delivery side
+        self.stats = Counter()  # sequenced, gaps, skipped, late; kept apart from the node's receive outcomes
+
+    # leader side
+
+    def submit(self, msg):
+        self.pending.append(msg)
+        self.ready.set()
+
+    async def sequence_loop(self):
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            while self.pending:
+                if len(self.pending) < self.max_batch and self.batch_delay:
+                    await asyncio.sleep(self.batch_delay)
+                batch = [self.pending.popleft() for _ in range(min(self.max_batch, len(self.pending)))]
+                if not self.node.is_leader():
+                    # leadership moved while these waited: the new leader numbers them
+                    self.dispatch(self.node.leader_id, batch)
+                    continue
+                self.assign(batch)
+                SEQUENCER_BATCH.observe(len(batch))
+                for msg in batch:
+                    for peer_id in self.node.gossip.route_candidates(msg["topic"]):
+                        self.outbox[peer_id].append(msg)
+                for peer_id in list(self.outbox):
+                    self.dispatch(peer_id)
+
+    def dispatch(self, peer_id, messages=()):
+        self.outbox[peer_id].extend(messages)
+        if peer_id not in self.senders:
+            self.senders[peer_id] = asyncio.ensure_future(self.drain(peer_id))
+
+    async def drain(self, peer_id):
+        try:
+            while self.outbox.get(peer_id):
+                await self.node.gossip.send_many(peer_id, self.outbox.pop(peer_id))
+        finally:
+            del self.senders[peer_id]
+
+    def assign(self, batch):
+        if self.epoch < self.max_epoch or not self.epoch:
+            # first batch since becoming leader: open an epoch above every one seen so far
+            self.epoch = max(self.max_epoch + 1, int(time.time()))
+            self.counters.clear()
+            self.recent.clear()
+            log.info(f"[{self.node.node_id}] Sequencing as leader, epoch {self.epoch}")
+        for msg in batch:
+            self.counters[msg["topic"]] += 1
+            msg["seq"], msg["epoch"] = self.counters[msg["topic"]], self.epoch
+            self.recent[msg["topic"]].append(msg)
+            self.node.gossip.store(msg)
+            self.deliver(msg)
+        self.stats["sequenced"] += len(batch)
+
+    def recent_range(self, topic, epoch, start, end):
+        recent = self.recent.get(topic)
+        if not recent or epoch != self.epoch:
+            return []
+        first = recent[0]["seq"]
+        return itertools.islice(recent, max(0, start - first), max(0, end - first + 1))
+
+    # delivery side
+
+    def deliver(self, msg):
+        """Hand msg to the node for delivery once everything before it on its topic has been."""
+        topic, epoch, seq = msg["topic"], msg["epoch"], msg["seq"]
+        self.max_epoch = max(self.max_epoch, epoch)
+        order = self.topics.get(topic)
+        if order is None or epoch > order.epoch:
+            if order is not None:
+                # a new leader took over: whatever the old one left in the buffer goes first
+                self.skip(order, max(order.buffer, default=order.next - 1) + 1)
+            order = self.topics[topic] = TopicOrder(epoch, 1)
+        elif epoch < order.epoch or seq < order.next:
+            self.stats["sequence_late"] += 1
+            self.node.queue_delivery(msg)
+            return
+        order.buffer[seq] = msg
+        self.release(order)
+        if order.buffer and order.repair is None:
+            order.repair = asyncio.ensure_future(self.repair(topic, order))
+
+    def passed(self, msg):
+        """A sequenced duplicate (delivered before a restart, or fetched twice) still fills its position."""
+        order = self.topics.get(msg["topic"])
+        if order is not None and msg["epoch"] == order.epoch and msg["seq"] >= order.next:
+            order.buffer.setdefault(msg["seq"], None)
+            self.release(order)
+
+    def release(self, order):
+        while order.next in order.buffer:
+            msg = order.buffer.pop(order.next)
+            if msg is not None:
+                self.node.queue_delivery(msg)
+            order.next += 1
+
+    def skip(self, order, to_seq):
+        """Give up on everything before to_seq and deliver what is buffered up to there."""
+        for seq in range(order.next, to_seq):
+            if seq not in order.buffer:
+                self.stats["sequence_skipped"] += 1
+            msg = order.buffer.pop(seq, None)
+            if msg is not None:
+                self.node.queue_delivery(msg)
+        order.next = max(order.next, to_seq)
+        self.release(order)
+
+    async def repair(self, topic, order):
+        try:
+            delay = self.gap_timeout
+            await asyncio.sleep(delay)
+            if order.buffer and self.node.leader_id != self.node.node_id:
+                self.stats["sequence_gaps"] += 1
+                for _ in range(self.repair_attempts):
+                    if not order.buffer or self.topics.get(topic) is not order:
+                        break
+                    await self.node.gossip.fetch_sequence(self.node.leader_id, topic, order.epoch,
+                                                          order.next, max(order.buffer) - 1)
+                    await asyncio.sleep(delay)
+                    delay *= 2
+            if order.buffer:
+                self.skip(order, min(order.buffer))
+        finally:
+            order.repair = None
+        if order.buffer and self.topics.get(topic) is order:
+            order.repair = asyncio.ensure_future(self.repair(topic, order))
+
+    def buffered(self):
+        return sum(len(order.buffer) for order in self.topics.values())
+
+    def status(self):
+        return {
+            "epoch": self.epoch if self.node.is_leader() else None,
+            "pending": len(self.pending),
+            "counters": dict(self.stats),
+            "outbox": {peer_id: len(messages) for peer_id, messages in sorted(self.outbox.items()) if messages},
+            "topics": {topic: {"epoch": order.epoch, "next": order.next, "buffered": len(order.buffer)}
+                       for topic, order in sorted(self.topics.items())},
+        }
@@ -0,0 +1,240 @@
+# simulator.py
+import os
+import random
+import asyncio
+import statistics
+from collections import Counter, defaultdict
+from core.broker import Broker
+from core.node import Node
+from core.grpc_server import GossipServiceServicer
+from core.memory_transport import MemoryNetwork
+
+
+class SimNode(Node):
+    """A Node that reports deliveries to the simulator instead of writing latency logs."""
+    def deliver(self, msg, lamport, msg_payload):
+        self.sim.on_deliver(self.node_id, msg)
+
+
+class Simulator:
+    """
+    Runs a whole cluster of real Node/GossipAgent instances in one process on a
+    MemoryNetwork, publishes a workload and measures how it spread:
+    delivery ratio, duplicate factor (hand-offs per first arrival), convergence
+    time (publish to last subscriber), the hop distribution and, in leader mode,
+    how many deliveries broke the leader's sequence order. Subscription
+    views are seeded directly, as if announcements had already converged.
+    With the same seed and config the workload, topology and link decisions
+    repeat; timings still vary a little with the host.
+
+    run(join=(at, count)) adds count subscribing nodes `at` seconds into the run,
+    each starting with only the first node as its seed; the report's "join"
+    section says how long membership took to spread them to every node and what
+    they received of the messages published after they joined.
+    """
+    def __init__(self, nodes=20, mode="gossip", fanout=3, transport="unary", latency=0.005, jitter=0.002,
+                 loss=0.0, subscriber_ratio=1.0, topic="sim", anti_entropy=None, seed=0, workdir="./sim_data",
+                 broadcast="gossip", plumtree_options=None, publishers=None):
+        self.config = {
+            "nodes": nodes, "mode": mode, "fanout": fanout, "transport": transport, "latency": latency,
+            "jitter": jitter, "loss": loss, "subscriber_ratio": subscriber_ratio, "topic": topic,
+            "anti_entropy": anti_entropy, "seed": seed, "broadcast": broadcast, "publishers": publishers,
+        }
+        self.plumtree_options = plumtree_options
+        self.topic = topic
+        self.anti_entropy = anti_entropy
+        self.workdir = workdir
+        self.rng = random.Random(seed)
+        random.seed(seed)  # GossipAgent picks fanout peers with the global generator
+        self.network = MemoryNetwork(latency=latency, jitter=jitter, loss=loss, seed=seed)
+        self.node_ids = [f"n{i:03d}" for i in range(nodes)]
+        self.subscribers = set(self.rng.sample(self.node_ids, max(1, round(nodes * subscriber_ratio))))
+        self.publishers = self.rng.sample(self.node_ids, publishers) if publishers else self.node_ids
+        self.nodes = {}
+        self.tasks = []
+        self.published = {}  # msg_id -> publish time
+        self.deliveries = defaultdict(dict)  # msg_id -> {node_id: delivery time}
+        self.last_delivery = 0.0
+        self.delivered_seq = {}  # (node_id, topic) -> (epoch, seq) of the last sequenced delivery
+        self.out_of_order = 0
+        self.joined = {}  # node_id -> join time, for nodes added during the run
+        self.join_spread = []  # seconds until every node had a joiner as a member
+
+    def create_node(self, node_id, peers, subscribe):
+        node = SimNode(
+            node_id, peers, Broker(view_ttl=24 * 3600), is_publisher=True, is_subscriber=True,
+            mode=self.config["mode"], transport=self.config["transport"], fanout=self.config["fanout"],
+            store_dir=os.path.join(self.workdir, node_id), crypto_options={"workers": 0},
+            channels=self.network.pool(node_id),
+            broadcast=self.config["broadcast"], plumtree_options=self.plumtree_options,
+        )
+        node.sim = self
+        if subscribe:
+            node.subscriber.subscribe(self.topic, node.broker)
+        self.nodes[node_id] = node
+        self.network.attach(node_id, GossipServiceServicer(node))
+        return node
+
+    def start_loops(self, node):
+        loop = asyncio.get_running_loop()
+        self.tasks.append(loop.create_task(node.delivery_loop()))
+        self.tasks.append(loop.create_task(node.sequencer.sequence_loop()))
+        self.tasks.append(loop.create_task(node.gossip.membership.probe_loop()))
+        if self.anti_entropy:
+            self.tasks.append(loop.create_task(node.gossip.anti_entropy_loop(self.anti_entropy)))
+            self.tasks.append(loop.create_task(node.gossip.fanout_policy.adjust_loop(self.anti_entropy * 2)))
+        if node.gossip.plumtree:
+            self.tasks.append(loop.create_task(node.gossip.plumtree.join_loop()))
+
+    def start(self):
+        for node_id in self.node_ids:
+            self.create_node(node_id, self.node_ids, node_id in self.subscribers)
+        for node in self.nodes.values():
+            for other_id in self.node_ids:
+                if other_id != node.node_id:
+                    topics = [self.topic] if other_id in self.subscribers else []
+                    node.broker.apply_announcement(other_id, 1, topics, node.broker.view_ttl)
+            self.start_loops(node)
+
+    async def join_window(self, at, count):
+        """Add count subscribing nodes `at` seconds into the run, bootstrapping from the first node only."""
+        await asyncio.sleep(at)
+        loop = asyncio.get_running_loop()
+        seed = self.node_ids[0]
+        for i in range(count):
+            node_id = f"j{i:03d}"
+            node = self.create_node(node_id, [seed], subscribe=True)
+            self.start_loops(node)
+            self.joined[node_id] = loop.time()
+            await node.join([seed])
+            self.tasks.append(loop.create_task(self.watch_spread(node_id)))
+
+    async def watch_spread(self, node_id, poll=0.05):
+        loop = asyncio.get_running_loop()
+        while any(node_id not in node.peers for other_id, node in self.nodes.items() if other_id != node_id):
+            await asyncio.sleep(poll)
+        self.join_spread.append(loop.time() - self.joined[node_id])
+
+    async def stop(self):
+        for node in self.nodes.values():
+            self.tasks.extend(stream.task for stream in node.gossip.streams.values() if stream.task)
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        for node in self.nodes.values():
+            node.gossip.msg_store.close()
+
+    def on_deliver(self, node_id, msg):
+        now = asyncio.get_running_loop().time()
+        self.deliveries[msg["msg_id"]].setdefault(node_id, now)
+        self.last_delivery = now
+        if msg.get("seq"):
+            position = (msg["epoch"], msg["seq"])
+            if position < self.delivered_seq.get((node_id, msg["topic"]), (0, 0)):
+                self.out_of_order += 1
+            self.delivered_seq[(node_id, msg["topic"])] = position
+
+    async def publish(self, messages=100, rate=50.0):
+        loop = asyncio.get_running_loop()
+        for i in range(messages):
+            publisher = self.nodes[self.rng.choice(self.publishers)]
+            sent_at = loop.time()
+            results = await publisher.publish_batch([{"topic": self.topic, "message": f"sim message {i}"}])
+            self.published[results[0]["msg_id"]] = sent_at
+            await asyncio.sleep(max(0.0, 1.0 / rate - (loop.time() - sent_at)))
+
+    async def partition_window(self, start, end):
+        """Split the cluster in two halves from `start` to `end` seconds into the run."""
+        await asyncio.sleep(start)
+        half = len(self.node_ids) // 2
+        self.network.partition([self.node_ids[:half], self.node_ids[half:]])
+        await asyncio.sleep(end - start)
+        self.network.heal()
+
+    async def settle(self, quiet=1.0, max_wait=60.0):
+        """Wait until nothing has been delivered for `quiet` seconds."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_wait
+        while loop.time() < deadline:
+            await asyncio.sleep(quiet / 4)
+            if loop.time() - max(self.last_delivery, max(self.published.values(), default=0)) >= quiet:
+                return
+
+    async def run(self, messages=100, rate=50.0, partition=None, quiet=1.0, max_wait=60.0, join=None):
+        self.config["join"] = join
+        self.start()
+        try:
+            partition_task = asyncio.create_task(self.partition_window(*partition)) if partition else None
+            join_task = asyncio.create_task(self.join_window(*join)) if join else None
+            await self.publish(messages, rate)
+            if partition_task:
+                await partition_task
+            if join_task:
+                await join_task
+            await self.settle(quiet, max_wait)
+            return self.report()
+        finally:
+            await self.stop()
+
+    def report(self):
+        expected = len(self.published) * len(self.subscribers)
+        delivered = sum(len(self.subscribers.intersection(nodes)) for nodes in self.deliveries.values())
+        convergence = []
+        latencies = []
+        for msg_id, sent_at in self.published.items():
+            times = {node_id: t for node_id, t in self.deliveries.get(msg_id, {}).items() if node_id in self.subscribers}
+            latencies.extend(t - sent_at for t in times.values())
+            if len(times) == len(self.subscribers):
+                convergence.append(max(times.values()) - sent_at)
+        arrivals = len(self.network.hops)
+        hops = Counter(hop for (node_id, _), hop in self.network.hops.items() if node_id in self.subscribers)
+        repair = Counter()
+        sequencing = Counter()
+        for node in self.nodes.values():
+            repair.update(node.gossip.stats)
+            sequencing.update(node.sequencer.stats)
+        return {
+            "config": self.config,
+            "messages": len(self.published),
+            "delivery_ratio": round(delivered / expected, 4) if expected else None,
+            "fully_delivered": round(len(convergence) / len(self.published), 4) if self.published else None,
+            "duplicate_factor": round(self.network.stats["messages"] / arrivals, 3) if arrivals else None,
+            "handoffs_per_message": round(self.network.stats["messages"] / len(self.published), 2)
+                                    if self.published else None,
+            "convergence_s": summarize(convergence),
+            "delivery_latency_s": summarize(latencies),
+            "hops": dict(sorted(hops.items())),
+            "mean_hops": round(sum(h * c for h, c in hops.items()) / sum(hops.values()), 3) if hops else None,
+            "network": dict(sorted(self.network.stats.items())),
+            "repair": dict(sorted(repair.items())),
+            "out_of_order": self.out_of_order,
+            "sequencing": dict(sorted(sequencing.items())),
+            "fanout_bias": round(statistics.mean(node.gossip.fanout_policy.bias for node in self.nodes.values()), 3),
+            "join": self.join_report(),
+        }
+
+    def join_report(self):
+        if not self.joined:
+            return None
+        expected = delivered = 0
+        for node_id, joined_at in self.joined.items():
+            for msg_id, sent_at in self.published.items():
+                if sent_at >= joined_at:
+                    expected += 1
+                    delivered += node_id in self.deliveries.get(msg_id, {})
+        return {
+            "nodes": len(self.joined),
+            "spread_s": summarize(self.join_spread),
+            "delivery_ratio": round(delivered / expected, 4) if expected else None,
+        }
+
+
+def summarize(values):
+    if not values:
+        return None
+    values = sorted(values)
+    return {
+        "p50": round(statistics.median(values), 4),
+        "p95": round(values[min(len(values) - 1, int(len(values) * 0.95))], 4),
+        "max": round(values[-1], 4),
+    }
@@ -1,10 +1,17 @@
 # subscriber.py
+from core.topic_trie import TopicTrie, validate_pattern, normalize_pattern
+from core.log_writer import log
+
 class Subscriber:
     def __init__(self, node_id, gossip_agent):
         self.node_id = node_id
-        self.topics = set()
+        self.topics = set()  # topic filters, may contain + / * / # wildcards
+        self.matcher = TopicTrie()
         self.gossip = gossip_agent
 
+    def matches(self, topic):
+        return self.matcher.matches(topic)
+
     def receive(self, msg):
         import time
         msg_payload = msg.get("content")
@@ -17,21 +24,26 @@ class Subscriber:
         # self.gossip.save_seen_msg(msg_id, f"{self.node_id}_seen_msgs.log")
 
         publish_time = msg_payload.get("timestamp")
-        if msg["topic"] in self.topics:
+        if self.matches(msg["topic"]):
             now = time.time()
-            latency = now - publish_time if publish_time else None
-            
-            with open(f"./output/node_latency.log", "a") as f:
-                now = time.strftime("%Y-%m-%d %H:%M:%S")
-                f.write(f"[{now}] [{self.node_id}] Received | Sender: [{msg_payload.get('sender')}] | Topic: {msg['topic']} | Message: {msg_payload.get('message')} | Latency: {latency:.4f}s | Lamport: {lamport}| msg_id: {msg_id}\n")
-            print(f"[{now}] [{self.node_id}] Received | Sender: [{msg_payload.get('sender')}] | Topic: {msg['topic']} | Message: {msg_payload.get('message')} | Latency: {latency:.4f}s | Lamport: {lamport}\n")
+            # envelopes without a publish time (or with 0) have no latency to report
+            latency = f"{now - publish_time:.4f}s" if publish_time else "n/a"
+
+            now = time.strftime("%Y-%m-%d %H:%M:%S")
+            log.write("./output/node_latency.log", f"[{now}] [{self.node_id}] Received | Sender: [{msg_payload.get('sender')}] | Topic: {msg['topic']} | Message: {msg_payload.get('message')} | Latency: {latency} | Lamport: {lamport}| msg_id: {msg_id}\n")
+            log.info(f"[{now}] [{self.node_id}] Received | Sender: [{msg_payload.get('sender')}] | Topic: {msg['topic']} | Message: {msg_payload.get('message')} | Latency: {latency} | Lamport: {lamport}\n")
 
     def subscribe(self, topic, broker):
+        validate_pattern(topic)
+        topic = normalize_pattern(topic)
         broker.subscribe(topic, self.node_id)
         self.topics.add(topic)
-        print(f"[{self.node_id}] Subscribed to topic: '{topic}'")
+        self.matcher.add(topic, self.node_id)
+        log.info(f"[{self.node_id}] Subscribed to topic: '{topic}'")
 
     def unsubscribe(self, topic, broker):
+        topic = normalize_pattern(topic)
         broker.unsubscribe(topic, self.node_id)
         self.topics.discard(topic)
-        print(f"[{self.node_id}] Unsubscribed from topic: '{topic}'")
\ No newline at end of file
+        self.matcher.remove(topic, self.node_id)
+        log.info(f"[{self.node_id}] Unsubscribed from topic: '{topic}'")
\ No newline at end of file
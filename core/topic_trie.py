@@ -0,0 +1,93 @@
+# topic_trie.py
+# MQTT-style topic filters: levels are separated by "/", "+" (or "*") matches exactly
+# one level and a trailing "#" matches the parent level and everything below it.
+# "*" is only an input alias: filters are stored with "+" (see normalize_pattern).
+
+SEPARATOR = "/"
+SINGLE_LEVEL = ("+", "*")
+MULTI_LEVEL = "#"
+
+
+def is_wildcard(topic):
+    return any(level in SINGLE_LEVEL or level == MULTI_LEVEL for level in topic.split(SEPARATOR))
+
+
+def normalize_pattern(pattern):
+    """The stored form of a filter: "a/*" and "a/+" are the same subscription."""
+    return SEPARATOR.join("+" if level in SINGLE_LEVEL else level for level in pattern.split(SEPARATOR))
+
+
+def validate_pattern(pattern):
+    if not isinstance(pattern, str) or not pattern:
+        raise ValueError("Topic must be a non-empty string")
+    levels = pattern.split(SEPARATOR)
+    for i, level in enumerate(levels):
+        if level == MULTI_LEVEL and i != len(levels) - 1:
+            raise ValueError(f"'{MULTI_LEVEL}' is only allowed as the last level: {pattern}")
+        if level not in SINGLE_LEVEL and level != MULTI_LEVEL and any(c in level for c in "+*#"):
+            raise ValueError(f"Wildcards must take a whole level: {pattern}")
+
+
+class _TrieNode:
+    __slots__ = ("children", "values")
+
+    def __init__(self):
+        self.children = {}
+        self.values = set()
+
+
+class TopicTrie:
+    """
+    Index of topic filters. match() walks one trie level per topic level, so its
+    cost depends on the topic depth rather than on how many filters are stored.
+    """
+    def __init__(self):
+        self.root = _TrieNode()
+
+    def add(self, pattern, value):
+        node = self.root
+        for level in pattern.split(SEPARATOR):
+            if level in SINGLE_LEVEL:
+                level = "+"
+            node = node.children.setdefault(level, _TrieNode())
+        node.values.add(value)
+
+    def remove(self, pattern, value):
+        path = [self.root]
+        for level in pattern.split(SEPARATOR):
+            if level in SINGLE_LEVEL:
+                level = "+"
+            node = path[-1].children.get(level)
+            if node is None:
+                return
+            path.append(node)
+        path[-1].values.discard(value)
+        # prune empty branches
+        levels = ["+" if level in SINGLE_LEVEL else level for level in pattern.split(SEPARATOR)]
+        for parent, node, level in zip(reversed(path[:-1]), reversed(path[1:]), reversed(levels)):
+            if node.values or node.children:
+                break
+            del parent.children[level]
+
+    def match(self, topic):
+        matched = set()
+        levels = topic.split(SEPARATOR)
+        stack = [(self.root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            multi = node.children.get(MULTI_LEVEL)
+            if multi is not None:
+                matched |= multi.values
+            if depth == len(levels):
+                matched |= node.values
+                continue
+            exact = node.children.get(levels[depth])
+            if exact is not None:
+                stack.append((exact, depth + 1))
+            single = node.children.get("+")
+            if single is not None:
+                stack.append((single, depth + 1))
+        return matched
+
+    def matches(self, topic):
+        return bool(self.match(topic))
@@ -0,0 +1,78 @@
+# bench_crypto.py
+# Microbenchmark for security.crypto_utils: legacy hex/JSON EAX vs binary EAX/GCM,
+# inline vs batched on the thread pool, and how long the event loop is blocked.
+# Usage (from the repo root): python -m scripts.bench_crypto [message_size] [count]
+import sys
+import time
+import asyncio
+from security.crypto_utils import CryptoEngine, encrypt_message, decrypt_message
+
+size = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+count = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+plaintext = b"x" * size
+
+
+def report(label, seconds, n):
+    print(f"{label:<32} {n / seconds:>10.0f} msg/s  {seconds / n * 1e6:>7.1f} us/msg")
+
+
+def bench_legacy():
+    text = plaintext.decode()
+    start = time.perf_counter()
+    sealed = [encrypt_message(text) for _ in range(count)]
+    report("legacy eax (hex) encrypt", time.perf_counter() - start, count)
+    start = time.perf_counter()
+    for payload in sealed:
+        decrypt_message(payload)
+    report("legacy eax (hex) decrypt", time.perf_counter() - start, count)
+
+
+def bench_inline(mode):
+    engine = CryptoEngine(mode=mode, workers=0)
+    start = time.perf_counter()
+    sealed = engine.encrypt_batch([plaintext] * count)
+    report(f"{mode} encrypt inline", time.perf_counter() - start, count)
+    start = time.perf_counter()
+    engine.decrypt_batch(sealed)
+    report(f"{mode} decrypt inline", time.perf_counter() - start, count)
+    return sealed
+
+
+async def bench_offload(mode, sealed, batch, workers):
+    engine = CryptoEngine(mode=mode, workers=workers, offload_min=1)
+    blocked = []
+
+    async def ticker():
+        # longest gap between ticks = worst event loop stall
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(0)
+            now = time.perf_counter()
+            blocked.append(now - last)
+            last = now
+
+    tick = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    for i in range(0, len(sealed), batch):
+        await engine.decrypt_many(sealed[i:i + batch])
+        await asyncio.sleep(0)  # let other tasks in between batches, as the node loop would
+    elapsed = time.perf_counter() - start
+    tick.cancel()
+    report(f"{mode} decrypt batch={batch} w={workers}", elapsed, len(sealed))
+    print(f"{'':<32} max loop stall {max(blocked) * 1e3:.2f} ms")
+    if engine.executor:
+        engine.executor.shutdown()
+
+
+async def main():
+    print(f"{count} messages of {size} bytes")
+    bench_legacy()
+    for mode in ("eax", "gcm"):
+        sealed = bench_inline(mode)
+        for batch in (16, 256):
+            for workers in (0, 1, 2, 4):
+                await bench_offload(mode, sealed, batch, workers)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
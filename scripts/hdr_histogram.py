@@ -0,0 +1,76 @@
+# hdr_histogram.py
+# Minimal HDR (high dynamic range) histogram: integer values are kept in
+# log-linear buckets with a fixed number of significant figures, so recording
+# is O(1), memory stays small and percentiles are accurate to ~0.1% across
+# microseconds to hours.
+import math
+
+
+class HdrHistogram:
+    def __init__(self, lowest=1, highest=3600 * 1000 * 1000, significant_figures=3):
+        self.lowest = lowest
+        self.highest = highest
+        sub_bucket_count = 2 ** math.ceil(math.log2(2 * 10 ** significant_figures))
+        self.sub_bucket_half_count = sub_bucket_count // 2
+        self.sub_bucket_mask = sub_bucket_count - 1
+        self.shift = int(math.log2(sub_bucket_count))
+        self.counts = {}  # (bucket, sub bucket) -> count
+        self.total = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+
+    def index(self, value):
+        bucket = max(0, (value | self.sub_bucket_mask).bit_length() - self.shift)
+        return bucket, value >> bucket
+
+    @staticmethod
+    def value_at(bucket, sub_bucket):
+        """Middle of the range of values that share this slot."""
+        low = sub_bucket << bucket
+        return low + ((1 << bucket) - 1) // 2
+
+    def record(self, value, count=1):
+        value = min(max(int(value), self.lowest), self.highest)
+        key = self.index(value)
+        self.counts[key] = self.counts.get(key, 0) + count
+        self.total += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.total += other.total
+        self.sum += other.sum
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def sorted_slots(self):
+        return sorted(self.counts.items(), key=lambda item: item[0][1] << item[0][0])
+
+    def value_at_percentile(self, percentile):
+        if not self.total:
+            return None
+        wanted = max(1, math.ceil(self.total * percentile / 100.0))
+        seen = 0
+        for (bucket, sub_bucket), count in self.sorted_slots():
+            seen += count
+            if seen >= wanted:
+                return min(self.value_at(bucket, sub_bucket), self.max)
+        return self.max
+
+    def mean(self):
+        return self.sum / self.total if self.total else None
+
+    def distribution(self):
+        """(value, count, cumulative percentile) rows, ascending, for CSV export."""
+        rows = []
+        seen = 0
+        for (bucket, sub_bucket), count in self.sorted_slots():
+            seen += count
+            rows.append((min(self.value_at(bucket, sub_bucket), self.max), count, 100.0 * seen / self.total))
+        return rows
@@ -0,0 +1,219 @@
+# load_gen.py
+# Asyncio load generator: publishes to many nodes over HTTP and measures end-to-end
+# latency by listening on the nodes' /ws push endpoint.
+#   open loop:   --mode open --rate 2000      sends on a fixed schedule; latency is counted
+#                                             from the scheduled time, so a stalled node
+#                                             cannot hide its backlog (coordinated omission)
+#   closed loop: --mode closed --concurrency 64   that many requests in flight at all times
+# Example: python -m scripts.load_gen --mode open --rate 1000 --duration 30 --batch 10 --json out.json --csv out.csv
+import os
+import sys
+import csv
+import json
+import time
+import uuid
+import asyncio
+import argparse
+from collections import Counter
+import aiohttp
+from scripts.hdr_histogram import HdrHistogram
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LoadGenerator:
+    def __init__(self, args, peers):
+        self.args = args
+        self.run_id = uuid.uuid4().hex[:8]
+        self.publish_urls = [f"http://{peers[n][0]}:{peers[n][1]}" for n in args.publish_nodes]
+        self.subscribe_urls = [f"http://{peers[n][0]}:{peers[n][1]}" for n in args.subscribe_nodes]
+        self.publish_latency = HdrHistogram()  # microseconds, HTTP request to response
+        self.e2e_latency = HdrHistogram()  # microseconds, send to delivery on a subscriber
+        self.counts = Counter()
+        self.per_second = {}  # second since start -> Counter(sent, acked, delivered)
+        self.start = None
+        self.measure_from = None
+        self.next_url = 0
+        self.seq = 0
+
+    def bucket(self, now):
+        second = int(now - self.start)
+        return self.per_second.setdefault(second, Counter())
+
+    def batch_body(self, sent_at):
+        items = []
+        for _ in range(self.args.batch):
+            self.seq += 1
+            items.append({"topic": self.args.topic, "message": {
+                "lg": self.run_id, "seq": self.seq, "t": sent_at, "pad": "x" * self.args.message_bytes}})
+        return items
+
+    async def send(self, session, scheduled):
+        url = self.publish_urls[self.next_url % len(self.publish_urls)]
+        self.next_url += 1
+        items = self.batch_body(scheduled)
+        measured = scheduled >= self.measure_from
+        self.bucket(time.time())["sent"] += len(items)
+        try:
+            if self.args.batch > 1:
+                async with session.post(f"{url}/publish_batch", json=items) as response:
+                    await response.read()
+                    ok = response.status == 200
+            else:
+                async with session.post(f"{url}/publish", json=items[0]) as response:
+                    await response.read()
+                    ok = response.status == 200
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            ok = False
+        now = time.time()
+        if not ok:
+            self.counts["errors"] += len(items)
+            return
+        self.bucket(now)["acked"] += len(items)
+        if measured:
+            self.counts["acked"] += len(items)
+            self.publish_latency.record((now - scheduled) * 1e6)
+
+    async def open_loop(self, session, end):
+        interval = self.args.batch / self.args.rate
+        scheduled = time.time()
+        pending = set()
+        while scheduled < end:
+            delay = scheduled - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(self.send(session, scheduled))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            scheduled += interval
+        if pending:
+            await asyncio.wait(pending)
+
+    async def closed_loop(self, session, end):
+        async def worker():
+            while time.time() < end:
+                await self.send(session, time.time())
+        await asyncio.gather(*(worker() for _ in range(self.args.concurrency)))
+
+    async def listen(self, session, url, ready):
+        async with session.ws_connect(f"{url}/ws", params={"topic": self.args.topic}, heartbeat=30) as ws:
+            ready.set()
+            async for frame in ws:
+                if frame.type != aiohttp.WSMsgType.TEXT:
+                    break
+                now = time.time()
+                for event in json.loads(frame.data):
+                    if event.get("type") == "lagged":
+                        self.counts["lagged"] += event["dropped"]
+                        continue
+                    body = event.get("message")
+                    if not isinstance(body, dict) or body.get("lg") != self.run_id:
+                        continue
+                    self.bucket(now)["delivered"] += 1
+                    if body["t"] >= self.measure_from:
+                        self.counts["delivered"] += 1
+                        self.e2e_latency.record((now - body["t"]) * 1e6)
+
+    async def run(self):
+        timeout = aiohttp.ClientTimeout(total=self.args.timeout)
+        async with aiohttp.ClientSession(timeout=timeout, connector=aiohttp.TCPConnector(limit=0)) as session:
+            for url in self.subscribe_urls:
+                async with session.post(f"{url}/subscribe", json={"topic": self.args.topic}) as response:
+                    await response.read()
+            listeners = []
+            for url in self.subscribe_urls:
+                ready = asyncio.Event()
+                listeners.append(asyncio.create_task(self.listen(session, url, ready)))
+                await asyncio.wait_for(ready.wait(), 10)
+
+            self.start = time.time()
+            self.measure_from = self.start + self.args.warmup
+            end = self.start + self.args.warmup + self.args.duration
+            if self.args.mode == "open":
+                await self.open_loop(session, end)
+            else:
+                await self.closed_loop(session, end)
+            await asyncio.sleep(self.args.drain)
+            for task in listeners:
+                task.cancel()
+            await asyncio.gather(*listeners, return_exceptions=True)
+
+    def summary(self):
+        expected = self.counts["acked"] * len(self.subscribe_urls)
+        return {
+            "run_id": self.run_id,
+            "config": {key: value for key, value in vars(self.args).items() if key not in ("json", "csv")},
+            "throughput": {
+                "acked": self.counts["acked"],
+                "errors": self.counts["errors"],
+                "publish_per_s": round(self.counts["acked"] / self.args.duration, 1),
+                "delivered": self.counts["delivered"],
+                "deliveries_per_s": round(self.counts["delivered"] / self.args.duration, 1),
+                "delivery_ratio": round(self.counts["delivered"] / expected, 4) if expected else None,
+                "lagged": self.counts["lagged"],
+            },
+            "publish_latency_ms": latency_summary(self.publish_latency),
+            "e2e_latency_ms": latency_summary(self.e2e_latency),
+            "per_second": [dict(second=second, **counts) for second, counts in sorted(self.per_second.items())],
+        }
+
+    def write_csv(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["metric", "value_ms", "count", "percentile"])
+            for name, histogram in (("publish", self.publish_latency), ("e2e", self.e2e_latency)):
+                for value, count, percentile in histogram.distribution():
+                    writer.writerow([name, round(value / 1000, 3), count, round(percentile, 4)])
+
+
+def latency_summary(histogram):
+    if not histogram.total:
+        return None
+    summary = {f"p{p:g}": round(histogram.value_at_percentile(p) / 1000, 3) for p in PERCENTILES}
+    summary.update(count=histogram.total, mean=round(histogram.mean() / 1000, 3),
+                   min=round(histogram.min / 1000, 3), max=round(histogram.max / 1000, 3))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open/closed loop load generator with HDR latency histograms")
+    parser.add_argument("--peers", type=str, default=os.path.join(os.path.dirname(__file__), "../peers.json"))
+    parser.add_argument("--publish_nodes", type=str, default=None, help="Comma separated node ids (default: all)")
+    parser.add_argument("--subscribe_nodes", type=str, default=None, help="Comma separated node ids (default: all)")
+    parser.add_argument("--topic", type=str, default="loadtest")
+    parser.add_argument("--mode", type=str, default="open", choices=["open", "closed"])
+    parser.add_argument("--rate", type=float, default=500.0, help="Messages per second (open loop)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight (closed loop)")
+    parser.add_argument("--batch", type=int, default=1, help="Messages per request, >1 uses /publish_batch")
+    parser.add_argument("--message_bytes", type=int, default=64, help="Padding added to every message")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds sent but not measured")
+    parser.add_argument("--drain", type=float, default=3.0, help="Seconds to wait for deliveries after sending")
+    parser.add_argument("--timeout", type=float, default=10.0, help="HTTP request timeout")
+    parser.add_argument("--json", type=str, default=None, help="Write the summary here")
+    parser.add_argument("--csv", type=str, default=None, help="Write the latency distributions here")
+    args = parser.parse_args()
+
+    with open(args.peers, "r") as f:
+        peers = json.load(f)
+    for option in ("publish_nodes", "subscribe_nodes"):
+        nodes = getattr(args, option).split(",") if getattr(args, option) else sorted(peers)
+        unknown = [n for n in nodes if n not in peers]
+        if unknown:
+            print(f"Error: {', '.join(unknown)} not found in {args.peers}")
+            sys.exit(1)
+        setattr(args, option, nodes)
+
+    generator = LoadGenerator(args, peers)
+    asyncio.run(generator.run())
+    summary = generator.summary()
+    print(json.dumps({key: summary[key] for key in ("throughput", "publish_latency_ms", "e2e_latency_ms")}, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+    if args.csv:
+        generator.write_csv(args.csv)
+
+
+if __name__ == "__main__":
+    main()
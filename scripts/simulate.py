@@ -0,0 +1,116 @@
+# simulate.py
+# Runs in-process clusters (core/simulator.py) over a grid of sizes, fanouts and modes
+# and writes a JSON report.
+# Example: python -m scripts.simulate --nodes 10,50,200 --fanout 2,3,4 --mode gossip,leader --messages 200
+#          python -m scripts.simulate --nodes 50,200 --mode gossip --broadcast gossip,plumtree --publishers 5
+#          python -m scripts.simulate --nodes 50 --mode gossip --messages 500 --join 3:10
+import os
+import sys
+import json
+import asyncio
+import argparse
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'core'))
+
+from core.simulator import Simulator
+from core.log_writer import log
+
+
+def int_list(value):
+    return [int(v) for v in value.split(",")]
+
+
+def fanout_list(value):
+    return [v if v == "auto" else int(v) for v in value.split(",")]
+
+
+def partition_window(value):
+    start, end = (float(v) for v in value.split(":"))
+    return start, end
+
+
+def join_spec(value):
+    at, count = value.split(":")
+    return float(at), int(count)
+
+
+async def run_all(args):
+    results = []
+    with tempfile.TemporaryDirectory(prefix="pubsub-sim-") as workdir:
+        # nodes write ./output and ./subscription relative to the working directory
+        os.chdir(workdir)
+        for nodes in args.nodes:
+            for fanout in args.fanout:
+                for mode in args.mode.split(","):
+                    for broadcast in args.broadcast.split(","):
+                        if mode == "leader" and broadcast != "gossip":
+                            continue  # the leader relays to everyone itself
+                        sim = Simulator(nodes=nodes, mode=mode, fanout=fanout, transport=args.transport,
+                                        latency=args.latency, jitter=args.jitter, loss=args.loss,
+                                        subscriber_ratio=args.subscribers, anti_entropy=args.anti_entropy,
+                                        seed=args.seed, broadcast=broadcast, publishers=args.publishers,
+                                        plumtree_options={"graft_timeout": args.graft_timeout,
+                                                          "trees": args.plumtree_trees},
+                                        workdir=os.path.join(workdir, f"{mode}-{broadcast}-{nodes}-{fanout}"))
+                        report = await sim.run(messages=args.messages, rate=args.rate, partition=args.partition,
+                                               quiet=args.quiet, max_wait=args.max_wait, join=args.join)
+                        results.append(report)
+                        print_row(report)
+    return results
+
+
+def print_row(report):
+    config = report["config"]
+    convergence = report["convergence_s"] or {}
+    print(f"{config['mode']:<7} {config['broadcast']:<8} nodes={config['nodes']:<4} fanout={config['fanout']:<2} "
+          f"delivery={report['delivery_ratio']} dup={report['duplicate_factor']} "
+          f"handoffs={report['handoffs_per_message']} hops={report['mean_hops']} conv_p50={convergence.get('p50')} conv_max={convergence.get('max')}")
+    if report["join"]:
+        join = report["join"]
+        print(f"        joined={join['nodes']} spread_max={(join['spread_s'] or {}).get('max')} "
+              f"join_delivery={join['delivery_ratio']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process pub/sub cluster simulator")
+    parser.add_argument("--nodes", type=int_list, default=[10, 50], help="Comma separated cluster sizes")
+    parser.add_argument("--fanout", type=fanout_list, default=[3],
+                        help="Comma separated gossip fanouts, 'auto' for the adaptive fanout")
+    parser.add_argument("--mode", type=str, default="gossip,leader", help="Comma separated modes: gossip, leader")
+    parser.add_argument("--broadcast", type=str, default="gossip",
+                        help="Comma separated broadcasts: gossip, plumtree (gossip mode only)")
+    parser.add_argument("--graft_timeout", type=float, default=0.1,
+                        help="Plumtree: seconds before an announced but missing message is grafted")
+    parser.add_argument("--plumtree_trees", type=str, default="per_root", choices=["per_root", "shared"],
+                        help="Plumtree: one tree per publisher or one shared by all")
+    parser.add_argument("--transport", type=str, default="unary", choices=["unary", "stream"])
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=50.0, help="Messages published per second")
+    parser.add_argument("--latency", type=float, default=0.005, help="One-way link latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.002)
+    parser.add_argument("--loss", type=float, default=0.0, help="Probability that a call is dropped")
+    parser.add_argument("--publishers", type=int, default=None,
+                        help="Publish from this many randomly chosen nodes (default: all)")
+    parser.add_argument("--subscribers", type=float, default=1.0, help="Fraction of nodes subscribed")
+    parser.add_argument("--partition", type=partition_window, default=None,
+                        help="start:end seconds during which the cluster is split in two halves")
+    parser.add_argument("--join", type=join_spec, default=None,
+                        help="at:count adds count nodes at seconds into the run, each knowing one seed only")
+    parser.add_argument("--anti_entropy", type=float, default=None, help="Anti-entropy interval, off by default")
+    parser.add_argument("--quiet", type=float, default=1.0, help="Seconds without deliveries that end a run")
+    parser.add_argument("--max_wait", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", type=str, default="sim_report.json")
+    args = parser.parse_args()
+
+    log.configure(level="ERROR")
+    report_path = os.path.abspath(args.report)
+    results = asyncio.run(run_all(args))
+    with open(report_path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"Report written to {report_path}")
+
+
+if __name__ == "__main__":
+    main()
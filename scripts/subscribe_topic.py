@@ -7,6 +7,7 @@ import os
 def usage():
     print("Usage: python subscribe_topic.py <node_letter> <topic>")
     print("Example: python subscribe_topic.py A news")
+    print('Wildcards: python subscribe_topic.py A "orders/+/paris"  or  "metrics/#"')
     sys.exit(1)
 
 if len(sys.argv) != 3:
@@ -2,7 +2,11 @@
 # from Crypto.Cipher import PKCS1_OAEP, AES
 # from Crypto.Random import get_random_bytes
 # import base64
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from Crypto.Cipher import AES
+from Crypto.Random import get_random_bytes
 from security.shared_secret import SHARED_AES_KEY
 
 # def generate_keys():
@@ -62,4 +66,80 @@ def decrypt_message(payload):
     tag = bytes.fromhex(payload['tag'])
     ciphertext = bytes.fromhex(payload['ciphertext'])
     cipher = AES.new(SHARED_AES_KEY, AES.MODE_EAX, nonce)
-    return cipher.decrypt_and_verify(ciphertext, tag).decode()
\ No newline at end of file
+    return cipher.decrypt_and_verify(ciphertext, tag).decode()
+
+
+# ---- binary AEAD for the binary envelope ----
+# sealed form: mode byte + nonce + tag (16 bytes) + ciphertext, no hex.
+# The mode byte doubles as the envelope version: 1 = EAX (16-byte nonce), 2 = GCM (12-byte nonce).
+MODES = {
+    "eax": (1, AES.MODE_EAX, 16),
+    "gcm": (2, AES.MODE_GCM, 12),
+}
+MODE_BY_ID = {mode_id: (aes_mode, nonce_size) for mode_id, aes_mode, nonce_size in MODES.values()}
+TAG_SIZE = 16
+
+
+class CryptoEngine:
+    """
+    Seals and opens binary AEAD blobs with the shared key. Single messages are
+    handled inline; encrypt_many/decrypt_many split larger batches into chunks
+    and run them on a small thread pool (PyCryptodome releases the GIL inside
+    its C calls) so the event loop keeps serving while a burst is processed.
+    Opening always dispatches on the mode byte, so EAX and GCM senders can be mixed.
+    """
+    def __init__(self, mode="gcm", key=SHARED_AES_KEY, workers=None, offload_min=16):
+        if mode not in MODES:
+            raise ValueError(f"Cipher mode must be one of {sorted(MODES)}")
+        self.mode_id, self.aes_mode, self.nonce_size = MODES[mode]
+        self.key = key
+        if workers is None:
+            # a pool only pays off when there is a spare core for it
+            workers = max(0, min(4, (os.cpu_count() or 1) - 1))
+        self.workers = workers
+        self.offload_min = offload_min  # smaller batches are not worth a thread hop
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crypto") if workers else None
+
+    def encrypt(self, plaintext):
+        nonce = get_random_bytes(self.nonce_size)
+        cipher = AES.new(self.key, self.aes_mode, nonce=nonce)
+        ciphertext, tag = cipher.encrypt_and_digest(plaintext)
+        return bytes([self.mode_id]) + nonce + tag + ciphertext
+
+    def decrypt(self, data):
+        if not data or data[0] not in MODE_BY_ID:
+            raise ValueError(f"Unknown envelope version {data[0] if data else None}")
+        aes_mode, nonce_size = MODE_BY_ID[data[0]]
+        nonce = data[1:1 + nonce_size]
+        tag = data[1 + nonce_size:1 + nonce_size + TAG_SIZE]
+        ciphertext = data[1 + nonce_size + TAG_SIZE:]
+        cipher = AES.new(self.key, aes_mode, nonce=nonce)
+        return cipher.decrypt_and_verify(ciphertext, tag)
+
+    def encrypt_batch(self, plaintexts):
+        return [self.encrypt(plaintext) for plaintext in plaintexts]
+
+    def decrypt_batch(self, blobs):
+        """Plaintexts in order, None for blobs that fail to authenticate."""
+        results = []
+        for data in blobs:
+            try:
+                results.append(self.decrypt(data))
+            except (ValueError, KeyError):
+                results.append(None)
+        return results
+
+    async def encrypt_many(self, plaintexts):
+        return await self.run_batched(self.encrypt_batch, plaintexts)
+
+    async def decrypt_many(self, blobs):
+        return await self.run_batched(self.decrypt_batch, blobs)
+
+    async def run_batched(self, fn, items):
+        if self.executor is None or len(items) < self.offload_min:
+            return fn(items)
+        loop = asyncio.get_running_loop()
+        size = -(-len(items) // self.workers)
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        results = await asyncio.gather(*(loop.run_in_executor(self.executor, fn, chunk) for chunk in chunks))
+        return [result for chunk in results for result in chunk]
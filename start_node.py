@@ -1,5 +1,6 @@
 import os
 import sys
+import signal
 import asyncio
 import argparse
 import json
@@ -11,6 +12,20 @@ from core.broker import Broker
 from core.node import Node
 from core.grpc_server import serve
 from core.node import start_http_server
+from core.log_writer import log
+from core.metrics import loop_lag_monitor
+
+def fanout_value(value):
+    return value if value == "auto" else int(value)
+
+def parse_topic_fanout(value):
+    """"alerts/#:6,metrics:2" -> {"alerts/#": 6, "metrics": 2}"""
+    overrides = {}
+    for item in (value or "").split(","):
+        if item:
+            topic, fanout = item.rsplit(":", 1)
+            overrides[topic] = int(fanout)
+    return overrides
 
 def parse_peer_addrs(peers_str=None, peers_config=None):
     """
@@ -40,6 +55,15 @@ def parse_peer_addrs(peers_str=None, peers_config=None):
     print(f"Parsed peer addresses: {peers}")  # Debug log
     return peers
 
+def parse_seeds(value):
+    """"10.0.0.5:8000,10.0.0.6:8001" (HTTP ports, like --peer_addrs) -> gRPC addresses"""
+    seeds = []
+    for item in (value or "").split(","):
+        if item:
+            ip, http_port = item.rsplit(":", 1)
+            seeds.append(f"{ip}:{int(http_port) + 1000}")
+    return seeds
+
 async def fetch_leader_from_peers(node, peer_addrs):
     for peer_id, (ip, grpc_port) in peer_addrs.items():
         if peer_id == node.node_id:
@@ -59,12 +83,18 @@ async def fetch_leader_from_peers(node, peer_addrs):
     return None
 
 async def main(args):
+    log.configure(level=args.log_level, max_bytes=args.log_max_bytes)
     node_id = args.node_id
     http_port = args.port
     grpc_port = http_port + 1000
 
-    # Parse peer addresses
-    peer_addrs = parse_peer_addrs(args.peer_addrs, args.peer_addrs_config)
+    # Parse peer addresses; with --seeds the static list may be empty, the rest is learnt on Join
+    seeds = parse_seeds(args.seeds)
+    if seeds and not (args.peer_addrs or args.peer_addrs_config):
+        peer_addrs = {}
+    else:
+        peer_addrs = parse_peer_addrs(args.peer_addrs, args.peer_addrs_config)
+    peer_addrs.setdefault(node_id, (args.host, grpc_port))  # advertised to the nodes we join
     all_peers = list(peer_addrs.keys())
 
     print(f"Starting node {node_id}")
@@ -76,7 +106,46 @@ async def main(args):
     broker = Broker()
     mode = args.mode
     node = Node(node_id, all_peers, broker, peer_addrs=peer_addrs,
-                is_publisher=True, is_subscriber=True, mode=mode)
+                is_publisher=True, is_subscriber=True, mode=mode, transport=args.transport,
+                seen_ttl=args.seen_ttl, seen_capacity=args.seen_capacity,
+                store_dir=os.path.join(args.data_dir, node_id),
+                store_options={
+                    "fsync": args.fsync,
+                    "retention_seconds": args.retention_seconds,
+                    "retention_bytes": args.retention_bytes,
+                },
+                wire_format=args.wire_format,
+                fanout=args.fanout,
+                sequencer_options={
+                    "batch_delay": args.sequence_delay,
+                    "max_batch": args.sequence_batch,
+                    "gap_timeout": args.gap_timeout,
+                    "repair_attempts": args.repair_attempts,
+                },
+                membership_options={
+                    "probe_interval": args.probe_interval,
+                    "suspicion_mult": args.suspicion_mult,
+                },
+                fanout_options={
+                    "c": args.fanout_c,
+                    "overrides": parse_topic_fanout(args.topic_fanout),
+                },
+                broadcast=args.broadcast,
+                plumtree_options={
+                    "degree": args.plumtree_degree,
+                    "graft_timeout": args.graft_timeout,
+                    "trees": args.plumtree_trees,
+                },
+                compression=None if args.compression == "none" else args.compression,
+                compression_options={"min_size": args.compress_min_bytes},
+                crypto_options={
+                    "mode": args.cipher,
+                    "workers": args.crypto_workers,
+                },
+                consumer_options={
+                    "queue_size": args.consumer_queue,
+                    "policy": args.consumer_policy,
+                })
     
     leader_from_peers = await fetch_leader_from_peers(node, peer_addrs)
     if leader_from_peers:
@@ -93,17 +162,35 @@ async def main(args):
 
     await asyncio.sleep(2)
 
-    asyncio.create_task(node.gossip.push_seen_msgs())
-    asyncio.create_task(node.check_leader_loop())
+    if seeds:
+        if not await node.join(seeds):
+            print(f"[{node_id}] No seed answered, starting with the static peers only.")
+
+    asyncio.create_task(node.gossip.anti_entropy_loop())
+    asyncio.create_task(node.gossip.channels.evict_idle_loop())
+    asyncio.create_task(node.gossip.announce_loop())
+    asyncio.create_task(node.gossip.msg_store.sync_loop())
+    asyncio.create_task(node.gossip.membership.probe_loop())
+    asyncio.create_task(node.delivery_loop())
+    asyncio.create_task(node.sequencer.sequence_loop())
+    asyncio.create_task(node.dictionary_loop())
+    asyncio.create_task(loop_lag_monitor())
+    asyncio.create_task(node.gossip.fanout_policy.adjust_loop())
+    if node.gossip.plumtree:
+        asyncio.create_task(node.gossip.plumtree.join_loop())
 
     node.subscribe("chat")
     print(f"[{node_id}] Node started as daemon, use HTTP API to publish/subscribe.")
 
+    # Ctrl-C cancels this task; SIGTERM does the same, so both leave the cluster cleanly
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
     try:
         while True:
             await asyncio.sleep(60)
-    except KeyboardInterrupt:
+    except (KeyboardInterrupt, asyncio.CancelledError):
         print(f"Shutting down node {node_id}")
+        await node.leave()
+        await node.gossip.channels.close_all()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -113,8 +200,82 @@ if __name__ == "__main__":
                         help='Peer addresses, e.g. "A:3.92.123.45:8000,B:3.101.234.67:8001"')
     parser.add_argument("--peer_addrs_config", type=str, default=None,
                         help='Peer address config file in JSON format (overrides --peer_addrs if given)')
+    parser.add_argument("--seeds", type=str, default=None,
+                        help='Join a running cluster through these nodes, e.g. "10.0.0.5:8000,10.0.0.6:8001"; '
+                             'the peer list is then learnt from membership and peers.json may be omitted')
+    parser.add_argument("--host", type=str, default="127.0.0.1",
+                        help="Address other nodes reach this node at, when it is not in the peer list")
     parser.add_argument("--mode", type=str, default="gossip",
                         choices=["gossip", "leader"], help="gossip or leader")
+    parser.add_argument("--transport", type=str, default="stream",
+                        choices=["stream", "unary"], help="batched GossipStream or one SendMessage per message")
+    parser.add_argument("--seen_ttl", type=float, default=600,
+                        help="Seconds a message id is remembered for deduplication and repair")
+    parser.add_argument("--seen_capacity", type=int, default=1000000,
+                        help="Max message ids kept in the dedup cache")
+    parser.add_argument("--data_dir", type=str, default="./data",
+                        help="Directory for the per-node message store")
+    parser.add_argument("--fsync", type=str, default="batch", choices=["always", "batch", "never"],
+                        help="Message store fsync policy")
+    parser.add_argument("--retention_seconds", type=float, default=None,
+                        help="Delete stored message segments older than this (default: --seen_ttl)")
+    parser.add_argument("--retention_bytes", type=int, default=None,
+                        help="Delete the oldest stored message segments beyond this total size")
+    parser.add_argument("--sequence_delay", type=float, default=0.002,
+                        help="Leader mode: seconds the leader waits to fill a batch before numbering it")
+    parser.add_argument("--sequence_batch", type=int, default=256,
+                        help="Leader mode: most messages numbered and sent to followers as one batch")
+    parser.add_argument("--gap_timeout", type=float, default=0.2,
+                        help="Leader mode: seconds a follower holds messages behind a sequence gap before "
+                             "asking the leader to resend it; each retry waits twice as long")
+    parser.add_argument("--repair_attempts", type=int, default=5,
+                        help="Leader mode: resend requests for a sequence gap before the follower skips it")
+    parser.add_argument("--probe_interval", type=float, default=1.0,
+                        help="Seconds between SWIM failure-detector probes (one peer per probe)")
+    parser.add_argument("--suspicion_mult", type=float, default=4,
+                        help="A suspected peer is declared dead after suspicion_mult * log10(N) probe intervals")
+    parser.add_argument("--fanout", type=fanout_value, default=3,
+                        help="Peers each gossip round forwards a message to, or 'auto' for ln(N) + c "
+                             "adjusted by the miss and duplicate rates anti-entropy observes")
+    parser.add_argument("--fanout_c", type=float, default=1.0,
+                        help="Constant c of the auto fanout (higher = more redundancy)")
+    parser.add_argument("--topic_fanout", type=str, default=None,
+                        help='Fixed fanout per topic filter, e.g. "alerts/#:6,metrics:2"')
+    parser.add_argument("--broadcast", type=str, default="gossip", choices=["gossip", "plumtree"],
+                        help="How gossip mode relays: to fanout random peers, or along a self-repairing "
+                             "eager-push tree with lazy IHAVE announcements on the other links. With "
+                             "per-root trees plumtree saves hand-offs only when few nodes publish; "
+                             "see --plumtree_trees")
+    parser.add_argument("--plumtree_trees", type=str, default="per_root", choices=["per_root", "shared"],
+                        help="One plumtree per publisher (short paths, but each tree needs its own "
+                             "traffic to settle) or one shared by all publishers (fewer hand-offs with many "
+                             "publishers, higher latency)")
+    parser.add_argument("--plumtree_degree", type=int, default=4,
+                        help="Random starting neighbours of each node in the plumtree overlay")
+    parser.add_argument("--graft_timeout", type=float, default=0.5,
+                        help="Seconds to wait for an announced message before grafting the announcer")
+    parser.add_argument("--wire_format", type=str, default="binary", choices=["binary", "json"],
+                        help="Envelope for published messages; every node reads both, use json while "
+                             "older nodes that only read json are still in the cluster")
+    parser.add_argument("--cipher", type=str, default="gcm", choices=["gcm", "eax"],
+                        help="AEAD mode for binary envelopes; both are always accepted")
+    parser.add_argument("--crypto_workers", type=int, default=None,
+                        help="Threads for batch encryption/decryption (0 = on the event loop, "
+                             "default: one per spare core, up to 4)")
+    parser.add_argument("--compression", type=str, default="none", choices=["none", "zlib", "zstd"],
+                        help="Compress binary payloads before encryption with per-topic dictionaries "
+                             "(zstd needs the zstandard package); every node can decompress")
+    parser.add_argument("--compress_min_bytes", type=int, default=256,
+                        help="Payloads smaller than this are sent uncompressed")
+    parser.add_argument("--consumer_queue", type=int, default=1000,
+                        help="Per-connection queue length for /ws and /events consumers")
+    parser.add_argument("--consumer_policy", type=str, default="drop_oldest",
+                        choices=["drop_oldest", "drop_newest", "disconnect"],
+                        help="What to do with a consumer whose queue is full")
+    parser.add_argument("--log_level", type=str, default="INFO",
+                        choices=["DEBUG", "INFO", "WARNING", "ERROR"], help="Console log level")
+    parser.add_argument("--log_max_bytes", type=int, default=50 * 1024 * 1024,
+                        help="Rotate log files once they reach this size (0 disables rotation)")
     args = parser.parse_args()
 
     try: